@@ -17,6 +17,10 @@ from app.tenancy.models import SuperAdmin, SubscriptionPlan, Note
 from app.modules.students.models import Student
 from app.modules.teachers.models import Teacher
 from app.modules.courses.models import Course
+from app.modules.attendance.models import AttendanceMonth
+from app.modules.fees.models import FeeStructure, FeeInvoiceBatch, FeeInvoice, LedgerEntry, StudentBalance
+from app.modules.marks.models import GradingScheme, Exam, Mark, TermResult, CourseResult, MarksPublication, ReportCard
+from app.modules.timetable.models import Room, TeachingAssignment, TeacherUnavailability, Timetable, TimetableSlot
 
 # this is the Alembic Config object
 config = context.config
@@ -0,0 +1,77 @@
+"""add_fee_structures_and_batches
+
+Revision ID: 0a6d2f9c4e71
+Revises: f3c5a8e2b917
+Create Date: 2026-10-19 20:05:13.642380
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a6d2f9c4e71'
+down_revision: Union[str, None] = 'f3c5a8e2b917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'fee_structures',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('term', sa.String(length=50), nullable=False),
+        sa.Column('branch_id', sa.Integer(), nullable=True),
+        sa.Column('current_grade', sa.String(length=20), nullable=True),
+        sa.Column('amount', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('due_date', sa.Date(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'), nullable=False),
+        sa.ForeignKeyConstraint(['branch_id'], ['branches.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_fee_structures_term', 'fee_structures', ['term', 'is_active'], unique=False)
+
+    op.create_table(
+        'fee_invoice_batches',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('term', sa.String(length=50), nullable=False),
+        sa.Column('issue_date', sa.Date(), nullable=False),
+        sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', name='batchjobstatus'), nullable=False),
+        sa.Column('total_students', sa.Integer(), nullable=False),
+        sa.Column('processed_students', sa.Integer(), nullable=False),
+        sa.Column('invoices_created', sa.Integer(), nullable=False),
+        sa.Column('last_student_id', sa.Integer(), nullable=False),
+        sa.Column('error', sa.String(length=500), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_fee_invoice_batches_term'), 'fee_invoice_batches', ['term'], unique=False)
+
+    op.add_column('fee_invoices', sa.Column('structure_id', sa.Integer(), nullable=True))
+    op.add_column('fee_invoices', sa.Column('batch_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('fk_fee_invoices_structure', 'fee_invoices', 'fee_structures', ['structure_id'], ['id'])
+    op.create_foreign_key('fk_fee_invoices_batch', 'fee_invoices', 'fee_invoice_batches', ['batch_id'], ['id'])
+    op.create_index(op.f('ix_fee_invoices_batch_id'), 'fee_invoices', ['batch_id'], unique=False)
+    # One invoice per student and fee structure: re-run batches skip existing ones
+    op.create_unique_constraint('uq_fee_invoices_student_structure', 'fee_invoices', ['student_id', 'structure_id'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_fee_invoices_student_structure', 'fee_invoices', type_='unique')
+    op.drop_index(op.f('ix_fee_invoices_batch_id'), table_name='fee_invoices')
+    op.drop_constraint('fk_fee_invoices_batch', 'fee_invoices', type_='foreignkey')
+    op.drop_constraint('fk_fee_invoices_structure', 'fee_invoices', type_='foreignkey')
+    op.drop_column('fee_invoices', 'batch_id')
+    op.drop_column('fee_invoices', 'structure_id')
+
+    op.drop_table('fee_invoice_batches')
+    op.drop_table('fee_structures')
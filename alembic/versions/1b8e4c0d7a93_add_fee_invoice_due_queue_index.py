@@ -0,0 +1,27 @@
+"""add_fee_invoice_due_queue_index
+
+Revision ID: 1b8e4c0d7a93
+Revises: 0a6d2f9c4e71
+Create Date: 2026-10-19 21:37:48.120554
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b8e4c0d7a93'
+down_revision: Union[str, None] = '0a6d2f9c4e71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Due-date queue for the overdue sweeper
+    op.create_index('ix_fee_invoices_due_queue', 'fee_invoices', ['status', 'due_date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_fee_invoices_due_queue', table_name='fee_invoices')
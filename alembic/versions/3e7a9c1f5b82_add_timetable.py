@@ -0,0 +1,123 @@
+"""add_timetable
+
+Revision ID: 3e7a9c1f5b82
+Revises: 8d4f1b6e3a20
+Create Date: 2026-10-20 01:12:37.408215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e7a9c1f5b82'
+down_revision: Union[str, None] = '8d4f1b6e3a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+DAY_OF_WEEK = sa.Enum('MONDAY', 'TUESDAY', 'WEDNESDAY', 'THURSDAY', 'FRIDAY', 'SATURDAY', 'SUNDAY', name='dayofweek')
+
+
+def _timestamps():
+    return [
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        'rooms',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('branch_id', sa.Integer(), nullable=True),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('capacity', sa.Integer(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['branch_id'], ['branches.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('branch_id', 'name', name='uq_rooms_branch_name')
+    )
+
+    op.create_table(
+        'teaching_assignments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('branch_id', sa.Integer(), nullable=True),
+        sa.Column('current_grade', sa.String(length=20), nullable=False),
+        sa.Column('section', sa.String(length=10), nullable=False),
+        sa.Column('course_id', sa.Integer(), nullable=False),
+        sa.Column('teacher_id', sa.Integer(), nullable=False),
+        sa.Column('periods_per_week', sa.Integer(), nullable=True),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['branch_id'], ['branches.id']),
+        sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['teacher_id'], ['teachers.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('branch_id', 'current_grade', 'section', 'course_id', name='uq_teaching_assignments_class_course')
+    )
+    op.create_index('ix_teaching_assignments_teacher', 'teaching_assignments', ['teacher_id'], unique=False)
+
+    op.create_table(
+        'teacher_unavailability',
+        sa.Column('teacher_id', sa.Integer(), nullable=False),
+        sa.Column('day', DAY_OF_WEEK, nullable=False),
+        sa.Column('period', sa.Integer(), nullable=False),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['teacher_id'], ['teachers.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('teacher_id', 'day', 'period')
+    )
+
+    op.create_table(
+        'timetables',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('branch_id', sa.Integer(), nullable=True),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('days', sa.Integer(), nullable=False),
+        sa.Column('periods_per_day', sa.Integer(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('lessons', sa.Integer(), nullable=False),
+        sa.Column('unplaced', sa.Integer(), nullable=False),
+        sa.Column('penalty', sa.Integer(), nullable=False),
+        sa.Column('seed', sa.Integer(), nullable=False),
+        sa.Column('generated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['branch_id'], ['branches.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_timetables_branch_active', 'timetables', ['branch_id', 'is_active'], unique=False)
+
+    op.create_table(
+        'timetable_slots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('timetable_id', sa.Integer(), nullable=False),
+        sa.Column('day', DAY_OF_WEEK, nullable=False),
+        sa.Column('period', sa.Integer(), nullable=False),
+        sa.Column('current_grade', sa.String(length=20), nullable=False),
+        sa.Column('section', sa.String(length=10), nullable=False),
+        sa.Column('course_id', sa.Integer(), nullable=False),
+        sa.Column('teacher_id', sa.Integer(), nullable=False),
+        sa.Column('room_id', sa.Integer(), nullable=True),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['timetable_id'], ['timetables.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['teacher_id'], ['teachers.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['room_id'], ['rooms.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('timetable_id', 'current_grade', 'section', 'day', 'period', name='uq_timetable_slots_class'),
+        sa.UniqueConstraint('timetable_id', 'teacher_id', 'day', 'period', name='uq_timetable_slots_teacher'),
+        sa.UniqueConstraint('timetable_id', 'room_id', 'day', 'period', name='uq_timetable_slots_room')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('timetable_slots')
+    op.drop_index('ix_timetables_branch_active', table_name='timetables')
+    op.drop_table('timetables')
+    op.drop_table('teacher_unavailability')
+    op.drop_index('ix_teaching_assignments_teacher', table_name='teaching_assignments')
+    op.drop_table('teaching_assignments')
+    op.drop_table('rooms')
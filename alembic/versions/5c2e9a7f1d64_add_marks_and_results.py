@@ -0,0 +1,120 @@
+"""add_marks_and_results
+
+Revision ID: 5c2e9a7f1d64
+Revises: 1b8e4c0d7a93
+Create Date: 2026-10-19 22:41:06.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e9a7f1d64'
+down_revision: Union[str, None] = '1b8e4c0d7a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _timestamps():
+    return [
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        'grading_schemes',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('bands', sa.JSON(), nullable=False),
+        sa.Column('is_default', sa.Boolean(), nullable=False),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+    )
+
+    op.create_table(
+        'exams',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('term', sa.String(length=50), nullable=False),
+        sa.Column('branch_id', sa.Integer(), nullable=True),
+        sa.Column('max_marks', sa.Numeric(precision=6, scale=2), nullable=False),
+        sa.Column('weight', sa.Numeric(precision=5, scale=2), nullable=False),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['branch_id'], ['branches.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_exams_term', 'exams', ['term', 'branch_id'], unique=False)
+
+    op.create_table(
+        'marks',
+        sa.Column('exam_id', sa.Integer(), nullable=False),
+        sa.Column('course_id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('branch_id', sa.Integer(), nullable=True),
+        sa.Column('current_grade', sa.String(length=20), nullable=False),
+        sa.Column('section', sa.String(length=10), nullable=False),
+        sa.Column('marks_obtained', sa.Numeric(precision=6, scale=2), nullable=True),
+        sa.Column('entered_by', sa.Integer(), nullable=True),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['exam_id'], ['exams.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['course_id'], ['courses.id']),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['branch_id'], ['branches.id']),
+        sa.PrimaryKeyConstraint('exam_id', 'course_id', 'student_id')
+    )
+    op.create_index(op.f('ix_marks_student_id'), 'marks', ['student_id'], unique=False)
+    op.create_index('ix_marks_class', 'marks', ['current_grade', 'section', 'exam_id', 'course_id'], unique=False)
+
+    op.create_table(
+        'term_results',
+        sa.Column('term', sa.String(length=50), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('current_grade', sa.String(length=20), nullable=False),
+        sa.Column('section', sa.String(length=10), nullable=False),
+        sa.Column('percentage', sa.Float(), nullable=False),
+        sa.Column('grade', sa.String(length=10), nullable=False),
+        sa.Column('grade_points', sa.Float(), nullable=True),
+        sa.Column('class_rank', sa.Integer(), nullable=False),
+        sa.Column('percentile', sa.Float(), nullable=False),
+        sa.Column('class_size', sa.Integer(), nullable=False),
+        sa.Column('scheme_id', sa.Integer(), nullable=True),
+        sa.Column('computed_at', sa.DateTime(timezone=True), nullable=False),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['scheme_id'], ['grading_schemes.id']),
+        sa.PrimaryKeyConstraint('term', 'student_id')
+    )
+    op.create_index('ix_term_results_class', 'term_results', ['term', 'current_grade', 'section'], unique=False)
+
+    op.create_table(
+        'course_results',
+        sa.Column('term', sa.String(length=50), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('course_id', sa.Integer(), nullable=False),
+        sa.Column('percentage', sa.Float(), nullable=False),
+        sa.Column('grade', sa.String(length=10), nullable=False),
+        sa.Column('grade_points', sa.Float(), nullable=True),
+        sa.Column('class_rank', sa.Integer(), nullable=False),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['course_id'], ['courses.id']),
+        sa.PrimaryKeyConstraint('term', 'student_id', 'course_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('course_results')
+    op.drop_index('ix_term_results_class', table_name='term_results')
+    op.drop_table('term_results')
+    op.drop_index('ix_marks_class', table_name='marks')
+    op.drop_index(op.f('ix_marks_student_id'), table_name='marks')
+    op.drop_table('marks')
+    op.drop_index('ix_exams_term', table_name='exams')
+    op.drop_table('exams')
+    op.drop_table('grading_schemes')
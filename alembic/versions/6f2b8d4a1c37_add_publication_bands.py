@@ -0,0 +1,33 @@
+"""add_publication_bands
+
+Revision ID: 6f2b8d4a1c37
+Revises: 3e7a9c1f5b82
+Create Date: 2026-10-19 23:52:07.418236
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f2b8d4a1c37'
+down_revision: Union[str, None] = '3e7a9c1f5b82'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('marks_publications', sa.Column('bands', sa.JSON(), nullable=True))
+    # Existing publications keep the bands of the scheme they name; those
+    # published with the built-in default are snapshotted on re-publish
+    op.execute("""
+        UPDATE marks_publications p
+        JOIN grading_schemes g ON g.id = p.scheme_id
+        SET p.bands = g.bands
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('marks_publications', 'bands')
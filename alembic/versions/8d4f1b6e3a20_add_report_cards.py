@@ -0,0 +1,62 @@
+"""add_report_cards
+
+Revision ID: 8d4f1b6e3a20
+Revises: 5c2e9a7f1d64
+Create Date: 2026-10-19 23:28:51.774093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4f1b6e3a20'
+down_revision: Union[str, None] = '5c2e9a7f1d64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _timestamps():
+    return [
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        'marks_publications',
+        sa.Column('term', sa.String(length=50), nullable=False),
+        sa.Column('current_grade', sa.String(length=20), nullable=False),
+        sa.Column('section', sa.String(length=10), nullable=False),
+        sa.Column('scheme_id', sa.Integer(), nullable=True),
+        sa.Column('published_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('published_by', sa.Integer(), nullable=True),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['scheme_id'], ['grading_schemes.id']),
+        sa.PrimaryKeyConstraint('term', 'current_grade', 'section')
+    )
+
+    op.create_table(
+        'report_cards',
+        sa.Column('term', sa.String(length=50), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('current_grade', sa.String(length=20), nullable=False),
+        sa.Column('section', sa.String(length=10), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('etag', sa.String(length=40), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('built_at', sa.DateTime(timezone=True), nullable=False),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('term', 'student_id')
+    )
+    op.create_index('ix_report_cards_class', 'report_cards', ['term', 'current_grade', 'section'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_report_cards_class', table_name='report_cards')
+    op.drop_table('report_cards')
+    op.drop_table('marks_publications')
@@ -0,0 +1,69 @@
+"""add_branch_entity_counters
+
+Revision ID: b7d3e1a90c42
+Revises: 20a07245ffe9
+Create Date: 2026-10-19 10:12:41.208311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d3e1a90c42'
+down_revision: Union[str, None] = '20a07245ffe9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COUNTED_TABLES = ('students', 'teachers', 'courses')
+
+
+def upgrade() -> None:
+    # Link students, teachers and courses to a branch
+    for table in COUNTED_TABLES:
+        op.add_column(table, sa.Column('branch_id', sa.Integer(), nullable=True))
+        op.create_foreign_key(f'fk_{table}_branch', table, 'branches', ['branch_id'], ['id'])
+        op.create_index(op.f(f'ix_{table}_branch_id'), table, ['branch_id'], unique=False)
+
+    # Per-branch counters, maintained by the ORM flush hook
+    op.create_table(
+        'branch_counters',
+        sa.Column('branch_id', sa.Integer(), nullable=False),
+        sa.Column('student_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('teacher_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('course_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'), nullable=False),
+        sa.ForeignKeyConstraint(['branch_id'], ['branches.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('branch_id')
+    )
+
+    # Existing single-branch schools: attach all rows to the Main Branch
+    for table in COUNTED_TABLES:
+        op.execute(f"""
+            UPDATE {table}
+            SET branch_id = (SELECT id FROM branches WHERE code = 'MAIN' LIMIT 1)
+            WHERE branch_id IS NULL
+        """)
+
+    # Backfill counters from the current data
+    op.execute("""
+        INSERT INTO branch_counters (branch_id, student_count, teacher_count, course_count)
+        SELECT b.id,
+               (SELECT COUNT(*) FROM students s WHERE s.branch_id = b.id),
+               (SELECT COUNT(*) FROM teachers t WHERE t.branch_id = b.id),
+               (SELECT COUNT(*) FROM courses c WHERE c.branch_id = b.id)
+        FROM branches b
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('branch_counters')
+
+    for table in reversed(COUNTED_TABLES):
+        op.drop_index(op.f(f'ix_{table}_branch_id'), table_name=table)
+        op.drop_constraint(f'fk_{table}_branch', table, type_='foreignkey')
+        op.drop_column(table, 'branch_id')
@@ -0,0 +1,48 @@
+"""add_attendance_records
+
+Revision ID: d4e8a1c7f203
+Revises: b7d3e1a90c42
+Create Date: 2026-10-19 14:03:27.511902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e8a1c7f203'
+down_revision: Union[str, None] = 'b7d3e1a90c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'attendance_records',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('branch_id', sa.Integer(), nullable=True),
+        sa.Column('current_grade', sa.String(length=20), nullable=False),
+        sa.Column('section', sa.String(length=10), nullable=False),
+        sa.Column('attendance_date', sa.Date(), nullable=False),
+        sa.Column('period', sa.SmallInteger(), nullable=False),
+        sa.Column('status', sa.Enum('PRESENT', 'ABSENT', 'LATE', 'EXCUSED', name='attendancestatus'), nullable=False),
+        sa.Column('marked_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'), nullable=False),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['branch_id'], ['branches.id']),
+        sa.PrimaryKeyConstraint('id'),
+        # Upsert key of the bulk marking endpoint
+        sa.UniqueConstraint('student_id', 'attendance_date', 'period', name='uq_attendance_student_date_period')
+    )
+    op.create_index('ix_attendance_class_period', 'attendance_records', ['current_grade', 'section', 'attendance_date', 'period'], unique=False)
+    op.create_index(op.f('ix_attendance_records_branch_id'), 'attendance_records', ['branch_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_attendance_records_branch_id'), table_name='attendance_records')
+    op.drop_index('ix_attendance_class_period', table_name='attendance_records')
+    op.drop_table('attendance_records')
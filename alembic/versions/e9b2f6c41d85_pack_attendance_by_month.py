@@ -0,0 +1,174 @@
+"""pack_attendance_by_month
+
+Revision ID: e9b2f6c41d85
+Revises: d4e8a1c7f203
+Create Date: 2026-10-19 16:41:09.318472
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9b2f6c41d85'
+down_revision: Union[str, None] = 'd4e8a1c7f203'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Packed layout of app/modules/attendance/packing.py, frozen here so the
+# migration does not change with the app: slot = day * 10 + period, 2 code
+# bits and 1 marked bit per slot, little-endian.
+DAYS_PER_MONTH, PERIODS_PER_DAY = 31, 10
+CODES_BYTES, MARKED_BYTES = 78, 39
+STATUS_CODES = {'PRESENT': 0, 'ABSENT': 1, 'LATE': 2, 'EXCUSED': 3}
+CODE_STATUS = {code: status for status, code in STATUS_CODES.items()}
+BATCH_STUDENTS = 500
+
+attendance_records = sa.table(
+    'attendance_records',
+    sa.column('student_id', sa.Integer()),
+    sa.column('branch_id', sa.Integer()),
+    sa.column('current_grade', sa.String()),
+    sa.column('section', sa.String()),
+    sa.column('attendance_date', sa.Date()),
+    sa.column('period', sa.SmallInteger()),
+    sa.column('status', sa.String()),
+)
+attendance_months = sa.table(
+    'attendance_months',
+    sa.column('student_id', sa.Integer()),
+    sa.column('year', sa.SmallInteger()),
+    sa.column('month', sa.SmallInteger()),
+    sa.column('branch_id', sa.Integer()),
+    sa.column('current_grade', sa.String()),
+    sa.column('section', sa.String()),
+    sa.column('codes', sa.LargeBinary()),
+    sa.column('marked', sa.LargeBinary()),
+)
+
+
+def _student_batches(bind, table):
+    """Student ids having rows in ``table``, in batches (no open cursor while writing)"""
+    student_ids = bind.execute(
+        sa.select(table.c.student_id).distinct().order_by(table.c.student_id)
+    ).scalars().all()
+    for i in range(0, len(student_ids), BATCH_STUDENTS):
+        yield student_ids[i:i + BATCH_STUDENTS]
+
+
+def _pack_records(bind) -> None:
+    """Convert every attendance_records row into its packed student-month"""
+    for student_ids in _student_batches(bind, attendance_records):
+        months = {}
+        for row in bind.execute(
+            sa.select(attendance_records)
+            .where(attendance_records.c.student_id.in_(student_ids))
+            .order_by(attendance_records.c.attendance_date)
+        ):
+            if not 0 <= row.period < PERIODS_PER_DAY:
+                continue
+            key = (row.student_id, row.attendance_date.year, row.attendance_date.month)
+            month = months.setdefault(key, {'codes': 0, 'marked': 0})
+            slot = (row.attendance_date.day - 1) * PERIODS_PER_DAY + row.period
+            month['codes'] |= STATUS_CODES[row.status] << (2 * slot)
+            month['marked'] |= 1 << slot
+            # Rows are in date order, so the month row keeps the latest class
+            month.update(branch_id=row.branch_id, current_grade=row.current_grade, section=row.section)
+        if months:
+            bind.execute(attendance_months.insert(), [
+                {
+                    'student_id': student_id,
+                    'year': year,
+                    'month': month_number,
+                    'branch_id': month['branch_id'],
+                    'current_grade': month['current_grade'],
+                    'section': month['section'],
+                    'codes': month['codes'].to_bytes(CODES_BYTES, 'little'),
+                    'marked': month['marked'].to_bytes(MARKED_BYTES, 'little'),
+                }
+                for (student_id, year, month_number), month in months.items()
+            ])
+
+
+def _unpack_months(bind) -> None:
+    """Expand every packed student-month back into attendance_records rows"""
+    for student_ids in _student_batches(bind, attendance_months):
+        records = []
+        for row in bind.execute(
+            sa.select(attendance_months).where(attendance_months.c.student_id.in_(student_ids))
+        ):
+            codes, marked = int.from_bytes(row.codes, 'little'), int.from_bytes(row.marked, 'little')
+            for slot in range(DAYS_PER_MONTH * PERIODS_PER_DAY):
+                if not marked >> slot & 1:
+                    continue
+                day, period = divmod(slot, PERIODS_PER_DAY)
+                records.append({
+                    'student_id': row.student_id,
+                    'branch_id': row.branch_id,
+                    'current_grade': row.current_grade,
+                    'section': row.section,
+                    'attendance_date': date(row.year, row.month, day + 1),
+                    'period': period,
+                    'status': CODE_STATUS[codes >> (2 * slot) & 3],
+                })
+        if records:
+            bind.execute(attendance_records.insert(), records)
+
+
+def upgrade() -> None:
+    # One bit-packed row per student-month replaces one row per period
+    # (see app/modules/attendance/packing.py for the layout)
+    op.create_table(
+        'attendance_months',
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('year', sa.SmallInteger(), nullable=False),
+        sa.Column('month', sa.SmallInteger(), nullable=False),
+        sa.Column('branch_id', sa.Integer(), nullable=True),
+        sa.Column('current_grade', sa.String(length=20), nullable=False),
+        sa.Column('section', sa.String(length=10), nullable=False),
+        sa.Column('codes', sa.VARBINARY(length=78), nullable=False),
+        sa.Column('marked', sa.VARBINARY(length=39), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'), nullable=False),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['branch_id'], ['branches.id']),
+        sa.PrimaryKeyConstraint('student_id', 'year', 'month')
+    )
+    op.create_index('ix_attendance_months_class', 'attendance_months', ['current_grade', 'section', 'year', 'month'], unique=False)
+    op.create_index(op.f('ix_attendance_months_branch_id'), 'attendance_months', ['branch_id'], unique=False)
+
+    _pack_records(op.get_bind())
+
+    op.drop_index(op.f('ix_attendance_records_branch_id'), table_name='attendance_records')
+    op.drop_index('ix_attendance_class_period', table_name='attendance_records')
+    op.drop_table('attendance_records')
+
+
+def downgrade() -> None:
+    op.create_table(
+        'attendance_records',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('branch_id', sa.Integer(), nullable=True),
+        sa.Column('current_grade', sa.String(length=20), nullable=False),
+        sa.Column('section', sa.String(length=10), nullable=False),
+        sa.Column('attendance_date', sa.Date(), nullable=False),
+        sa.Column('period', sa.SmallInteger(), nullable=False),
+        sa.Column('status', sa.Enum('PRESENT', 'ABSENT', 'LATE', 'EXCUSED', name='attendancestatus'), nullable=False),
+        sa.Column('marked_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'), nullable=False),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['branch_id'], ['branches.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('student_id', 'attendance_date', 'period', name='uq_attendance_student_date_period')
+    )
+    op.create_index('ix_attendance_class_period', 'attendance_records', ['current_grade', 'section', 'attendance_date', 'period'], unique=False)
+    op.create_index(op.f('ix_attendance_records_branch_id'), 'attendance_records', ['branch_id'], unique=False)
+
+    _unpack_months(op.get_bind())
+
+    op.drop_table('attendance_months')
@@ -0,0 +1,91 @@
+"""add_fees_ledger
+
+Revision ID: f3c5a8e2b917
+Revises: e9b2f6c41d85
+Create Date: 2026-10-19 18:22:54.907113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c5a8e2b917'
+down_revision: Union[str, None] = 'e9b2f6c41d85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _timestamps():
+    return [
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        'fee_invoices',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('branch_id', sa.Integer(), nullable=True),
+        sa.Column('description', sa.String(length=255), nullable=False),
+        sa.Column('amount', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('amount_paid', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('amount_waived', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('status', sa.Enum('PENDING', 'PAID', 'PARTIAL', 'OVERDUE', 'CANCELLED', name='feestatus'), nullable=False),
+        sa.Column('issue_date', sa.Date(), nullable=False),
+        sa.Column('due_date', sa.Date(), nullable=False),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id']),
+        sa.ForeignKeyConstraint(['branch_id'], ['branches.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_fee_invoices_student_status', 'fee_invoices', ['student_id', 'status'], unique=False)
+    op.create_index(op.f('ix_fee_invoices_branch_id'), 'fee_invoices', ['branch_id'], unique=False)
+
+    # Append-only: rows are never updated or deleted by the application
+    op.create_table(
+        'fee_ledger',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('invoice_id', sa.Integer(), nullable=True),
+        sa.Column('entry_type', sa.Enum('INVOICE', 'PAYMENT', 'WAIVER', name='ledgerentrytype'), nullable=False),
+        sa.Column('amount', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('balance_after', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('reference', sa.String(length=100), nullable=True),
+        sa.Column('note', sa.String(length=500), nullable=True),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id']),
+        sa.ForeignKeyConstraint(['invoice_id'], ['fee_invoices.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_fee_ledger_student', 'fee_ledger', ['student_id', 'id'], unique=False)
+
+    # Precomputed balances, written in the same transaction as the ledger
+    op.create_table(
+        'student_balances',
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('branch_id', sa.Integer(), nullable=True),
+        sa.Column('balance', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('total_invoiced', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('total_paid', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('total_waived', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('oldest_due_date', sa.Date(), nullable=True),
+        sa.Column('last_entry_id', sa.BigInteger(), nullable=True),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['branch_id'], ['branches.id']),
+        sa.PrimaryKeyConstraint('student_id')
+    )
+    op.create_index(op.f('ix_student_balances_branch_id'), 'student_balances', ['branch_id'], unique=False)
+    op.create_index(op.f('ix_student_balances_oldest_due_date'), 'student_balances', ['oldest_due_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_table('student_balances')
+    op.drop_table('fee_ledger')
+    op.drop_table('fee_invoices')
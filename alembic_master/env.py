@@ -6,7 +6,7 @@ from alembic import context
 
 # Import master DB models
 from app.shared.base_models import MasterBase
-from app.tenancy.models import School, SuperAdmin
+from app.tenancy.models import School, SuperAdmin, TenantUsageSnapshot
 from app.config import settings
 
 # this is the Alembic Config object
@@ -0,0 +1,43 @@
+"""add_tenant_usage_snapshots
+
+Revision ID: 4e8a2c6d1f37
+Revises: 62f978228f28
+Create Date: 2026-10-19 11:02:17.554120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e8a2c6d1f37'
+down_revision: Union[str, None] = '62f978228f28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('tenant_usage_snapshots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('school_id', sa.Integer(), nullable=False),
+    sa.Column('students', sa.Integer(), nullable=False),
+    sa.Column('teachers', sa.Integer(), nullable=False),
+    sa.Column('users', sa.Integer(), nullable=False),
+    sa.Column('branches', sa.Integer(), nullable=False),
+    sa.Column('storage_bytes', sa.BigInteger(), nullable=False),
+    sa.Column('collected_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['school_id'], ['schools.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tenant_usage_snapshots_id'), 'tenant_usage_snapshots', ['id'], unique=False)
+    op.create_index(op.f('ix_tenant_usage_snapshots_collected_at'), 'tenant_usage_snapshots', ['collected_at'], unique=False)
+    op.create_index('ix_tenant_usage_snapshots_school_collected', 'tenant_usage_snapshots', ['school_id', 'collected_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tenant_usage_snapshots_school_collected', table_name='tenant_usage_snapshots')
+    op.drop_index(op.f('ix_tenant_usage_snapshots_collected_at'), table_name='tenant_usage_snapshots')
+    op.drop_index(op.f('ix_tenant_usage_snapshots_id'), table_name='tenant_usage_snapshots')
+    op.drop_table('tenant_usage_snapshots')
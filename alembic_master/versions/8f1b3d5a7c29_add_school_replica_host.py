@@ -0,0 +1,26 @@
+"""add_school_replica_host
+
+Revision ID: 8f1b3d5a7c29
+Revises: 4e8a2c6d1f37
+Create Date: 2026-10-19 12:31:05.117402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f1b3d5a7c29'
+down_revision: Union[str, None] = '4e8a2c6d1f37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('schools', sa.Column('db_replica_host', sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('schools', 'db_replica_host')
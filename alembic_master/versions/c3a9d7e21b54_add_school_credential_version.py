@@ -0,0 +1,26 @@
+"""add_school_credential_version
+
+Revision ID: c3a9d7e21b54
+Revises: 8f1b3d5a7c29
+Create Date: 2026-10-19 15:02:41.520913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a9d7e21b54'
+down_revision: Union[str, None] = '8f1b3d5a7c29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('schools', sa.Column('credential_version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('schools', 'credential_version')
@@ -10,6 +10,11 @@ class Settings(BaseSettings):
     APP_VERSION: str = "2.0.0"
     DEBUG: bool = False
     
+    # SQL monitoring
+    SLOW_QUERY_THRESHOLD_MS: int = 200
+    MAX_QUERIES_PER_REQUEST: int = 50  # Enforced only when DEBUG; 0 disables
+    METRICS_SCRAPE_TOKEN: str = ""  # Bearer token for /metrics; empty disables the endpoint
+    
     # Master Database (Control Plane)
     MASTER_DATABASE_URL: str
     
@@ -19,12 +24,61 @@ class Settings(BaseSettings):
     REDIS_DB: int = 0
     REDIS_PASSWORD: Optional[str] = None
     REDIS_URL: Optional[str] = None
+    REDIS_MAX_CONNECTIONS: int = 50  # Per worker process
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 0.5
+    TENANT_LOCAL_CACHE_SIZE: int = 1000  # In-process fallback while Redis is down
+    
+    # Tenant connection pools (per worker process)
+    TENANT_POOL_TIER_SIZES: dict[str, int] = {"basic": 5, "standard": 10, "premium": 20, "enterprise": 30}
+    TENANT_POOL_DEFAULT_SIZE: int = 5
+    TENANT_POOL_MIN_SIZE: int = 2
+    TENANT_POOL_IDLE_SECONDS: int = 300
+    WORKER_CONNECTION_BUDGET: int = 200  # Max open DB connections per worker (master + tenants); 0 disables
+    DB_BUDGET_QUEUE_TIMEOUT_SECONDS: float = 2.0
+    DB_BUDGET_MAX_QUEUE_PER_TENANT: int = 50
+    DB_BUDGET_RETRY_AFTER_SECONDS: int = 2
+    
+    # Tenant database circuit breaker
+    CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive connect failures before opening
+    CIRCUIT_RESET_TIMEOUT_SECONDS: int = 30
+    CIRCUIT_PROBE_TIMEOUT_SECONDS: float = 3.0
+    POOL_RESIZE_INTERVAL_SECONDS: int = 60  # 0 disables adaptive sizing
+    
+    # Cross-tenant fan-out (super admin analytics)
+    FANOUT_MAX_CONCURRENCY: int = 10
+    FANOUT_TENANT_TIMEOUT_SECONDS: float = 5.0
+    USAGE_SNAPSHOT_INTERVAL_SECONDS: int = 3600  # 0 disables the periodic job
+    
+    # Attendance reports
+    ATTENDANCE_CHRONIC_ABSENCE_PERCENT: float = 10.0  # Share of school days missed that flags a student
+    
+    # Fees
+    FEE_BATCH_CHUNK_SIZE: int = 500  # Students per invoice batch transaction
+    FEE_BATCH_STALE_SECONDS: int = 300  # A running batch without progress for this long may be resumed
+    FEE_OVERDUE_SWEEP_INTERVAL_SECONDS: int = 3600  # 0 disables the periodic sweep
+    FEE_OVERDUE_BATCH_SIZE: int = 200
+    FEE_OVERDUE_MAX_CONCURRENCY: int = 5  # Tenants swept at once
+    FEE_OVERDUE_TENANT_TIMEOUT_SECONDS: float = 60.0
+    
+    # Timetable
+    TIMETABLE_DAYS: int = 5  # Monday onwards
+    TIMETABLE_PERIODS_PER_DAY: int = 8
+    TIMETABLE_SOLVER_TIME_LIMIT_SECONDS: float = 10.0
+    TIMETABLE_PERIOD_STARTS: list[str] = [
+        "08:00", "08:45", "09:30", "10:30", "11:15", "12:00", "13:15", "14:00", "14:45"
+    ]  # Bell schedule, period 1 first
+    TIMETABLE_PERIOD_MINUTES: int = 40
+    TIMETABLE_TIMEZONE: str = "UTC"  # School-local time for "now" queries
+    TIMETABLE_INDEX_TTL_SECONDS: int = 300  # Conflict index rebuilt from the DB at least this often
+    TIMETABLE_INDEX_MAX_TENANTS: int = 256  # Conflict indexes kept per worker
     
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     TENANT_PASSWORD_ENCRYPTION_KEY: str
+    CREDENTIAL_CACHE_TTL_SECONDS: int = 3600  # Decrypted tenant URLs kept in memory
+    CREDENTIAL_SWEEP_INTERVAL_SECONDS: int = 60  # Expired URLs zeroized at least this often
     
     # CORS
     BACKEND_CORS_ORIGINS: list[str] = [
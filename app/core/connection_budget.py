@@ -0,0 +1,172 @@
+"""
+Per-process cap on open database connections, shared by the master engine
+and every tenant engine.
+
+Each physical connect (not each checkout of a pooled connection) takes a
+slot; closing the connection gives it back. When the budget is exhausted,
+connects wait in one FIFO queue per tenant and freed slots are handed to
+the queues round-robin, so one busy tenant cannot starve the others. A
+connect that cannot get a slot in time fails with ``ConnectionBudgetExceeded``
+(503 + Retry-After) instead of MySQL refusing the connection.
+"""
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from sqlalchemy import event
+from sqlalchemy.util import await_only
+from app.config import settings
+from app.core.exceptions import ServiceUnavailableException
+from app.core.metrics import registry, Counter, Gauge, InstrumentedAsyncQueuePool
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionBudgetExceeded(ServiceUnavailableException):
+    """No database connection could be opened within the process budget"""
+    def __init__(self):
+        super().__init__(
+            detail="Database connection capacity exhausted, please retry",
+            retry_after=settings.DB_BUDGET_RETRY_AFTER_SECONDS
+        )
+
+
+def budget_key(pool_name: str) -> str:
+    """Fairness key: 'master' or 'tenant:<id>' (primary and replica pools share it)"""
+    parts = (pool_name or "unknown").split(":")
+    return ":".join(parts[:2])
+
+
+class ConnectionBudget:
+    """Counting semaphore with per-tenant FIFO queues served round-robin"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        self.rejected = 0
+        # key -> waiting futures; order of keys is the round-robin order
+        self._queues: OrderedDict[str, deque] = OrderedDict()
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    async def acquire(self, key: str):
+        """Take one slot, waiting fairly behind other tenants if saturated"""
+        if self.limit <= 0:
+            return
+        # No barging: queued tenants are served before new arrivals
+        if self.in_use < self.limit and not self._queues:
+            self.in_use += 1
+            return
+
+        queue = self._queues.setdefault(key, deque())
+        if len(queue) >= settings.DB_BUDGET_MAX_QUEUE_PER_TENANT:
+            self._reject(key)
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, settings.DB_BUDGET_QUEUE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            self._discard(key, waiter)
+            self._reject(key)
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we were cancelled
+                self.release()
+            else:
+                self._discard(key, waiter)
+            raise
+
+    def release(self):
+        """Give a slot back, handing it directly to the next queued tenant"""
+        if self.limit <= 0:
+            return
+        while self._queues:
+            key, queue = next(iter(self._queues.items()))
+            waiter = queue.popleft()
+            if queue:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_use = max(self.in_use - 1, 0)
+
+    def _discard(self, key: str, waiter):
+        queue = self._queues.get(key)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del self._queues[key]
+
+    def _reject(self, key: str):
+        self.rejected += 1
+        BUDGET_REJECTIONS.inc(tenant=key)
+        logger.warning(f"Connection budget exhausted ({self.in_use}/{self.limit}), rejecting {key}")
+        raise ConnectionBudgetExceeded()
+
+
+def _release_on_close(dbapi_connection, connection_record):
+    connection_budget.release()
+
+
+def _release_on_close_detached(dbapi_connection):
+    connection_budget.release()
+
+
+class BudgetedAsyncQueuePool(InstrumentedAsyncQueuePool):
+    """Instrumented pool whose physical connects are admitted by ``connection_budget``"""
+
+    def __init__(self, creator, **kw):
+        super().__init__(creator, **kw)
+        # recreate() copies listeners over, so only add them once
+        if not event.contains(self, "close", _release_on_close):
+            event.listen(self, "close", _release_on_close)
+            event.listen(self, "close_detached", _release_on_close_detached)
+
+    def dispose(self):
+        self._disposed = True
+        super().dispose()
+
+    def _do_return_conn(self, record):
+        # Connections checked out when the engine was disposed (e.g. a pool
+        # resize) would otherwise sit in the dead pool holding budget slots
+        if self.__dict__.get("_disposed"):
+            record.close()
+            return
+        super()._do_return_conn(record)
+
+    def _should_wrap_creator(self, creator):
+        invoke_creator = super()._should_wrap_creator(creator)
+
+        def _budgeted_creator(connection_record):
+            await_only(connection_budget.acquire(budget_key(self._orig_logging_name)))
+            try:
+                return invoke_creator(connection_record)
+            except BaseException:
+                connection_budget.release()
+                raise
+
+        return _budgeted_creator
+
+
+# Global connection budget instance
+connection_budget = ConnectionBudget(settings.WORKER_CONNECTION_BUDGET)
+
+BUDGET_REJECTIONS = registry.register(Counter(
+    "db_connection_budget_rejections_total",
+    "Connects refused with 503 because the process connection budget was exhausted",
+    ("tenant",),
+))
+registry.register(Gauge(
+    "db_connection_budget_in_use",
+    "Open database connections counted against the process budget",
+    collect=lambda: [({}, connection_budget.in_use)],
+))
+registry.register(Gauge(
+    "db_connection_budget_waiting",
+    "Connects queued for a budget slot",
+    collect=lambda: [({}, connection_budget.waiting)],
+))
@@ -0,0 +1,394 @@
+"""
+In-process performance metrics with Prometheus text exposition.
+
+- ``MetricsMiddleware`` (pure ASGI) times every request and labels it with
+  the route template and the resolved tenant.
+- SQL statement count and DB time are accumulated per request by the
+  engine hooks in ``app/core/sql_monitor.py``.
+- ``InstrumentedAsyncQueuePool`` measures how long a checkout waits for a
+  pooled connection, split by master vs tenant pools; occupancy of every
+  live pool is exported as gauges (see ``register_pool_source``).
+
+Everything is kept in memory per worker process; scrape each worker.
+"""
+import math
+import time
+from contextvars import ContextVar
+from typing import Callable, Optional
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base class holding one labelled family"""
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+            *self._samples(),
+        ]
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter"""
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Gauge(_Metric):
+    """Point-in-time value; optionally computed by a callback at scrape time"""
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        collect: Optional[Callable[[], list[tuple[dict, float]]]] = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+        self._collect = collect
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def _samples(self) -> list[str]:
+        values = dict(self._values)
+        if self._collect:
+            for labels, value in self._collect():
+                values[self._key(labels)] = value
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values.items()
+        ]
+
+
+class Histogram(_Metric):
+    """Cumulative bucket histogram"""
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # key -> [bucket counts..., sum, count]
+        self._values: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[i] += 1
+                break
+        state[-2] += value
+        state[-1] += 1
+
+    def _samples(self) -> list[str]:
+        lines = []
+        for key, state in self._values.items():
+            cumulative = 0
+            for i, bound in enumerate(self.buckets):
+                cumulative += state[i]
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metric families rendered together"""
+
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route and tenant",
+    ("method", "route", "status", "tenant"),
+))
+REQUEST_DB_TIME = registry.register(Histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL per request",
+    ("route", "tenant"),
+))
+REQUEST_SQL_STATEMENTS = registry.register(Histogram(
+    "http_request_sql_statements",
+    "SQL statements executed per request",
+    ("route", "tenant"),
+    buckets=COUNT_BUCKETS,
+))
+POOL_WAIT = registry.register(Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to obtain a pooled connection (queue wait, connect and pre-ping)",
+    ("pool",),
+))
+UNHANDLED_EXCEPTIONS = registry.register(Counter(
+    "http_unhandled_exceptions_total",
+    "Requests that ended in an unhandled exception",
+    ("route", "exception"),
+))
+
+
+class RequestMetrics:
+    """Mutable per-request accumulator shared through a context variable"""
+    __slots__ = ("tenant", "route", "db_time", "statements", "fingerprints")
+
+    def __init__(self):
+        self.tenant: str = "none"
+        self.route: str = "unmatched"
+        self.db_time: float = 0.0
+        self.statements: int = 0
+        self.fingerprints: Optional[dict[str, int]] = None  # Only tracked when a query budget is enforced
+
+
+_request_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def current_request_metrics() -> Optional[RequestMetrics]:
+    """Metrics accumulator of the request being served, if any"""
+    return _request_metrics.get()
+
+
+def set_request_tenant(tenant: str):
+    """Label the current request with its resolved tenant"""
+    metrics = _request_metrics.get()
+    if metrics is not None:
+        metrics.tenant = tenant
+
+
+def pool_kind(logging_name: Optional[str]) -> str:
+    """'master' or 'tenant' from a pool logging name such as 'tenant:12'"""
+    return (logging_name or "unknown").split(":", 1)[0]
+
+
+class PoolUsageStats:
+    """Checkout wait totals and load observations for one pool instance"""
+    __slots__ = ("count", "total", "max", "peak_checked_out", "last_checkout")
+
+    def __init__(self):
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+        self.peak_checked_out: int = 0  # Reset by the pool sizer each interval
+        self.last_checkout: float = time.monotonic()
+
+    def record(self, elapsed: float, checked_out: int):
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+        if checked_out > self.peak_checked_out:
+            self.peak_checked_out = checked_out
+        self.last_checkout = time.monotonic()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that records checkout wait time.
+
+    The pool label comes from ``pool_logging_name`` (``master`` or
+    ``tenant:<id>``), which survives pool recreation on dispose. Per-pool
+    wait totals (``wait_stats``) start over when the pool is recreated.
+    """
+
+    @property
+    def wait_stats(self) -> PoolUsageStats:
+        stats = self.__dict__.get("_wait_stats")
+        if stats is None:
+            stats = self.__dict__["_wait_stats"] = PoolUsageStats()
+        return stats
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            elapsed = time.perf_counter() - started
+            POOL_WAIT.observe(elapsed, pool=pool_kind(self._orig_logging_name))
+            self.wait_stats.record(elapsed, self.checkedout())
+
+
+# Callables returning {pool name: pool}; registered by modules owning engines
+_pool_sources: list[Callable[[], dict]] = []
+
+
+def register_pool_source(source: Callable[[], dict]):
+    """Expose the pools returned by ``source`` on /health/pools and /metrics"""
+    _pool_sources.append(source)
+
+
+def pool_status(name: str, pool) -> dict:
+    """Occupancy and wait figures of one queue pool"""
+    status = {
+        "pool": name,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        # overflow() counts down from -pool_size until the base pool is full
+        "overflow": max(pool.overflow(), 0),
+        "idle": pool.checkedin(),
+        "max_overflow": getattr(pool, "_max_overflow", 0),
+    }
+    stats = pool.wait_stats if isinstance(pool, InstrumentedAsyncQueuePool) else None
+    status["wait_count"] = stats.count if stats else 0
+    status["wait_avg_ms"] = round(stats.total / stats.count * 1000, 3) if stats and stats.count else 0.0
+    status["wait_max_ms"] = round(stats.max * 1000, 3) if stats else 0.0
+    return status
+
+
+def pool_statuses() -> list[dict]:
+    """Status of every live pool from all registered sources"""
+    statuses = []
+    for source in _pool_sources:
+        for name, pool in source().items():
+            statuses.append(pool_status(name, pool))
+    return statuses
+
+
+def _pool_gauge(field: str, scale: Optional[float] = None):
+    def collect():
+        return [
+            ({"pool": s["pool"]}, s[field] * scale if scale else s[field])
+            for s in pool_statuses()
+        ]
+    return collect
+
+
+registry.register(Gauge("db_pool_size", "Configured base size of each pool", ("pool",), collect=_pool_gauge("size")))
+registry.register(Gauge("db_pool_checked_out", "Connections currently checked out", ("pool",), collect=_pool_gauge("checked_out")))
+registry.register(Gauge("db_pool_overflow", "Connections open beyond the base pool size", ("pool",), collect=_pool_gauge("overflow")))
+registry.register(Gauge("db_pool_idle", "Idle connections held by the pool", ("pool",), collect=_pool_gauge("idle")))
+registry.register(Gauge("db_pool_wait_max_seconds", "Longest checkout wait since the pool was created", ("pool",), collect=_pool_gauge("wait_max_ms", 0.001)))
+
+
+_route_templates: dict = {}
+
+
+def route_label(scope) -> str:
+    """Route template (e.g. /api/v1/branches/{branch_id}) of a routed request"""
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    label = _route_templates.get(endpoint)
+    if label is None:
+        app = scope.get("app")
+        for route in getattr(app, "routes", []):
+            if getattr(route, "endpoint", None) is endpoint:
+                label = route.path
+                break
+        else:
+            label = getattr(endpoint, "__name__", "unknown")
+        _route_templates[endpoint] = label
+    return label
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording per-route, per-tenant request metrics.
+    The accumulator is also stored on the scope as ``request_metrics`` so
+    outer exception handlers can read it after the context is reset.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        scope["request_metrics"] = metrics
+        token = _request_metrics.set(metrics)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = route_label(scope)
+            metrics.route = route
+            REQUEST_LATENCY.observe(
+                elapsed,
+                method=scope.get("method", ""),
+                route=route,
+                status=str(status_code),
+                tenant=metrics.tenant,
+            )
+            REQUEST_DB_TIME.observe(metrics.db_time, route=route, tenant=metrics.tenant)
+            REQUEST_SQL_STATEMENTS.observe(metrics.statements, route=route, tenant=metrics.tenant)
+            _request_metrics.reset(token)
+
+
+def render_metrics() -> str:
+    """Prometheus text exposition of every registered metric"""
+    return registry.render()
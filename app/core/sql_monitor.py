@@ -0,0 +1,121 @@
+"""
+SQLAlchemy cursor hooks for master and tenant engines.
+
+- Every statement is counted and timed, attributed to the current request
+  (see ``app/core/metrics.py``) and to the tenant taken from
+  ``session.info["tenant_id"]``.
+- Statements slower than ``SLOW_QUERY_THRESHOLD_MS`` are logged with a
+  normalized SQL fingerprint so repeated shapes group together.
+- With ``DEBUG`` on, a request that exceeds ``MAX_QUERIES_PER_REQUEST``
+  fails with ``QueryBudgetExceeded``, naming the most repeated fingerprint
+  (usually an N+1 loop).
+"""
+import logging
+import re
+import time
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.core.metrics import registry, Counter, Histogram, current_request_metrics
+
+logger = logging.getLogger(__name__)
+
+
+SQL_STATEMENTS = registry.register(Counter(
+    "db_sql_statements_total",
+    "SQL statements executed per tenant",
+    ("tenant",),
+))
+SQL_DURATION = registry.register(Histogram(
+    "db_sql_statement_seconds",
+    "SQL statement execution time per tenant",
+    ("tenant",),
+))
+SLOW_QUERIES = registry.register(Counter(
+    "db_slow_queries_total",
+    "SQL statements slower than SLOW_QUERY_THRESHOLD_MS",
+    ("tenant",),
+))
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in development when a request runs more SQL than allowed"""
+    pass
+
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|:\w+)(?:\s*,\s*(?:\?|%s|:\w+))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Normalize SQL so statements differing only in literals or IN-list
+    length share one fingerprint.
+    """
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("(?+)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+@event.listens_for(Session, "after_begin")
+def _tag_connection_with_tenant(session, transaction, connection):
+    """Carry the session's tenant onto the connection for the cursor hooks"""
+    tenant_id = session.info.get("tenant_id")
+    if tenant_id is not None:
+        connection.info["tenant_id"] = tenant_id
+
+
+def instrument_engine(engine, tenant_label: str = "master"):
+    """
+    Install counting, timing and slow-query hooks on an engine.
+
+    ``tenant_label`` is used for statements not issued through a tenant
+    session (e.g. master queries or fan-out connections).
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "checkin")
+    def _clear_tenant(dbapi_connection, connection_record):
+        connection_record.info.pop("tenant_id", None)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        metrics = current_request_metrics()
+        budget = settings.MAX_QUERIES_PER_REQUEST
+        if metrics is not None and settings.DEBUG and budget:
+            if metrics.fingerprints is None:
+                metrics.fingerprints = {}
+            fp = fingerprint(statement)
+            metrics.fingerprints[fp] = metrics.fingerprints.get(fp, 0) + 1
+            if metrics.statements >= budget:
+                worst, repeats = max(metrics.fingerprints.items(), key=lambda item: item[1])
+                raise QueryBudgetExceeded(
+                    f"Request {metrics.route} exceeded {budget} SQL statements "
+                    f"(most repeated x{repeats}: {worst})"
+                )
+        conn.info["_query_start"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info.pop("_query_start", time.perf_counter())
+        tenant = str(conn.info.get("tenant_id", tenant_label))
+
+        SQL_STATEMENTS.inc(tenant=tenant)
+        SQL_DURATION.observe(elapsed, tenant=tenant)
+
+        metrics = current_request_metrics()
+        if metrics is not None:
+            metrics.db_time += elapsed
+            metrics.statements += 1
+
+        if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+            SLOW_QUERIES.inc(tenant=tenant)
+            logger.warning(
+                f"Slow SQL {elapsed * 1000:.0f}ms tenant={tenant} "
+                f"route={metrics.route if metrics else '-'} sql={fingerprint(statement)}"
+            )
+
+    return engine
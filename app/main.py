@@ -7,15 +7,27 @@ if not hasattr(bcrypt, "__about__"):
         __version__ = bcrypt.__version__
     bcrypt.__about__ = About
 
+import asyncio
+import hmac
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Request, Depends, Header, HTTPException, status
+import logging
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
+from app.core.metrics import MetricsMiddleware, UNHANDLED_EXCEPTIONS, route_label, render_metrics, pool_statuses
+from app.core.dependencies import get_current_super_admin
+
+logger = logging.getLogger(__name__)
 
 # Import tenant cache for startup/shutdown
 from app.tenancy.cache import tenant_cache
 from app.tenancy.manager import connection_manager
+from app.tenancy.circuit_breaker import circuit_breakers
+from app.tenancy.usage import run_usage_snapshot_loop
+from app.tenancy.pool_sizing import run_pool_sizing_loop
+from app.tenancy.credentials import run_credential_sweep_loop
+from app.modules.fees.overdue import run_overdue_sweep_loop
 
 
 @asynccontextmanager
@@ -28,12 +40,37 @@ async def lifespan(app: FastAPI):
     
     # Initialize Redis connection
     await tenant_cache.connect()
-    print("✅ Redis cache connected")
+    
+    # Periodic cross-tenant usage snapshots
+    snapshot_task = None
+    if settings.USAGE_SNAPSHOT_INTERVAL_SECONDS > 0:
+        snapshot_task = asyncio.create_task(run_usage_snapshot_loop())
+        print(f"📈 Usage snapshots every {settings.USAGE_SNAPSHOT_INTERVAL_SECONDS}s")
+    
+    # Adaptive tenant pool sizing
+    sizing_task = None
+    if settings.POOL_RESIZE_INTERVAL_SECONDS > 0:
+        sizing_task = asyncio.create_task(run_pool_sizing_loop())
+    
+    # Overdue fee sweeps across tenants
+    overdue_task = None
+    if settings.FEE_OVERDUE_SWEEP_INTERVAL_SECONDS > 0:
+        overdue_task = asyncio.create_task(run_overdue_sweep_loop())
+    
+    # Zeroize expired tenant credentials held by this worker
+    credential_task = None
+    if settings.CREDENTIAL_SWEEP_INTERVAL_SECONDS > 0:
+        credential_task = asyncio.create_task(run_credential_sweep_loop())
     
     yield
     
     # Shutdown
     print("🛑 Shutting down...")
+    background = [task for task in (snapshot_task, sizing_task, overdue_task, credential_task) if task]
+    for task in background:
+        task.cancel()
+    # Let cancelled jobs unwind (close sessions, release pooled connections) before pools close
+    await asyncio.gather(*background, return_exceptions=True)
     await tenant_cache.disconnect()
     await connection_manager.close_all()
     print("✅ All connections closed")
@@ -58,12 +95,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route / per-tenant latency, SQL count and DB time (served on /metrics)
+app.add_middleware(MetricsMiddleware)
+
 # Global Exception Handler for debugging production 500s
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
-    import traceback
-    print(f"❌ GLOBAL ERROR: {str(exc)}")
-    print(traceback.format_exc())
+    metrics = request.scope.get("request_metrics")
+    UNHANDLED_EXCEPTIONS.inc(route=route_label(request.scope), exception=type(exc).__name__)
+    logger.exception(
+        f"❌ GLOBAL ERROR on {request.method} {request.url.path} "
+        f"(tenant={metrics.tenant if metrics else 'none'}): {exc}",
+        exc_info=exc
+    )
     return JSONResponse(
         status_code=500,
         content={"detail": "Internal Server Error", "error_type": type(exc).__name__, "message": str(exc)}
@@ -93,10 +137,46 @@ async def health_check():
     return {
         "status": "healthy",
         "redis": "connected" if tenant_cache.redis else "disconnected",
+        "open_circuits": len(circuit_breakers.statuses()),
         "version": "2.0.0"
     }
 
 
+@app.get("/health/pools")
+async def health_pools(current_admin: dict = Depends(get_current_super_admin)):
+    """
+    Connection pool occupancy for the master engine and every live tenant
+    engine in this worker, plus tenant circuit breakers that are not closed
+    (super admin only)
+    """
+    pools = pool_statuses()
+    return {
+        "pools": pools,
+        "circuit_breakers": circuit_breakers.statuses(),
+        "saturated": [p["pool"] for p in pools if p["checked_out"] >= p["size"] and p["idle"] == 0],
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(authorization: str = Header("")):
+    """
+    Prometheus metrics for this worker process. Labels include tenant
+    subdomains, so scrapers must send ``Authorization: Bearer
+    <METRICS_SCRAPE_TOKEN>``; without a configured token the endpoint is off.
+    """
+    token = settings.METRICS_SCRAPE_TOKEN
+    if not token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    scheme, _, credentials = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(credentials.encode(), token.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics scrape token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 # Note: Module routers will be added here after async conversion
 # Example:
 # from app.modules.students.router import router as students_router
@@ -117,12 +197,33 @@ app.include_router(notes_router, prefix="/api/v1/master/notes", tags=["Personal
 from app.modules.tickets.router import router as tickets_router
 app.include_router(tickets_router, prefix="/api/v1/master/tickets", tags=["Support Tickets (Master)"])
 
+from app.modules.analytics.router import router as analytics_router
+app.include_router(analytics_router, prefix="/api/v1/master/analytics", tags=["Cross-Tenant Analytics (Master)"])
+
 from app.modules.branches.router import router as branches_router
 app.include_router(branches_router, prefix="/api/v1/branches", tags=["Branches"])
 
 from app.modules.branch_admin.router import router as branch_admin_router
 app.include_router(branch_admin_router, prefix="/api/v1/branch", tags=["Branch Admin"])
 
+from app.modules.students.router import router as students_router
+app.include_router(students_router, prefix="/api/v1/students", tags=["Students"])
+
+from app.modules.teachers.router import router as teachers_router
+app.include_router(teachers_router, prefix="/api/v1/teachers", tags=["Teachers"])
+
+from app.modules.attendance.router import router as attendance_router
+app.include_router(attendance_router, prefix="/api/v1/attendance", tags=["Attendance"])
+
+from app.modules.fees.router import router as fees_router
+app.include_router(fees_router, prefix="/api/v1/fees", tags=["Fees"])
+
+from app.modules.marks.router import router as marks_router
+app.include_router(marks_router, prefix="/api/v1/marks", tags=["Marks"])
+
+from app.modules.timetable.router import router as timetable_router
+app.include_router(timetable_router, prefix="/api/v1/timetable", tags=["Timetable"])
+
 print("\n" + "="*60)
 print("🏫 Mindwhile ERP - Multi-Tenant Architecture v2.0")
 print("="*60)
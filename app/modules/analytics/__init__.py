@@ -0,0 +1 @@
+"""Cross-tenant analytics for super admins (master-level)"""
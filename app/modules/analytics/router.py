@@ -0,0 +1,185 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Optional
+from datetime import datetime
+from app.tenancy.database import get_master_db
+from app.tenancy.models import School, TenantUsageSnapshot
+from app.tenancy.fanout import fanout_executor
+from app.tenancy.usage import collect_usage_snapshots, get_latest_snapshots
+from app.core.dependencies import get_current_super_admin
+from app.config import settings
+from .schemas import (
+    TenantOverview,
+    TenantFailure,
+    OverviewTotals,
+    CrossTenantOverviewResponse,
+    UsageSnapshotResponse,
+    UsageTotals,
+    UsageSnapshotListResponse,
+    UsageCollectResponse
+)
+
+router = APIRouter()
+
+
+# Single round trip per tenant; every tenant DB shares this schema
+TENANT_OVERVIEW_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM students) AS students,
+        (SELECT COUNT(*) FROM teachers) AS teachers,
+        (SELECT COUNT(*) FROM users WHERE is_active = 1) AS active_users,
+        (SELECT COUNT(*) FROM branches) AS branches
+"""
+
+
+@router.get("/overview", response_model=CrossTenantOverviewResponse)
+async def get_cross_tenant_overview(
+    school_ids: Optional[list[int]] = Query(None, description="Limit to these schools"),
+    max_concurrency: int = Query(
+        settings.FANOUT_MAX_CONCURRENCY, ge=1, le=50,
+        description="Tenant databases queried in parallel"
+    ),
+    timeout: float = Query(
+        settings.FANOUT_TENANT_TIMEOUT_SECONDS, gt=0, le=30,
+        description="Per-tenant timeout in seconds"
+    ),
+    current_admin=Depends(get_current_super_admin),
+    db: AsyncSession = Depends(get_master_db)
+):
+    """
+    Live students / teachers / active users / branches for every active school.
+
+    Queries run concurrently against each tenant database. Schools that fail
+    or time out are listed under `failures` and excluded from `totals`.
+
+    Only accessible by SUPER_ADMIN.
+    """
+    query = select(School).where(School.is_active == True)
+    if school_ids:
+        query = query.where(School.id.in_(school_ids))
+    result = await db.execute(query.order_by(School.id))
+    schools = result.scalars().all()
+
+    fanout = await fanout_executor.run(
+        schools,
+        TENANT_OVERVIEW_SQL,
+        max_concurrency=max_concurrency,
+        timeout=timeout
+    )
+
+    tenants = []
+    totals = OverviewTotals()
+    for r in fanout.succeeded:
+        row = r.rows[0] if r.rows else {}
+        overview = TenantOverview(
+            school_id=r.tenant_id,
+            subdomain=r.subdomain,
+            name=r.name,
+            students=row.get("students") or 0,
+            teachers=row.get("teachers") or 0,
+            active_users=row.get("active_users") or 0,
+            branches=row.get("branches") or 0,
+            elapsed_ms=r.elapsed_ms,
+        )
+        tenants.append(overview)
+        totals.students += overview.students
+        totals.teachers += overview.teachers
+        totals.active_users += overview.active_users
+        totals.branches += overview.branches
+
+    failures = [
+        TenantFailure(
+            school_id=r.tenant_id,
+            subdomain=r.subdomain,
+            name=r.name,
+            error=r.error or "Unknown error",
+        )
+        for r in fanout.failed
+    ]
+
+    return CrossTenantOverviewResponse(
+        tenants=tenants,
+        failures=failures,
+        totals=totals,
+        tenants_queried=len(fanout.results),
+        tenants_succeeded=len(tenants),
+        elapsed_ms=fanout.elapsed_ms,
+    )
+
+
+@router.get("/usage/latest", response_model=UsageSnapshotListResponse)
+async def get_latest_usage(
+    current_admin=Depends(get_current_super_admin),
+    db: AsyncSession = Depends(get_master_db)
+):
+    """
+    Latest stored usage snapshot for every school.
+
+    Reads only the master `tenant_usage_snapshots` table; no tenant database
+    is contacted. Only accessible by SUPER_ADMIN.
+    """
+    snapshots = await get_latest_snapshots(db)
+
+    totals = UsageTotals()
+    for s in snapshots:
+        totals.students += s.students
+        totals.teachers += s.teachers
+        totals.users += s.users
+        totals.branches += s.branches
+        totals.storage_bytes += s.storage_bytes
+
+    return UsageSnapshotListResponse(
+        snapshots=[UsageSnapshotResponse.model_validate(s) for s in snapshots],
+        totals=totals
+    )
+
+
+@router.get("/usage/{school_id}/history", response_model=list[UsageSnapshotResponse])
+async def get_usage_history(
+    school_id: int,
+    since: Optional[datetime] = Query(None, description="Only snapshots collected after this time"),
+    limit: int = Query(100, ge=1, le=1000),
+    current_admin=Depends(get_current_super_admin),
+    db: AsyncSession = Depends(get_master_db)
+):
+    """
+    Usage snapshot history for one school, newest first.
+
+    Only accessible by SUPER_ADMIN.
+    """
+    query = select(TenantUsageSnapshot).where(TenantUsageSnapshot.school_id == school_id)
+    if since:
+        query = query.where(TenantUsageSnapshot.collected_at > since)
+    query = query.order_by(TenantUsageSnapshot.collected_at.desc()).limit(limit)
+
+    result = await db.execute(query)
+    return [UsageSnapshotResponse.model_validate(s) for s in result.scalars().all()]
+
+
+@router.post("/usage/collect", response_model=UsageCollectResponse)
+async def collect_usage_now(
+    current_admin=Depends(get_current_super_admin)
+):
+    """
+    Collect a usage snapshot from every active school immediately,
+    outside the periodic schedule.
+
+    Only accessible by SUPER_ADMIN.
+    """
+    fanout = await collect_usage_snapshots()
+
+    return UsageCollectResponse(
+        tenants_queried=len(fanout.results),
+        tenants_succeeded=len(fanout.succeeded),
+        failures=[
+            TenantFailure(
+                school_id=r.tenant_id,
+                subdomain=r.subdomain,
+                name=r.name,
+                error=r.error or "Unknown error",
+            )
+            for r in fanout.failed
+        ],
+        elapsed_ms=fanout.elapsed_ms,
+    )
@@ -0,0 +1,76 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+
+
+class TenantOverview(BaseModel):
+    """Live entity counts for one school"""
+    school_id: int
+    subdomain: str
+    name: str
+    students: int = 0
+    teachers: int = 0
+    active_users: int = 0
+    branches: int = 0
+    elapsed_ms: float
+
+
+class TenantFailure(BaseModel):
+    """A school whose fan-out leg failed or timed out"""
+    school_id: int
+    subdomain: str
+    name: str
+    error: str
+
+
+class OverviewTotals(BaseModel):
+    """Sums across all schools that answered"""
+    students: int = 0
+    teachers: int = 0
+    active_users: int = 0
+    branches: int = 0
+
+
+class CrossTenantOverviewResponse(BaseModel):
+    """Merged cross-tenant overview with partial-failure reporting"""
+    tenants: list[TenantOverview]
+    failures: list[TenantFailure]
+    totals: OverviewTotals
+    tenants_queried: int
+    tenants_succeeded: int
+    elapsed_ms: float
+
+
+class UsageSnapshotResponse(BaseModel):
+    """One stored usage snapshot for a school"""
+    school_id: int
+    students: int
+    teachers: int
+    users: int
+    branches: int
+    storage_bytes: int
+    collected_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
+
+
+class UsageTotals(BaseModel):
+    """Sums across the latest snapshot of every school"""
+    students: int = 0
+    teachers: int = 0
+    users: int = 0
+    branches: int = 0
+    storage_bytes: int = 0
+
+
+class UsageSnapshotListResponse(BaseModel):
+    """Latest snapshot per school with fleet-wide totals"""
+    snapshots: list[UsageSnapshotResponse]
+    totals: UsageTotals
+
+
+class UsageCollectResponse(BaseModel):
+    """Result of an on-demand snapshot collection"""
+    tenants_queried: int
+    tenants_succeeded: int
+    failures: list[TenantFailure]
+    elapsed_ms: float
@@ -0,0 +1,35 @@
+from sqlalchemy import String, SmallInteger, ForeignKey, Index, VARBINARY
+from sqlalchemy.orm import Mapped, mapped_column
+from app.shared.base_models import BaseModel
+from app.modules.attendance.packing import CODES_BYTES, MARKED_BYTES
+
+
+class AttendanceMonth(BaseModel):
+    """
+    One student's attendance for one calendar month, bit-packed.
+
+    ``codes`` / ``marked`` are the packed slot grid described in
+    ``app.modules.attendance.packing``; a year of history is at most twelve
+    ~120 byte rows. ``current_grade`` / ``section`` snapshot the class the
+    student was last marked in, so a class roll can be read back or
+    re-marked after the student moves on.
+    """
+    __tablename__ = "attendance_months"
+    __table_args__ = (
+        Index("ix_attendance_months_class", "current_grade", "section", "year", "month"),
+    )
+
+    student_id: Mapped[int] = mapped_column(ForeignKey("students.id", ondelete="CASCADE"), primary_key=True)
+    year: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    month: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    branch_id: Mapped[int] = mapped_column(ForeignKey("branches.id"), nullable=True, index=True)
+
+    # Class snapshot
+    current_grade: Mapped[str] = mapped_column(String(20), nullable=False)
+    section: Mapped[str] = mapped_column(String(10), nullable=False, default="")
+
+    codes: Mapped[bytes] = mapped_column(VARBINARY(CODES_BYTES), nullable=False)
+    marked: Mapped[bytes] = mapped_column(VARBINARY(MARKED_BYTES), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<AttendanceMonth student={self.student_id} {self.year}-{self.month:02d}>"
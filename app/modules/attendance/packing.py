@@ -0,0 +1,134 @@
+"""
+Bit-packed monthly attendance.
+
+One ``attendance_months`` row holds a student's whole month as a grid of
+``DAYS_PER_MONTH x PERIODS_PER_DAY`` slots:
+
+- ``codes``:  2 bits per slot, the ``AttendanceStatus`` code (see STATUS_CODES)
+- ``marked``: 1 bit per slot, set once the slot has been marked
+
+Both are little-endian within each byte, and unmarked slots always carry
+code 0 (the decoder relies on it). Decoded grids are ``int8`` arrays
+with ``UNMARKED`` (-1) for slots nobody marked, so statistics are plain
+vectorized NumPy over one or many months (a year is a (12, 31, 10) stack).
+"""
+import numpy as np
+from app.shared.enums import AttendanceStatus
+
+
+DAYS_PER_MONTH = 31
+PERIODS_PER_DAY = 10  # Period 0 is whole-day attendance
+SLOTS = DAYS_PER_MONTH * PERIODS_PER_DAY
+CODES_BYTES = (SLOTS * 2 + 7) // 8
+MARKED_BYTES = (SLOTS + 7) // 8
+
+UNMARKED = -1
+STATUS_CODES = {
+    AttendanceStatus.PRESENT: 0,
+    AttendanceStatus.ABSENT: 1,
+    AttendanceStatus.LATE: 2,
+    AttendanceStatus.EXCUSED: 3,
+}
+CODE_STATUS = tuple(STATUS_CODES)
+PRESENT, ABSENT, LATE, EXCUSED = (STATUS_CODES[s] for s in CODE_STATUS)
+
+
+def empty_month() -> np.ndarray:
+    return np.full((DAYS_PER_MONTH, PERIODS_PER_DAY), UNMARKED, dtype=np.int8)
+
+
+def encode_month(grid: np.ndarray) -> tuple[bytes, bytes]:
+    """(codes, marked) column values for a decoded month grid"""
+    flat = grid.reshape(-1)
+    marked = flat != UNMARKED
+    codes = np.where(marked, flat, 0).astype(np.uint8)
+    # Low bit first, so slot i occupies bits 2i and 2i + 1
+    code_bits = np.stack([codes & 1, codes >> 1], axis=1).reshape(-1)
+    return (
+        np.packbits(code_bits, bitorder="little").tobytes(),
+        np.packbits(marked, bitorder="little").tobytes(),
+    )
+
+
+def decode_month(codes: bytes, marked: bytes) -> np.ndarray:
+    """Month grid (DAYS_PER_MONTH, PERIODS_PER_DAY) of status codes / UNMARKED"""
+    if not codes:
+        return empty_month()
+    return decode_months([codes], [marked])[0]
+
+
+def decode_months(codes: list[bytes], marked: list[bytes]) -> np.ndarray:
+    """Batch decode: (len(codes), DAYS_PER_MONTH, PERIODS_PER_DAY)"""
+    n = len(codes)
+    if not n:
+        return np.empty((0, DAYS_PER_MONTH, PERIODS_PER_DAY), dtype=np.int8)
+    code_bits = np.unpackbits(
+        np.frombuffer(b"".join(codes), dtype=np.uint8).reshape(n, CODES_BYTES),
+        axis=1, count=SLOTS * 2, bitorder="little"
+    ).view(np.int8)
+    is_marked = np.unpackbits(
+        np.frombuffer(b"".join(marked), dtype=np.uint8).reshape(n, MARKED_BYTES),
+        axis=1, count=SLOTS, bitorder="little"
+    ).view(np.int8)
+    flat = code_bits[:, 1::2] * np.int8(2)
+    flat += code_bits[:, ::2]
+    # Unmarked slots are encoded with code 0, so this maps them to UNMARKED
+    flat += is_marked
+    flat -= 1
+    return flat.reshape(n, DAYS_PER_MONTH, PERIODS_PER_DAY)
+
+
+def status_counts(grid: np.ndarray) -> dict[AttendanceStatus, int]:
+    """Marked slots per status over any stack of month grids"""
+    counts = np.bincount(grid[grid != UNMARKED], minlength=len(CODE_STATUS))
+    return {status: int(counts[code]) for status, code in STATUS_CODES.items()}
+
+
+def attendance_percentage(counts: dict[AttendanceStatus, int]) -> float | None:
+    """Present or late over marked slots, excused slots not counted"""
+    attended = counts[AttendanceStatus.PRESENT] + counts[AttendanceStatus.LATE]
+    expected = attended + counts[AttendanceStatus.ABSENT]
+    return round(attended * 100 / expected, 2) if expected else None
+
+
+def daily_status(grid: np.ndarray) -> np.ndarray:
+    """
+    One code per day of the grid (or stack of grids): period 0 when marked,
+    otherwise the worst marked period; UNMARKED for days without marks
+    """
+    # Periods as rows so every step below is a contiguous pass
+    periods = np.ascontiguousarray(grid.reshape(-1, PERIODS_PER_DAY).T)
+    # (3 * code) mod 4 ranks PRESENT < EXCUSED < LATE < ABSENT and is its
+    # own inverse; +1 leaves 0 for unmarked slots
+    severity = (periods * 3) & 3
+    severity += 1
+    severity *= periods != UNMARKED
+    worst = severity.max(axis=0)
+    worst_code = np.where(worst > 0, ((worst - 1) * 3) & 3, UNMARKED)
+    return np.where(periods[0] != UNMARKED, periods[0], worst_code).astype(np.int8)
+
+
+def _longest_run(flags: np.ndarray) -> int:
+    if not flags.any():
+        return 0
+    # Run lengths of True between False boundaries
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], flags.view(np.int8), [0]))))
+    return int((edges[1::2] - edges[::2]).max())
+
+
+def streaks(grid: np.ndarray) -> tuple[int, int]:
+    """
+    (current, longest) runs of consecutive attended school days.
+
+    ``grid`` is months stacked in calendar order. Days without any marked
+    slot (weekends, holidays, days past month end) are skipped; a day with
+    any ABSENT slot breaks the run.
+    """
+    days = grid.reshape(-1, PERIODS_PER_DAY)
+    school_days = days[(days != UNMARKED).any(axis=1)]
+    attended = ~(school_days == ABSENT).any(axis=1)
+    if not attended.size:
+        return 0, 0
+    misses = np.flatnonzero(~attended)
+    current = attended.size - (misses[-1] + 1) if misses.size else attended.size
+    return int(current), _longest_run(attended)
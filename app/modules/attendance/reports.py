@@ -0,0 +1,259 @@
+"""
+Vectorized attendance reports.
+
+A class or branch and a run of months are loaded as packed month rows and
+decoded in one batch into a ``(students, days)`` matrix of daily status
+codes (see ``packing.daily_status``). Every figure in the report is a
+NumPy reduction over that matrix; nothing loops per student or per day.
+Reports are streamed out as CSV or JSON.
+"""
+import csv
+import io
+import json
+from dataclasses import dataclass
+from typing import Iterator, Optional
+import numpy as np
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.shared.enums import DayOfWeek
+from app.modules.attendance import packing
+from app.modules.attendance.models import AttendanceMonth
+from app.modules.students.models import Student
+
+
+WEEKDAYS = tuple(DayOfWeek)  # Monday first, like date.weekday()
+STREAM_CHUNK_ROWS = 500
+
+CSV_COLUMNS = (
+    "student_id", "admission_number", "name", "school_days",
+    "present", "late", "absent", "excused", "percentage", "chronic_absentee",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class AttendanceReport:
+    """Per-student and aggregate figures for one class or branch period"""
+    year: int
+    month: int
+    months: int
+    student_ids: np.ndarray      # (n,)
+    admission_numbers: list[str]
+    names: list[str]
+    counts: np.ndarray           # (n, 4) school days per status code
+    percentage: np.ndarray       # (n,) attended / expected, NaN if never expected
+    chronic: np.ndarray          # (n,) bool
+    weekday_absences: np.ndarray  # (7,) absent student-days per weekday
+    weekday_marked: np.ndarray   # (7,) marked student-days per weekday
+
+    @property
+    def school_days(self) -> np.ndarray:
+        return self.counts.sum(axis=1)
+
+    def summary(self) -> dict:
+        totals = self.counts.sum(axis=0)
+        expected = totals[packing.PRESENT] + totals[packing.LATE] + totals[packing.ABSENT]
+        attended = totals[packing.PRESENT] + totals[packing.LATE]
+        return {
+            "year": self.year,
+            "month": self.month,
+            "months": self.months,
+            "students": int(self.student_ids.size),
+            "counts": {status.value: int(totals[code]) for status, code in packing.STATUS_CODES.items()},
+            "percentage": round(float(attended * 100 / expected), 2) if expected else None,
+            "chronic_absentees": int(self.chronic.sum()),
+        }
+
+    def day_of_week(self) -> dict:
+        """Absence rate per weekday (absent / marked student-days)"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rate = np.round(self.weekday_absences * 100 / self.weekday_marked, 2)
+        return {
+            day.value: {
+                "marked": int(self.weekday_marked[i]),
+                "absent": int(self.weekday_absences[i]),
+                "absence_rate": None if np.isnan(rate[i]) else float(rate[i]),
+            }
+            for i, day in enumerate(WEEKDAYS)
+        }
+
+    def rows(self, order: Optional[np.ndarray] = None) -> Iterator[tuple]:
+        """One tuple per student in CSV_COLUMNS order"""
+        order = np.arange(self.student_ids.size) if order is None else order
+        percentage = np.round(self.percentage, 2)
+        for i in order.tolist():
+            pct = percentage[i]
+            yield (
+                int(self.student_ids[i]), self.admission_numbers[i], self.names[i],
+                int(self.counts[i].sum()),
+                int(self.counts[i, packing.PRESENT]), int(self.counts[i, packing.LATE]),
+                int(self.counts[i, packing.ABSENT]), int(self.counts[i, packing.EXCUSED]),
+                None if np.isnan(pct) else float(pct), bool(self.chronic[i]),
+            )
+
+    def chronic_order(self) -> np.ndarray:
+        """Chronic absentees, lowest attendance first"""
+        flagged = np.flatnonzero(self.chronic)
+        return flagged[np.argsort(self.percentage[flagged], kind="stable")]
+
+    def late_order(self, limit: int = 20) -> np.ndarray:
+        """Students with the most late days"""
+        late = self.counts[:, packing.LATE]
+        order = np.argsort(-late, kind="stable")[:limit]
+        return order[late[order] > 0]
+
+
+def month_dates(year: int, month: int, months: int) -> np.ndarray:
+    """
+    ``datetime64[D]`` per day column of a ``months x DAYS_PER_MONTH`` grid,
+    NaT for slots past the end of a month
+    """
+    firsts = np.arange(
+        np.datetime64(f"{year:04d}-{month:02d}", "M"),
+        np.datetime64(f"{year:04d}-{month:02d}", "M") + months,
+    )
+    dates = firsts.astype("datetime64[D]")[:, None] + np.arange(packing.DAYS_PER_MONTH)
+    in_month = dates.astype("datetime64[M]") == firsts[:, None]
+    return np.where(in_month, dates, np.datetime64("NaT")).reshape(-1)
+
+
+def build_report(
+    year: int,
+    month: int,
+    months: int,
+    student_ids: np.ndarray,
+    admission_numbers: list[str],
+    names: list[str],
+    row_students: np.ndarray,
+    row_months: np.ndarray,
+    grids: np.ndarray,
+) -> AttendanceReport:
+    """
+    Compute a report from decoded month grids.
+
+    ``grids[r]`` belongs to student ``student_ids[row_students[r]]`` and to
+    month offset ``row_months[r]`` (0 = the first month of the report).
+    """
+    n = student_ids.size
+    daily = packing.daily_status(grids).reshape(-1, packing.DAYS_PER_MONTH)
+    days = np.full((n, months, packing.DAYS_PER_MONTH), packing.UNMARKED, dtype=np.int8)
+    days[row_students, row_months] = daily
+    days = days.reshape(n, months * packing.DAYS_PER_MONTH)
+
+    dates = month_dates(year, month, months)
+    valid = ~np.isnat(dates)
+    days, dates = days[:, valid], dates[valid]
+
+    counts = np.stack([(days == code).sum(axis=1) for code in range(len(packing.CODE_STATUS))], axis=1)
+    attended = counts[:, packing.PRESENT] + counts[:, packing.LATE]
+    expected = attended + counts[:, packing.ABSENT]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        percentage = attended * 100 / expected
+        chronic = counts[:, packing.ABSENT] * 100 / expected >= settings.ATTENDANCE_CHRONIC_ABSENCE_PERCENT
+
+    # 1970-01-01 was a Thursday; shift so Monday is 0
+    weekday = (dates.astype(np.int64) + 3) % 7
+    weekday_absences = np.bincount(weekday, weights=(days == packing.ABSENT).sum(axis=0), minlength=7)
+    weekday_marked = np.bincount(weekday, weights=(days != packing.UNMARKED).sum(axis=0), minlength=7)
+
+    return AttendanceReport(
+        year=year,
+        month=month,
+        months=months,
+        student_ids=student_ids,
+        admission_numbers=admission_numbers,
+        names=names,
+        counts=counts,
+        percentage=percentage,
+        chronic=chronic & (expected > 0),
+        weekday_absences=weekday_absences.astype(np.int64),
+        weekday_marked=weekday_marked.astype(np.int64),
+    )
+
+
+async def load_report(
+    db: AsyncSession,
+    year: int,
+    month: int,
+    months: int = 1,
+    current_grade: Optional[str] = None,
+    section: Optional[str] = None,
+    branch_id: Optional[int] = None,
+) -> AttendanceReport:
+    """Load and compute the report for a class (grade + section) or a branch"""
+    first = year * 12 + month - 1
+    last = first + months - 1
+    query = (
+        select(
+            AttendanceMonth.student_id, AttendanceMonth.year, AttendanceMonth.month,
+            AttendanceMonth.codes, AttendanceMonth.marked,
+            Student.admission_number, Student.first_name, Student.last_name,
+        )
+        .join(Student, Student.id == AttendanceMonth.student_id)
+        .where(
+            tuple_(AttendanceMonth.year, AttendanceMonth.month) >= (first // 12, first % 12 + 1),
+            tuple_(AttendanceMonth.year, AttendanceMonth.month) <= (last // 12, last % 12 + 1),
+        )
+        .order_by(AttendanceMonth.student_id)
+    )
+    if current_grade is not None:
+        query = query.where(
+            AttendanceMonth.current_grade == current_grade,
+            AttendanceMonth.section == (section or ""),
+        )
+    if branch_id is not None:
+        query = query.where(AttendanceMonth.branch_id == branch_id)
+
+    rows = (await db.execute(query)).all()
+
+    row_student_ids = np.fromiter((r.student_id for r in rows), dtype=np.int64, count=len(rows))
+    student_ids, first_row, row_students = np.unique(row_student_ids, return_index=True, return_inverse=True)
+    row_months = np.fromiter((r.year * 12 + r.month - 1 - first for r in rows), dtype=np.int64, count=len(rows))
+    grids = packing.decode_months([r.codes for r in rows], [r.marked for r in rows])
+
+    return build_report(
+        year, month, months,
+        student_ids,
+        [rows[i].admission_number for i in first_row.tolist()],
+        [f"{rows[i].first_name} {rows[i].last_name}" for i in first_row.tolist()],
+        row_students, row_months, grids,
+    )
+
+
+def iter_csv(report: AttendanceReport) -> Iterator[str]:
+    """Per-student report as CSV, in chunks"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for i, row in enumerate(report.rows(), 1):
+        writer.writerow(row)
+        if i % STREAM_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _json_array(report: AttendanceReport, order: Optional[np.ndarray] = None) -> Iterator[str]:
+    yield "["
+    chunk, separator = [], ""
+    for row in report.rows(order):
+        chunk.append(json.dumps(dict(zip(CSV_COLUMNS, row))))
+        if len(chunk) == STREAM_CHUNK_ROWS:
+            yield separator + ",".join(chunk)
+            chunk, separator = [], ","
+    if chunk:
+        yield separator + ",".join(chunk)
+    yield "]"
+
+
+def iter_json(report: AttendanceReport) -> Iterator[str]:
+    """Full report as one JSON document, students streamed in chunks"""
+    yield f'{{"summary":{json.dumps(report.summary())},"day_of_week":{json.dumps(report.day_of_week())},'
+    yield '"chronic_absentees":'
+    yield from _json_array(report, report.chronic_order())
+    yield ',"most_late":'
+    yield from _json_array(report, report.late_order())
+    yield ',"students":'
+    yield from _json_array(report)
+    yield "}"
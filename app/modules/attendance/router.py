@@ -0,0 +1,289 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, or_, and_, func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from calendar import monthrange
+from collections import Counter
+from datetime import date
+from typing import Optional, Literal
+import numpy as np
+from app.tenancy.database import get_tenant_db, get_tenant_db_readonly
+from app.modules.attendance import schemas, models, packing, reports
+from app.modules.students.models import Student
+from app.core.exceptions import BaseAppException
+from app.rbac.decorators import require_permissions, require_any_permission
+from app.rbac.constants import Permission
+
+router = APIRouter()
+
+
+def _in_class(grade: str, section: Optional[str]):
+    """Student filter for a grade + section (no section matches NULL or '')"""
+    if section:
+        return (Student.current_grade == grade, Student.section == section)
+    return (Student.current_grade == grade, or_(Student.section.is_(None), Student.section == ""))
+
+
+def _class_month(grade: str, section: Optional[str], year: int, month: int):
+    return (
+        models.AttendanceMonth.current_grade == grade,
+        models.AttendanceMonth.section == (section or ""),
+        models.AttendanceMonth.year == year,
+        models.AttendanceMonth.month == month,
+    )
+
+
+def _month_row(student_id: int, year: int, month: int, branch_id, grade: str, section: str, grid: np.ndarray) -> dict:
+    codes, marked = packing.encode_month(grid)
+    return {
+        "student_id": student_id,
+        "year": year,
+        "month": month,
+        "branch_id": branch_id,
+        "current_grade": grade,
+        "section": section,
+        "codes": codes,
+        "marked": marked,
+    }
+
+
+def _apply_roll(roll: schemas.BulkAttendanceMark, branches: dict[int, int], rows) -> tuple[list[dict], int]:
+    """
+    Patch a roll into the locked month rows ``(student_id, branch_id,
+    current_grade, section, codes, marked)`` of its class and students.
+
+    Students on the roll get their status and their month row moves to the
+    roll's class; marks of students dropped from the roll are cleared.
+    Returns the rows to upsert and how many marks were cleared.
+    """
+    year, month = roll.attendance_date.year, roll.attendance_date.month
+    day, period = roll.attendance_date.day - 1, roll.period
+    statuses = dict(zip(roll.student_ids, roll.statuses))
+    updates, removed = [], 0
+    for student_id, branch_id, grade, section, codes, marked in rows:
+        grid = packing.decode_month(codes, marked)
+        if student_id in statuses:
+            grid[day, period] = packing.STATUS_CODES[statuses[student_id]]
+            branch_id, grade, section = branches[student_id], roll.current_grade, roll.section or ""
+        elif grid[day, period] != packing.UNMARKED:
+            grid[day, period] = packing.UNMARKED
+            removed += 1
+        else:
+            continue
+        updates.append(_month_row(student_id, year, month, branch_id, grade, section, grid))
+    return updates, removed
+
+
+@router.post("/bulk", response_model=schemas.BulkAttendanceResult)
+@require_permissions(Permission.ATTENDANCE_MARK)
+async def mark_attendance_bulk(
+    roll: schemas.BulkAttendanceMark,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """
+    Mark a whole class for one period.
+
+    Attendance is stored as one bit-packed row per student-month, so the
+    class's month rows are created if missing, locked, patched in memory
+    and written back with a single multi-row
+    ``INSERT ... ON DUPLICATE KEY UPDATE``. Re-submitting the same roll is
+    a no-op and a corrected roll simply overwrites the previous one; marks
+    of students dropped from the roll are cleared.
+    """
+    # One round trip to check every student belongs to the class
+    query = select(Student.id, Student.branch_id).where(
+        Student.id.in_(roll.student_ids), *_in_class(roll.current_grade, roll.section)
+    )
+    if roll.branch_id:
+        query = query.where(Student.branch_id == roll.branch_id)
+    branches = dict((await db.execute(query)).all())
+
+    unknown = [sid for sid in roll.student_ids if sid not in branches]
+    if unknown:
+        raise BaseAppException(
+            f"Students not in class {roll.current_grade}{roll.section or ''}: {unknown[:20]}"
+        )
+
+    year, month = roll.attendance_date.year, roll.attendance_date.month
+    section = roll.section or ""
+
+    # Make sure every month row exists so the locking read below covers
+    # them all (concurrent first marks of a month would otherwise race)
+    empty_codes, empty_marked = packing.encode_month(packing.empty_month())
+    await db.execute(
+        mysql_insert(models.AttendanceMonth).prefix_with("IGNORE").values([
+            {
+                "student_id": student_id,
+                "year": year,
+                "month": month,
+                "branch_id": branches[student_id],
+                "current_grade": roll.current_grade,
+                "section": section,
+                "codes": empty_codes,
+                "marked": empty_marked,
+            }
+            for student_id in roll.student_ids
+        ])
+    )
+
+    # Columns only: the rows are written back solely by the upsert below,
+    # never through the unit of work
+    result = await db.execute(
+        select(
+            models.AttendanceMonth.student_id,
+            models.AttendanceMonth.branch_id,
+            models.AttendanceMonth.current_grade,
+            models.AttendanceMonth.section,
+            models.AttendanceMonth.codes,
+            models.AttendanceMonth.marked,
+        )
+        .where(or_(
+            and_(
+                models.AttendanceMonth.student_id.in_(roll.student_ids),
+                models.AttendanceMonth.year == year,
+                models.AttendanceMonth.month == month,
+            ),
+            and_(*_class_month(roll.current_grade, roll.section, year, month)),
+        ))
+        .with_for_update()
+    )
+
+    updates, removed = _apply_roll(roll, branches, result.all())
+
+    stmt = mysql_insert(models.AttendanceMonth).values(updates)
+    stmt = stmt.on_duplicate_key_update(
+        codes=stmt.inserted.codes,
+        marked=stmt.inserted.marked,
+        branch_id=stmt.inserted.branch_id,
+        current_grade=stmt.inserted.current_grade,
+        section=stmt.inserted.section,
+        updated_at=func.now(),
+    )
+    await db.execute(stmt)
+    await db.commit()
+
+    return schemas.BulkAttendanceResult(
+        marked=len(roll.student_ids),
+        removed=removed,
+        summary=Counter(roll.statuses),
+    )
+
+
+@router.get("/class", response_model=list[schemas.ClassAttendanceEntry])
+@require_permissions(Permission.ATTENDANCE_VIEW)
+async def get_class_attendance(
+    current_grade: str,
+    attendance_date: date,
+    section: Optional[str] = None,
+    period: int = 0,
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
+):
+    """Attendance of one class-period, ordered by student"""
+    if not 0 <= period < packing.PERIODS_PER_DAY:
+        raise BaseAppException(f"period must be between 0 and {packing.PERIODS_PER_DAY - 1}")
+
+    result = await db.execute(
+        select(models.AttendanceMonth.student_id, models.AttendanceMonth.codes, models.AttendanceMonth.marked)
+        .where(*_class_month(current_grade, section, attendance_date.year, attendance_date.month))
+        .order_by(models.AttendanceMonth.student_id)
+    )
+    entries = []
+    for student_id, codes, marked in result.all():
+        code = packing.decode_month(codes, marked)[attendance_date.day - 1, period]
+        if code != packing.UNMARKED:
+            entries.append(schemas.ClassAttendanceEntry(student_id=student_id, status=packing.CODE_STATUS[code]))
+    return entries
+
+
+@router.get("/students/{student_id}/year/{year}", response_model=schemas.StudentAttendanceYear)
+@require_permissions(Permission.ATTENDANCE_VIEW)
+async def get_student_attendance_year(
+    student_id: int,
+    year: int,
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
+):
+    """A student's calendar-year attendance, read from at most twelve month rows"""
+    result = await db.execute(
+        select(models.AttendanceMonth.month, models.AttendanceMonth.codes, models.AttendanceMonth.marked)
+        .where(models.AttendanceMonth.student_id == student_id, models.AttendanceMonth.year == year)
+        .order_by(models.AttendanceMonth.month)
+    )
+    rows = result.all()
+    grids = np.stack([packing.decode_month(codes, marked) for _, codes, marked in rows]) \
+        if rows else packing.empty_month()[None]
+
+    months = []
+    for (month, _, _), grid in zip(rows, grids):
+        counts = packing.status_counts(grid)
+        daily = packing.daily_status(grid)[:monthrange(year, month)[1]]
+        months.append(schemas.MonthAttendance(
+            month=month,
+            counts=counts,
+            percentage=packing.attendance_percentage(counts),
+            days=[packing.CODE_STATUS[code] if code != packing.UNMARKED else None for code in daily],
+        ))
+
+    counts = packing.status_counts(grids)
+    current_streak, longest_streak = packing.streaks(grids)
+    return schemas.StudentAttendanceYear(
+        student_id=student_id,
+        year=year,
+        counts=counts,
+        percentage=packing.attendance_percentage(counts),
+        current_streak=current_streak,
+        longest_streak=longest_streak,
+        months=months,
+    )
+
+
+def _stream_report(report: reports.AttendanceReport, format: str, filename: str) -> StreamingResponse:
+    if format == "csv":
+        return StreamingResponse(
+            reports.iter_csv(report),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}.csv"'},
+        )
+    return StreamingResponse(reports.iter_json(report), media_type="application/json")
+
+
+@router.get("/reports/class")
+@require_any_permission(Permission.ATTENDANCE_REPORT, Permission.REPORTS_ATTENDANCE)
+async def class_attendance_report(
+    current_grade: str,
+    year: int,
+    month: int = Query(..., ge=1, le=12),
+    months: int = Query(1, ge=1, le=12),
+    section: Optional[str] = None,
+    format: Literal["json", "csv"] = "json",
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
+):
+    """
+    Attendance report for a class over ``months`` months starting at
+    ``year``/``month``: per-student percentages, chronic absentees, late
+    counts and day-of-week absence rates, streamed as JSON or CSV.
+    """
+    report = await reports.load_report(
+        db, year, month, months, current_grade=current_grade, section=section
+    )
+    return _stream_report(report, format, f"attendance-{current_grade}{section or ''}-{year}-{month:02d}")
+
+
+@router.get("/reports/branch/{branch_id}")
+@require_any_permission(Permission.ATTENDANCE_REPORT, Permission.REPORTS_ATTENDANCE)
+async def branch_attendance_report(
+    branch_id: int,
+    year: int,
+    month: int = Query(..., ge=1, le=12),
+    months: int = Query(1, ge=1, le=12),
+    format: Literal["json", "csv"] = "json",
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
+):
+    """Attendance report for every student of a branch (see class report)"""
+    report = await reports.load_report(db, year, month, months, branch_id=branch_id)
+    return _stream_report(report, format, f"attendance-branch{branch_id}-{year}-{month:02d}")
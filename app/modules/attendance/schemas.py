@@ -0,0 +1,70 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional
+from datetime import date
+from app.shared.enums import AttendanceStatus
+from app.modules.attendance.packing import PERIODS_PER_DAY
+
+
+class ClassPeriod(BaseModel):
+    """A class (grade + section) on one date and period"""
+    current_grade: str = Field(..., min_length=1, max_length=20)
+    section: Optional[str] = Field(None, max_length=10)
+    attendance_date: date
+    period: int = Field(0, ge=0, lt=PERIODS_PER_DAY, description="0 = whole-day attendance")
+
+
+class BulkAttendanceMark(ClassPeriod):
+    """
+    Whole-roll marking for one class-period.
+
+    ``statuses[i]`` is the status of ``student_ids[i]``. The submission
+    replaces the roll: re-posting is idempotent, and students left out of a
+    re-submission lose their mark for that period.
+    """
+    branch_id: Optional[int] = None
+    student_ids: list[int] = Field(..., min_length=1, max_length=500)
+    statuses: list[AttendanceStatus] = Field(..., min_length=1, max_length=500)
+
+    @model_validator(mode="after")
+    def check_vector(self):
+        if len(self.student_ids) != len(self.statuses):
+            raise ValueError("student_ids and statuses must have the same length")
+        if len(set(self.student_ids)) != len(self.student_ids):
+            raise ValueError("student_ids must not contain duplicates")
+        return self
+
+
+class BulkAttendanceResult(BaseModel):
+    """Outcome of a bulk marking"""
+    marked: int
+    removed: int
+    summary: dict[AttendanceStatus, int]
+
+
+class ClassAttendanceEntry(BaseModel):
+    """One student's mark in a class-period roll"""
+    student_id: int
+    status: AttendanceStatus
+
+
+class AttendanceSummary(BaseModel):
+    """Slot counts and attendance rate (excused slots not counted)"""
+    counts: dict[AttendanceStatus, int]
+    percentage: Optional[float] = None
+
+
+class MonthAttendance(AttendanceSummary):
+    """One month of a student's attendance"""
+    month: int
+    days: list[Optional[AttendanceStatus]] = Field(
+        ..., description="Daily status per calendar day: period 0 if marked, else the worst marked period"
+    )
+
+
+class StudentAttendanceYear(AttendanceSummary):
+    """A student's attendance over one calendar year"""
+    student_id: int
+    year: int
+    current_streak: int
+    longest_streak: int
+    months: list[MonthAttendance]
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from app.tenancy.database import get_tenant_db
+from sqlalchemy import select
+from app.tenancy.database import get_tenant_db_readonly
 from app.modules.branches.models import Branch
+from app.modules.branches.counters import get_branch_counts
 from app.rbac.decorators import require_role, branch_scoped
 from app.rbac.constants import Role
 from pydantic import BaseModel
@@ -20,7 +21,7 @@ class BranchStatsResponse(BaseModel):
     branch_name: str
     branch_code: str
     is_main_branch: bool
-    # Counts (placeholder — will be populated when models are linked)
+    # Counts (read from branch_counters; fees are not tracked yet)
     student_count: int = 0
     teacher_count: int = 0
     course_count: int = 0
@@ -46,7 +47,7 @@ class BranchProfileResponse(BaseModel):
 @require_role(Role.BRANCH_ADMIN, Role.BRANCH_PRINCIPAL)
 @branch_scoped
 async def get_branch_stats(
-    db: AsyncSession = Depends(get_tenant_db),
+    db: AsyncSession = Depends(get_tenant_db_readonly),
     current_user=None,
     branch_id: int = None,
 ):
@@ -73,21 +74,17 @@ async def get_branch_stats(
             detail=f"Branch {branch_id} not found"
         )
     
-    # TODO: When Student, Teacher, Course models have branch_id,
-    # query actual counts here. For now, return zeros.
-    # Example:
-    # student_count = await db.scalar(
-    #     select(func.count()).select_from(Student).where(Student.branch_id == branch_id)
-    # )
+    # O(1) lookup of the transactionally maintained counters
+    counts = await get_branch_counts(db, branch_id)
     
     return BranchStatsResponse(
         branch_id=branch.id,
         branch_name=branch.name,
         branch_code=branch.code,
         is_main_branch=branch.is_main_branch,
-        student_count=0,
-        teacher_count=0,
-        course_count=0,
+        student_count=counts.student_count if counts else 0,
+        teacher_count=counts.teacher_count if counts else 0,
+        course_count=counts.course_count if counts else 0,
         total_fees_collected=0.0,
         pending_fees=0.0,
     )
@@ -97,7 +94,7 @@ async def get_branch_stats(
 @require_role(Role.BRANCH_ADMIN, Role.BRANCH_PRINCIPAL)
 @branch_scoped
 async def get_branch_profile(
-    db: AsyncSession = Depends(get_tenant_db),
+    db: AsyncSession = Depends(get_tenant_db_readonly),
     current_user=None,
     branch_id: int = None,
 ):
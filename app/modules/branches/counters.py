@@ -0,0 +1,157 @@
+"""
+Transactional maintenance of per-branch entity counters.
+
+An ``after_flush`` hook on the ORM Session turns Student / Teacher / Course
+inserts, deletes and ``branch_id`` transfers into per-branch deltas and
+applies them to ``branch_counters`` with a single upsert on the flushing
+connection. The counters therefore commit or roll back together with the
+rows they describe.
+
+Rows are never left without a branch: a ``before_flush`` hook assigns the
+Main Branch to counted rows flushed with ``branch_id`` unset, as the
+migration did for existing rows, so every row is counted somewhere.
+
+Bulk ``insert()`` / ``delete()`` statements bypass the ORM flush; run
+``rebuild_branch_counters`` after such maintenance jobs.
+"""
+from collections import defaultdict
+from typing import Dict, Optional
+from sqlalchemy import event, func, inspect, select, delete
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.modules.branches.models import Branch, BranchCounter
+from app.modules.students.models import Student
+from app.modules.teachers.models import Teacher
+from app.modules.courses.models import Course
+
+
+# Counted model -> column on branch_counters
+COUNTED_MODELS = {
+    Student: "student_count",
+    Teacher: "teacher_count",
+    Course: "course_count",
+}
+
+
+def _main_branch_id(session: Session) -> Optional[int]:
+    """The tenant's Main Branch, looked up once per session"""
+    if "main_branch_id" not in session.info:
+        with session.no_autoflush:
+            session.info["main_branch_id"] = session.execute(
+                select(Branch.id).where(Branch.is_main_branch == True).order_by(Branch.id).limit(1)
+            ).scalar_one_or_none()
+    return session.info["main_branch_id"]
+
+
+@event.listens_for(Session, "before_flush")
+def _assign_main_branch(session: Session, flush_context, instances) -> None:
+    """Counted rows without a branch belong to the Main Branch"""
+    for obj in (*session.new, *session.dirty):
+        if type(obj) in COUNTED_MODELS and obj.branch_id is None and obj not in session.deleted:
+            obj.branch_id = _main_branch_id(session)
+
+
+def _branch_history(obj) -> tuple[Optional[int], Optional[int]]:
+    """Return (old_branch_id, new_branch_id) for an object in the flush"""
+    history = inspect(obj).attrs.branch_id.load_history()
+    unchanged = history.unchanged[0] if history.unchanged else None
+    old = history.deleted[0] if history.deleted else unchanged
+    new = history.added[0] if history.added else unchanged
+    return old, new
+
+
+def _collect_deltas(session: Session) -> Dict[int, Dict[str, int]]:
+    """Compute counter deltas per branch from the session's pending changes"""
+    deltas: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    for obj in session.new:
+        column = COUNTED_MODELS.get(type(obj))
+        if column and obj.branch_id:
+            deltas[obj.branch_id][column] += 1
+
+    for obj in session.deleted:
+        column = COUNTED_MODELS.get(type(obj))
+        if column:
+            old_branch_id, _ = _branch_history(obj)
+            if old_branch_id:
+                deltas[old_branch_id][column] -= 1
+
+    # Branch transfers
+    for obj in session.dirty:
+        column = COUNTED_MODELS.get(type(obj))
+        if not column or obj in session.deleted:
+            continue
+        old_branch_id, new_branch_id = _branch_history(obj)
+        if old_branch_id == new_branch_id:
+            continue
+        if old_branch_id:
+            deltas[old_branch_id][column] -= 1
+        if new_branch_id:
+            deltas[new_branch_id][column] += 1
+
+    return deltas
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_branch_counters(session: Session, flush_context) -> None:
+    """Apply counter deltas in the same transaction as the flush"""
+    deltas = _collect_deltas(session)
+    rows = [
+        {
+            "branch_id": branch_id,
+            "student_count": counts.get("student_count", 0),
+            "teacher_count": counts.get("teacher_count", 0),
+            "course_count": counts.get("course_count", 0),
+        }
+        for branch_id, counts in deltas.items()
+        if any(counts.values())
+    ]
+    if not rows:
+        return
+
+    # One multi-row upsert: new branches start at their delta,
+    # existing rows are incremented atomically by the database.
+    stmt = mysql_insert(BranchCounter.__table__).values(rows)
+    stmt = stmt.on_duplicate_key_update(
+        student_count=BranchCounter.__table__.c.student_count + stmt.inserted.student_count,
+        teacher_count=BranchCounter.__table__.c.teacher_count + stmt.inserted.teacher_count,
+        course_count=BranchCounter.__table__.c.course_count + stmt.inserted.course_count,
+    )
+    session.connection().execute(stmt)
+
+
+async def get_branch_counts(db: AsyncSession, branch_id: int) -> Optional[BranchCounter]:
+    """O(1) primary-key lookup of a branch's counters"""
+    return await db.get(BranchCounter, branch_id)
+
+
+async def rebuild_branch_counters(db: AsyncSession) -> int:
+    """
+    Recompute every branch's counters from the source tables.
+
+    Only needed after bulk statements that bypass the ORM flush.
+    Returns the number of branches written.
+    """
+    totals: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for model, column in COUNTED_MODELS.items():
+        result = await db.execute(
+            select(model.branch_id, func.count())
+            .where(model.branch_id.is_not(None))
+            .group_by(model.branch_id)
+        )
+        for branch_id, count in result.all():
+            totals[branch_id][column] = count
+
+    await db.execute(delete(BranchCounter))
+    db.add_all([
+        BranchCounter(
+            branch_id=branch_id,
+            student_count=counts.get("student_count", 0),
+            teacher_count=counts.get("teacher_count", 0),
+            course_count=counts.get("course_count", 0),
+        )
+        for branch_id, counts in totals.items()
+    ])
+    await db.flush()
+    return len(totals)
@@ -40,3 +40,25 @@ class Branch(BaseModel):
     
     def __repr__(self) -> str:
         return f"<Branch {self.name} ({self.code})>"
+
+
+class BranchCounter(BaseModel):
+    """
+    Denormalized per-branch entity counts.
+    Maintained in the same transaction as every insert, delete or branch
+    transfer of a Student, Teacher or Course (see branches/counters.py),
+    so dashboards read one row instead of running COUNT(*) per request.
+    """
+    __tablename__ = "branch_counters"
+    
+    branch_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("branches.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    student_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    teacher_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    course_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<BranchCounter branch={self.branch_id} students={self.student_count}>"
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from typing import Optional
-from app.tenancy.database import get_tenant_db
+from app.tenancy.database import get_tenant_db, get_tenant_db_readonly
 from app.modules.branches.models import Branch
 from app.modules.branches.schemas import (
     BranchCreate,
@@ -22,7 +22,7 @@ async def list_branches(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
     is_active: Optional[bool] = None,
-    db: AsyncSession = Depends(get_tenant_db),
+    db: AsyncSession = Depends(get_tenant_db_readonly),
     current_user=None  # Injected by decorator
 ):
     """
@@ -90,7 +90,7 @@ async def create_branch(
 @require_permissions(Permission.BRANCH_VIEW)
 async def get_branch(
     branch_id: int,
-    db: AsyncSession = Depends(get_tenant_db),
+    db: AsyncSession = Depends(get_tenant_db_readonly),
     current_user=None  # Injected by decorator
 ):
     """
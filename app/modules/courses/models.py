@@ -13,6 +13,7 @@ class Course(BaseModel):
     
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     school_id: Mapped[int] = mapped_column(ForeignKey("schools.id"), nullable=False)
+    branch_id: Mapped[int] = mapped_column(ForeignKey("branches.id"), nullable=True, index=True)
     
     # Course Information
     name: Mapped[str] = mapped_column(String(100), nullable=False)
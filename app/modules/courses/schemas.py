@@ -6,6 +6,7 @@ from datetime import datetime
 class CourseBase(BaseModel):
     """Base course schema"""
     school_id: int
+    branch_id: Optional[int] = None
     name: str = Field(..., min_length=1, max_length=100)
     code: str = Field(..., min_length=1, max_length=20)
     description: Optional[str] = None
@@ -21,6 +22,7 @@ class CourseCreate(CourseBase):
 
 class CourseUpdate(BaseModel):
     """Schema for updating a course"""
+    branch_id: Optional[int] = None
     name: Optional[str] = Field(None, min_length=1, max_length=100)
     description: Optional[str] = None
     credits: Optional[int] = Field(None, ge=0)
@@ -0,0 +1 @@
+"""Fees module"""
@@ -0,0 +1,195 @@
+"""
+Term invoice generation.
+
+A batch invoices every student for each active ``FeeStructure`` of a term
+that applies to them. Students are walked in ``student_id`` order in chunks
+of ``FEE_BATCH_CHUNK_SIZE``; each chunk is one short transaction that
+
+1. locks only that chunk's balance rows (created if missing),
+2. inserts all its invoices with one multi-row ``INSERT IGNORE``,
+3. appends their ledger entries with one multi-row insert, and
+4. updates the balances and advances the batch cursor.
+
+Nothing is locked between chunks, so payments keep flowing while a large
+tenant is invoiced. The unique (student_id, structure_id) key makes a
+re-run or resumed batch skip invoices that already exist.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy import select, update, func, exists, or_, and_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.shared.enums import FeeStatus, LedgerEntryType, BatchJobStatus
+from app.tenancy.manager import connection_manager
+from app.tenancy.schemas import TenantContext
+from app.modules.fees import ledger
+from app.modules.fees.models import FeeStructure, FeeInvoice, FeeInvoiceBatch, LedgerEntry
+from app.modules.students.models import Student
+
+logger = logging.getLogger(__name__)
+
+
+async def claim_batch(db: AsyncSession, batch_id: int) -> bool:
+    """
+    Mark a batch RUNNING if it is pending, failed, or running without a
+    heartbeat for FEE_BATCH_STALE_SECONDS (its worker died).
+    """
+    now = datetime.now(timezone.utc)
+    stale = now - timedelta(seconds=settings.FEE_BATCH_STALE_SECONDS)
+    result = await db.execute(
+        update(FeeInvoiceBatch)
+        .where(
+            FeeInvoiceBatch.id == batch_id,
+            or_(
+                FeeInvoiceBatch.status.in_((BatchJobStatus.PENDING, BatchJobStatus.FAILED)),
+                and_(FeeInvoiceBatch.status == BatchJobStatus.RUNNING, FeeInvoiceBatch.heartbeat_at < stale),
+            ),
+        )
+        .values(status=BatchJobStatus.RUNNING, heartbeat_at=now, error=None)
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+
+async def process_chunk(db: AsyncSession, batch: FeeInvoiceBatch, structures: list[FeeStructure]) -> int:
+    """Invoice the next chunk of students; returns how many students it covered"""
+    students = (await db.execute(
+        select(Student.id, Student.branch_id, Student.current_grade)
+        .where(Student.id > batch.last_student_id)
+        .order_by(Student.id)
+        .limit(settings.FEE_BATCH_CHUNK_SIZE)
+    )).all()
+    if not students:
+        return 0
+
+    invoices = [
+        {
+            "student_id": student.id,
+            "branch_id": student.branch_id,
+            "description": structure.name,
+            "structure_id": structure.id,
+            "batch_id": batch.id,
+            "amount": structure.amount,
+            "amount_paid": Decimal("0"),
+            "amount_waived": Decimal("0"),
+            "status": FeeStatus.PENDING,
+            "issue_date": batch.issue_date,
+            "due_date": structure.due_date,
+        }
+        for student in students
+        for structure in structures
+        if structure.applies_to(student.branch_id, student.current_grade)
+    ]
+
+    created = 0
+    if invoices:
+        # Balance rows first, same lock order as single payments
+        balances = await ledger.lock_balances(db, {
+            row["student_id"]: row["branch_id"] for row in invoices
+        })
+        await db.execute(mysql_insert(FeeInvoice.__table__).prefix_with("IGNORE").values(invoices))
+
+        # Invoices this chunk inserted (INSERT IGNORE skipped existing ones)
+        new_invoices = (await db.execute(
+            select(FeeInvoice.id, FeeInvoice.student_id, FeeInvoice.amount, FeeInvoice.due_date, FeeInvoice.description)
+            .where(
+                FeeInvoice.batch_id == batch.id,
+                FeeInvoice.student_id.in_(list(balances)),
+                ~exists().where(LedgerEntry.invoice_id == FeeInvoice.id),
+            )
+            .order_by(FeeInvoice.student_id, FeeInvoice.id)
+        )).all()
+
+        if new_invoices:
+            running = {student_id: balance.balance for student_id, balance in balances.items()}
+            entries = []
+            for invoice in new_invoices:
+                running[invoice.student_id] += invoice.amount
+                entries.append({
+                    "student_id": invoice.student_id,
+                    "invoice_id": invoice.id,
+                    "entry_type": LedgerEntryType.INVOICE,
+                    "amount": invoice.amount,
+                    "balance_after": running[invoice.student_id],
+                    "note": invoice.description,
+                    "created_by": batch.created_by,
+                })
+            await db.execute(LedgerEntry.__table__.insert().values(entries))
+
+            last_entries = dict((await db.execute(
+                select(LedgerEntry.student_id, func.max(LedgerEntry.id))
+                .where(LedgerEntry.invoice_id.in_([invoice.id for invoice in new_invoices]))
+                .group_by(LedgerEntry.student_id)
+            )).all())
+
+            invoiced = defaultdict(Decimal)
+            oldest_due = {}
+            for invoice in new_invoices:
+                invoiced[invoice.student_id] += invoice.amount
+                oldest_due[invoice.student_id] = min(oldest_due.get(invoice.student_id, invoice.due_date), invoice.due_date)
+            for student_id, amount in invoiced.items():
+                balance = balances[student_id]
+                balance.balance = running[student_id]
+                balance.total_invoiced += amount
+                balance.last_entry_id = last_entries[student_id]
+                if balance.oldest_due_date is None or oldest_due[student_id] < balance.oldest_due_date:
+                    balance.oldest_due_date = oldest_due[student_id]
+            created = len(new_invoices)
+
+    batch.last_student_id = students[-1].id
+    batch.processed_students += len(students)
+    batch.invoices_created += created
+    batch.heartbeat_at = datetime.now(timezone.utc)
+    await db.commit()
+    return len(students)
+
+
+async def run_invoice_batch(tenant: TenantContext, batch_id: int, claimed: bool = False):
+    """
+    Run (or resume) a batch to completion. Started as a background task;
+    errors mark the batch FAILED and it can be resumed later. ``claimed``
+    means the caller already won ``claim_batch`` for this run.
+    """
+    session_maker = await connection_manager.get_session_maker(tenant)
+
+    async with session_maker() as db:
+        db.info["tenant_id"] = tenant.tenant_id
+        if not claimed and not await claim_batch(db, batch_id):
+            logger.info(f"Invoice batch {batch_id} of tenant {tenant.tenant_id} is not claimable, skipping")
+            return
+        batch = await db.get(FeeInvoiceBatch, batch_id)
+        structures = list((await db.execute(
+            select(FeeStructure).where(FeeStructure.term == batch.term, FeeStructure.is_active == True)
+        )).scalars())
+        if not batch.total_students:
+            batch.total_students = (await db.execute(select(func.count(Student.id)))).scalar_one()
+            await db.commit()
+
+    error: Optional[str] = None
+    try:
+        while True:
+            async with session_maker() as db:
+                db.info["tenant_id"] = tenant.tenant_id
+                batch = await db.get(FeeInvoiceBatch, batch_id)
+                if not await process_chunk(db, batch, structures):
+                    break
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"[:500]
+        logger.error(f"Invoice batch {batch_id} of tenant {tenant.tenant_id} failed: {error}")
+
+    async with session_maker() as db:
+        db.info["tenant_id"] = tenant.tenant_id
+        batch = await db.get(FeeInvoiceBatch, batch_id)
+        batch.status = BatchJobStatus.FAILED if error else BatchJobStatus.COMPLETED
+        batch.error = error
+        if not error:
+            batch.finished_at = datetime.now(timezone.utc)
+            logger.info(
+                f"Invoice batch {batch_id} of tenant {tenant.tenant_id} completed: "
+                f"{batch.invoices_created} invoices for {batch.processed_students} students"
+            )
+        await db.commit()
@@ -0,0 +1,225 @@
+"""
+Fee ledger operations.
+
+Every change to what a student owes goes through this module, which in one
+transaction:
+
+1. locks the student's ``student_balances`` row (creating it if needed),
+2. updates the affected invoices,
+3. appends ``fee_ledger`` entries carrying the running balance, and
+4. updates the balance row's totals and ``oldest_due_date``.
+
+Locks are always taken balance row first, then invoices, so concurrent
+payments and waivers for one student serialize without deadlocking.
+Callers commit.
+"""
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy import select, func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.exceptions import BaseAppException, NotFoundException
+from app.shared.enums import FeeStatus, LedgerEntryType
+from app.modules.fees.models import FeeInvoice, LedgerEntry, StudentBalance
+from app.modules.students.models import Student
+
+
+OPEN_STATUSES = (FeeStatus.PENDING, FeeStatus.PARTIAL, FeeStatus.OVERDUE)
+
+
+async def lock_balances(db: AsyncSession, students: dict[int, Optional[int]]) -> dict[int, StudentBalance]:
+    """
+    Balance rows of many students (``{student_id: branch_id}``), created if
+    missing and locked FOR UPDATE in student_id order
+    """
+    await db.execute(
+        mysql_insert(StudentBalance.__table__).prefix_with("IGNORE").values([
+            {"student_id": student_id, "branch_id": branch_id}
+            for student_id, branch_id in students.items()
+        ])
+    )
+    result = await db.execute(
+        select(StudentBalance)
+        .where(StudentBalance.student_id.in_(list(students)))
+        .order_by(StudentBalance.student_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    return {balance.student_id: balance for balance in result.scalars()}
+
+
+async def lock_balance(db: AsyncSession, student: Student) -> StudentBalance:
+    """The student's balance row, created if missing and locked FOR UPDATE"""
+    return (await lock_balances(db, {student.id: student.branch_id}))[student.id]
+
+
+async def get_student(db: AsyncSession, student_id: int) -> Student:
+    student = await db.get(Student, student_id)
+    if not student:
+        raise NotFoundException(f"Student with ID {student_id} not found")
+    return student
+
+
+def settle_status(invoice: FeeInvoice) -> FeeStatus:
+    """Invoice status after its paid / waived amounts changed"""
+    if invoice.outstanding <= 0:
+        return FeeStatus.PAID
+    if invoice.status == FeeStatus.OVERDUE:
+        return FeeStatus.OVERDUE
+    if invoice.amount_paid or invoice.amount_waived:
+        return FeeStatus.PARTIAL
+    return FeeStatus.PENDING
+
+
+def _append(
+    db: AsyncSession,
+    balance: StudentBalance,
+    entry_type: LedgerEntryType,
+    amount: Decimal,
+    invoice_id: Optional[int] = None,
+    reference: Optional[str] = None,
+    note: Optional[str] = None,
+    created_by: Optional[int] = None,
+) -> LedgerEntry:
+    balance.balance += amount
+    entry = LedgerEntry(
+        student_id=balance.student_id,
+        invoice_id=invoice_id,
+        entry_type=entry_type,
+        amount=amount,
+        balance_after=balance.balance,
+        reference=reference,
+        note=note,
+        created_by=created_by,
+    )
+    db.add(entry)
+    return entry
+
+
+async def _finish(db: AsyncSession, balance: StudentBalance, entries: list[LedgerEntry]):
+    """Flush the entries and refresh the balance row's derived columns"""
+    await db.flush()
+    balance.last_entry_id = entries[-1].id
+    result = await db.execute(
+        select(func.min(FeeInvoice.due_date)).where(
+            FeeInvoice.student_id == balance.student_id,
+            FeeInvoice.status.in_(OPEN_STATUSES),
+        )
+    )
+    balance.oldest_due_date = result.scalar_one()
+    await db.flush()
+
+
+async def post_invoice(
+    db: AsyncSession,
+    student: Student,
+    description: str,
+    amount: Decimal,
+    due_date: date,
+    issue_date: Optional[date] = None,
+    created_by: Optional[int] = None,
+) -> FeeInvoice:
+    """Issue an invoice and debit the student's balance"""
+    balance = await lock_balance(db, student)
+    invoice = FeeInvoice(
+        student_id=student.id,
+        branch_id=student.branch_id,
+        description=description,
+        amount=amount,
+        amount_paid=Decimal("0"),
+        amount_waived=Decimal("0"),
+        status=FeeStatus.PENDING,
+        issue_date=issue_date or date.today(),
+        due_date=due_date,
+    )
+    db.add(invoice)
+    await db.flush()
+
+    balance.total_invoiced += amount
+    entry = _append(db, balance, LedgerEntryType.INVOICE, amount, invoice.id,
+                    note=description, created_by=created_by)
+    await _finish(db, balance, [entry])
+    return invoice
+
+
+async def _lock_open_invoices(db: AsyncSession, student_id: int, invoice_id: Optional[int]) -> list[FeeInvoice]:
+    query = (
+        select(FeeInvoice)
+        .where(FeeInvoice.student_id == student_id, FeeInvoice.status.in_(OPEN_STATUSES))
+        .order_by(FeeInvoice.due_date, FeeInvoice.id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    if invoice_id is not None:
+        query = query.where(FeeInvoice.id == invoice_id)
+    return list((await db.execute(query)).scalars())
+
+
+async def record_payment(
+    db: AsyncSession,
+    student: Student,
+    amount: Decimal,
+    invoice_id: Optional[int] = None,
+    reference: Optional[str] = None,
+    note: Optional[str] = None,
+    created_by: Optional[int] = None,
+) -> tuple[StudentBalance, list[LedgerEntry]]:
+    """
+    Credit a payment, settling ``invoice_id`` or else the open invoices
+    oldest due first. One ledger entry is written per invoice touched.
+    """
+    balance = await lock_balance(db, student)
+    invoices = await _lock_open_invoices(db, student.id, invoice_id)
+    if invoice_id is not None and not invoices:
+        raise NotFoundException(f"Open invoice with ID {invoice_id} not found for this student")
+
+    outstanding = sum((invoice.outstanding for invoice in invoices), Decimal("0"))
+    if amount > outstanding:
+        raise BaseAppException(f"Payment of {amount} exceeds the outstanding amount of {outstanding}")
+
+    entries, remaining = [], amount
+    for invoice in invoices:
+        if remaining <= 0:
+            break
+        part = min(remaining, invoice.outstanding)
+        invoice.amount_paid += part
+        invoice.status = settle_status(invoice)
+        remaining -= part
+        entries.append(_append(db, balance, LedgerEntryType.PAYMENT, -part, invoice.id,
+                               reference=reference, note=note, created_by=created_by))
+
+    balance.total_paid += amount
+    await _finish(db, balance, entries)
+    return balance, entries
+
+
+async def waive_invoice(
+    db: AsyncSession,
+    invoice_id: int,
+    amount: Optional[Decimal],
+    reason: str,
+    created_by: Optional[int] = None,
+) -> tuple[FeeInvoice, LedgerEntry]:
+    """Waive part (or, with ``amount=None``, all) of an invoice's outstanding amount"""
+    invoice = await db.get(FeeInvoice, invoice_id)
+    if not invoice:
+        raise NotFoundException(f"Invoice with ID {invoice_id} not found")
+
+    balance = await lock_balance(db, await get_student(db, invoice.student_id))
+    invoices = await _lock_open_invoices(db, invoice.student_id, invoice_id)
+    if not invoices:
+        raise BaseAppException(f"Invoice {invoice_id} is not open")
+    invoice = invoices[0]
+
+    amount = invoice.outstanding if amount is None else amount
+    if amount > invoice.outstanding:
+        raise BaseAppException(f"Waiver of {amount} exceeds the outstanding amount of {invoice.outstanding}")
+
+    invoice.amount_waived += amount
+    invoice.status = settle_status(invoice)
+    balance.total_waived += amount
+    entry = _append(db, balance, LedgerEntryType.WAIVER, -amount, invoice.id,
+                    note=reason, created_by=created_by)
+    await _finish(db, balance, [entry])
+    return invoice, entry
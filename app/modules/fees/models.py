@@ -0,0 +1,168 @@
+from sqlalchemy import String, Integer, BigInteger, Boolean, ForeignKey, Date, DateTime, Numeric, Index, UniqueConstraint, event, Enum as SQLEnum
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import date, datetime
+from decimal import Decimal
+from app.shared.base_models import BaseModel
+from app.shared.enums import FeeStatus, LedgerEntryType, BatchJobStatus
+
+
+Money = Numeric(12, 2)
+
+
+class FeeStructure(BaseModel):
+    """
+    A fee charged for a term to every student matching its scope.
+
+    ``branch_id`` / ``current_grade`` narrow the scope; NULL means all
+    branches / all grades.
+    """
+    __tablename__ = "fee_structures"
+    __table_args__ = (
+        Index("ix_fee_structures_term", "term", "is_active"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+    term: Mapped[str] = mapped_column(String(50), nullable=False)
+    branch_id: Mapped[int] = mapped_column(ForeignKey("branches.id"), nullable=True)
+    current_grade: Mapped[str] = mapped_column(String(20), nullable=True)
+    amount: Mapped[Decimal] = mapped_column(Money, nullable=False)
+    due_date: Mapped[date] = mapped_column(Date, nullable=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+
+    def applies_to(self, branch_id, current_grade) -> bool:
+        return (
+            (self.branch_id is None or self.branch_id == branch_id)
+            and (self.current_grade is None or self.current_grade == current_grade)
+        )
+
+    def __repr__(self) -> str:
+        return f"<FeeStructure {self.name} ({self.term}) {self.amount}>"
+
+
+class FeeInvoiceBatch(BaseModel):
+    """
+    Term invoice generation job.
+
+    Students are processed in ``student_id`` order; ``last_student_id`` is
+    the keyset cursor committed with each chunk, so a failed or interrupted
+    batch resumes exactly where it stopped.
+    """
+    __tablename__ = "fee_invoice_batches"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    term: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
+    issue_date: Mapped[date] = mapped_column(Date, nullable=False)
+    status: Mapped[BatchJobStatus] = mapped_column(
+        SQLEnum(BatchJobStatus), nullable=False, default=BatchJobStatus.PENDING
+    )
+    total_students: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    processed_students: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    invoices_created: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_student_id: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error: Mapped[str] = mapped_column(String(500), nullable=True)
+    heartbeat_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_by: Mapped[int] = mapped_column(Integer, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<FeeInvoiceBatch {self.id} {self.term} {self.status}>"
+
+
+class FeeInvoice(BaseModel):
+    """An amount owed by a student, settled by payments and waivers"""
+    __tablename__ = "fee_invoices"
+    __table_args__ = (
+        Index("ix_fee_invoices_student_status", "student_id", "status"),
+        # Due-date queue of open invoices, walked by the overdue sweeper
+        Index("ix_fee_invoices_due_queue", "status", "due_date", "id"),
+        # A student is invoiced once per fee structure, however often a batch runs
+        UniqueConstraint("student_id", "structure_id", name="uq_fee_invoices_student_structure"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    student_id: Mapped[int] = mapped_column(ForeignKey("students.id"), nullable=False)
+    branch_id: Mapped[int] = mapped_column(ForeignKey("branches.id"), nullable=True, index=True)
+    description: Mapped[str] = mapped_column(String(255), nullable=False)
+    structure_id: Mapped[int] = mapped_column(ForeignKey("fee_structures.id"), nullable=True)
+    batch_id: Mapped[int] = mapped_column(ForeignKey("fee_invoice_batches.id"), nullable=True, index=True)
+
+    amount: Mapped[Decimal] = mapped_column(Money, nullable=False)
+    amount_paid: Mapped[Decimal] = mapped_column(Money, nullable=False, default=Decimal("0"))
+    amount_waived: Mapped[Decimal] = mapped_column(Money, nullable=False, default=Decimal("0"))
+    status: Mapped[FeeStatus] = mapped_column(SQLEnum(FeeStatus), nullable=False, default=FeeStatus.PENDING)
+
+    issue_date: Mapped[date] = mapped_column(Date, nullable=False)
+    due_date: Mapped[date] = mapped_column(Date, nullable=False)
+
+    @property
+    def outstanding(self) -> Decimal:
+        return self.amount - self.amount_paid - self.amount_waived
+
+    def __repr__(self) -> str:
+        return f"<FeeInvoice {self.id} student={self.student_id} {self.amount} {self.status}>"
+
+
+class LedgerEntry(BaseModel):
+    """
+    Append-only record of every balance change of a student.
+
+    ``amount`` is signed (invoices add, payments and waivers subtract) and
+    ``balance_after`` is the student's running balance once the entry is
+    applied. Entries are never updated or deleted; corrections are new
+    entries.
+    """
+    __tablename__ = "fee_ledger"
+    __table_args__ = (
+        Index("ix_fee_ledger_student", "student_id", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    student_id: Mapped[int] = mapped_column(ForeignKey("students.id"), nullable=False)
+    invoice_id: Mapped[int] = mapped_column(ForeignKey("fee_invoices.id"), nullable=True)
+    entry_type: Mapped[LedgerEntryType] = mapped_column(SQLEnum(LedgerEntryType), nullable=False)
+    amount: Mapped[Decimal] = mapped_column(Money, nullable=False)
+    balance_after: Mapped[Decimal] = mapped_column(Money, nullable=False)
+    reference: Mapped[str] = mapped_column(String(100), nullable=True)
+    note: Mapped[str] = mapped_column(String(500), nullable=True)
+    created_by: Mapped[int] = mapped_column(Integer, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<LedgerEntry {self.id} {self.entry_type} {self.amount} -> {self.balance_after}>"
+
+
+@event.listens_for(LedgerEntry, "before_update")
+@event.listens_for(LedgerEntry, "before_delete")
+def _ledger_is_append_only(mapper, connection, target):
+    raise ValueError("Fee ledger entries are append-only")
+
+
+class StudentBalance(BaseModel):
+    """
+    Precomputed fee position of one student.
+
+    Written in the same transaction as every ledger entry (see
+    fees/ledger.py), so balance and overdue checks are a primary-key read
+    instead of summing invoices and payments. ``oldest_due_date`` is the
+    earliest due date among the student's open invoices.
+    """
+    __tablename__ = "student_balances"
+
+    student_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("students.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    branch_id: Mapped[int] = mapped_column(ForeignKey("branches.id"), nullable=True, index=True)
+    balance: Mapped[Decimal] = mapped_column(Money, nullable=False, default=Decimal("0"))
+    total_invoiced: Mapped[Decimal] = mapped_column(Money, nullable=False, default=Decimal("0"))
+    total_paid: Mapped[Decimal] = mapped_column(Money, nullable=False, default=Decimal("0"))
+    total_waived: Mapped[Decimal] = mapped_column(Money, nullable=False, default=Decimal("0"))
+    oldest_due_date: Mapped[date] = mapped_column(Date, nullable=True, index=True)
+    last_entry_id: Mapped[int] = mapped_column(BigInteger, nullable=True)
+
+    def is_overdue(self, today: date) -> bool:
+        return self.balance > 0 and self.oldest_due_date is not None and self.oldest_due_date < today
+
+    def __repr__(self) -> str:
+        return f"<StudentBalance student={self.student_id} balance={self.balance}>"
@@ -0,0 +1,114 @@
+"""
+Overdue-fee sweeper.
+
+Open invoices form a queue ordered by the ``(status, due_date, id)`` index.
+Every PENDING / PARTIAL invoice whose due date has passed sits at the head
+of that queue, and flipping it to OVERDUE takes it out, so each sweep only
+reads invoices that fell due since the previous one. They are updated in
+small keyset-paginated batches, one short transaction each. Tenants are
+swept concurrently, bounded by ``FEE_OVERDUE_MAX_CONCURRENCY``.
+"""
+import asyncio
+import logging
+from datetime import date
+from typing import Optional
+from sqlalchemy import select, update, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.config import settings
+from app.shared.enums import FeeStatus
+from app.tenancy.database import get_master_session
+from app.tenancy.manager import connection_manager
+from app.tenancy.models import School
+from app.tenancy.periodic import run_periodic
+from app.tenancy.schemas import TenantContext
+from app.modules.fees.models import FeeInvoice
+
+logger = logging.getLogger(__name__)
+
+
+DUE_STATUSES = (FeeStatus.PENDING, FeeStatus.PARTIAL)
+SWEEP_LOCK_KEY = "fees:overdue_sweep_lock"
+
+
+async def sweep_session(db: AsyncSession, today: Optional[date] = None) -> int:
+    """Mark past-due invoices OVERDUE on a tenant session, committing per batch; returns how many changed"""
+    today = today or date.today()
+    swept = 0
+    last_due, last_id = date.min, 0
+    while True:
+        batch = (await db.execute(
+            select(FeeInvoice.id, FeeInvoice.due_date)
+            .where(
+                FeeInvoice.status.in_(DUE_STATUSES),
+                FeeInvoice.due_date < today,
+                or_(
+                    FeeInvoice.due_date > last_due,
+                    and_(FeeInvoice.due_date == last_due, FeeInvoice.id > last_id),
+                ),
+            )
+            .order_by(FeeInvoice.due_date, FeeInvoice.id)
+            .limit(settings.FEE_OVERDUE_BATCH_SIZE)
+        )).all()
+        if not batch:
+            return swept
+
+        # Re-check the status: a payment may have settled an invoice since
+        result = await db.execute(
+            update(FeeInvoice)
+            .where(FeeInvoice.id.in_([row.id for row in batch]), FeeInvoice.status.in_(DUE_STATUSES))
+            .values(status=FeeStatus.OVERDUE)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+        swept += result.rowcount
+        last_due, last_id = batch[-1].due_date, batch[-1].id
+        if len(batch) < settings.FEE_OVERDUE_BATCH_SIZE:
+            return swept
+
+
+async def sweep_tenant(session_maker: async_sessionmaker, tenant_id: int, today: Optional[date] = None) -> int:
+    """Mark one tenant's past-due invoices OVERDUE; returns how many changed"""
+    async with session_maker() as db:
+        db.info["tenant_id"] = tenant_id
+        return await sweep_session(db, today)
+
+
+async def _sweep_school(school: School, semaphore: asyncio.Semaphore, today: date) -> Optional[int]:
+    async with semaphore:
+        try:
+            session_maker = await connection_manager.get_session_maker(TenantContext.from_school(school))
+            return await asyncio.wait_for(
+                sweep_tenant(session_maker, school.id, today),
+                settings.FEE_OVERDUE_TENANT_TIMEOUT_SECONDS
+            )
+        except Exception as e:
+            # Timeouts keep their committed batches; the next sweep continues
+            logger.warning(f"Overdue sweep failed for tenant {school.id} ({school.subdomain}): {type(e).__name__}: {e}")
+            return None
+
+
+async def sweep_all_tenants(today: Optional[date] = None) -> dict[int, Optional[int]]:
+    """Sweep every active tenant; returns invoices marked per tenant (None = failed)"""
+    today = today or date.today()
+    async with get_master_session() as db:
+        result = await db.execute(select(School).where(School.is_active == True))
+        schools = result.scalars().all()
+
+    semaphore = asyncio.Semaphore(settings.FEE_OVERDUE_MAX_CONCURRENCY)
+    counts = await asyncio.gather(*[_sweep_school(school, semaphore, today) for school in schools])
+    swept = dict(zip([school.id for school in schools], counts))
+
+    failed = sum(1 for count in counts if count is None)
+    logger.info(
+        f"Overdue sweep: {sum(count or 0 for count in counts)} invoices marked overdue "
+        f"across {len(schools) - failed}/{len(schools)} tenants"
+    )
+    return swept
+
+
+async def run_overdue_sweep_loop():
+    """Background loop started from the application lifespan"""
+    await run_periodic(
+        "Overdue sweep", settings.FEE_OVERDUE_SWEEP_INTERVAL_SECONDS, sweep_all_tenants, lock_key=SWEEP_LOCK_KEY
+    )
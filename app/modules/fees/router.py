@@ -0,0 +1,286 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from datetime import date
+from typing import Optional
+from app.tenancy.database import get_tenant_db, get_tenant_db_readonly, get_current_tenant
+from app.tenancy.schemas import TenantContext
+from app.modules.fees import schemas, models, ledger, batch, overdue
+from app.shared.enums import FeeStatus, BatchJobStatus
+from app.core.dependencies import Pagination
+from app.core.exceptions import NotFoundException, ConflictException
+from app.rbac.decorators import require_permissions, require_any_permission
+from app.rbac.constants import Permission
+
+router = APIRouter()
+
+
+def _balance_response(balance: models.StudentBalance) -> schemas.StudentBalance:
+    response = schemas.StudentBalance.model_validate(balance)
+    response.is_overdue = balance.is_overdue(date.today())
+    return response
+
+
+@router.post("/structures", response_model=schemas.FeeStructure, status_code=status.HTTP_201_CREATED)
+@require_permissions(Permission.FEES_EDIT)
+async def create_fee_structure(
+    structure_data: schemas.FeeStructureCreate,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """Define a term fee for all students, a branch, a grade, or both"""
+    structure = models.FeeStructure(**structure_data.model_dump())
+    db.add(structure)
+    await db.commit()
+    await db.refresh(structure)
+    return structure
+
+
+@router.get("/structures", response_model=list[schemas.FeeStructure])
+@require_permissions(Permission.FEES_VIEW)
+async def list_fee_structures(
+    term: Optional[str] = None,
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
+):
+    """List fee structures"""
+    query = select(models.FeeStructure)
+    if term:
+        query = query.where(models.FeeStructure.term == term)
+    result = await db.execute(query.order_by(models.FeeStructure.id))
+    return result.scalars().all()
+
+
+@router.post("/batches", response_model=schemas.InvoiceBatch, status_code=status.HTTP_202_ACCEPTED)
+@require_permissions(Permission.FEES_EDIT)
+async def start_invoice_batch(
+    batch_data: schemas.InvoiceBatchCreate,
+    background_tasks: BackgroundTasks,
+    tenant: TenantContext = Depends(get_current_tenant),
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """
+    Invoice every student for the term's active fee structures.
+
+    Runs in the background in chunks; poll ``GET /batches/{id}`` for
+    progress. Only one batch per term may be unfinished at a time.
+    """
+    running = await db.execute(
+        select(models.FeeInvoiceBatch.id).where(
+            models.FeeInvoiceBatch.term == batch_data.term,
+            models.FeeInvoiceBatch.status != BatchJobStatus.COMPLETED,
+        )
+    )
+    existing = running.scalars().first()
+    if existing:
+        raise ConflictException(f"Invoice batch {existing} for term '{batch_data.term}' is unfinished; resume it instead")
+
+    invoice_batch = models.FeeInvoiceBatch(
+        term=batch_data.term,
+        issue_date=batch_data.issue_date or date.today(),
+        status=BatchJobStatus.PENDING,
+        created_by=getattr(current_user, "id", None),
+    )
+    db.add(invoice_batch)
+    await db.commit()
+    await db.refresh(invoice_batch)
+
+    background_tasks.add_task(batch.run_invoice_batch, tenant, invoice_batch.id)
+    return invoice_batch
+
+
+@router.get("/batches/{batch_id}", response_model=schemas.InvoiceBatch)
+@require_permissions(Permission.FEES_VIEW)
+async def get_invoice_batch(
+    batch_id: int,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """Batch progress (read from the primary so it is never behind)"""
+    invoice_batch = await db.get(models.FeeInvoiceBatch, batch_id)
+    if not invoice_batch:
+        raise NotFoundException(f"Invoice batch with ID {batch_id} not found")
+    return invoice_batch
+
+
+@router.post("/batches/{batch_id}/resume", response_model=schemas.InvoiceBatch, status_code=status.HTTP_202_ACCEPTED)
+@require_permissions(Permission.FEES_EDIT)
+async def resume_invoice_batch(
+    batch_id: int,
+    background_tasks: BackgroundTasks,
+    tenant: TenantContext = Depends(get_current_tenant),
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """Continue a failed or stalled batch from its last committed chunk"""
+    invoice_batch = await db.get(models.FeeInvoiceBatch, batch_id)
+    if not invoice_batch:
+        raise NotFoundException(f"Invoice batch with ID {batch_id} not found")
+    if invoice_batch.status == BatchJobStatus.COMPLETED:
+        raise ConflictException(f"Invoice batch {batch_id} is already completed")
+    # Claim here so a batch whose worker is still alive gets a 409, not a no-op 202
+    if not await batch.claim_batch(db, batch_id):
+        raise ConflictException(f"Invoice batch {batch_id} is already running")
+    await db.refresh(invoice_batch)
+
+    background_tasks.add_task(batch.run_invoice_batch, tenant, invoice_batch.id, claimed=True)
+    return invoice_batch
+
+
+@router.post("/invoices", response_model=schemas.FeeInvoice, status_code=status.HTTP_201_CREATED)
+@require_permissions(Permission.FEES_EDIT)
+async def create_invoice(
+    invoice_data: schemas.InvoiceCreate,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """Issue an invoice; the ledger entry and balance update commit with it"""
+    student = await ledger.get_student(db, invoice_data.student_id)
+    invoice = await ledger.post_invoice(
+        db, student,
+        description=invoice_data.description,
+        amount=invoice_data.amount,
+        due_date=invoice_data.due_date,
+        issue_date=invoice_data.issue_date,
+        created_by=getattr(current_user, "id", None),
+    )
+    await db.commit()
+    await db.refresh(invoice)
+    return invoice
+
+
+@router.get("/invoices", response_model=list[schemas.FeeInvoice])
+@require_permissions(Permission.FEES_VIEW)
+async def list_invoices(
+    student_id: Optional[int] = None,
+    status: Optional[FeeStatus] = None,
+    pagination: Pagination = Depends(),
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
+):
+    """List invoices, newest first"""
+    query = select(models.FeeInvoice)
+    if student_id:
+        query = query.where(models.FeeInvoice.student_id == student_id)
+    if status:
+        query = query.where(models.FeeInvoice.status == status)
+    result = await db.execute(
+        query.order_by(models.FeeInvoice.id.desc()).offset(pagination.skip).limit(pagination.limit)
+    )
+    return result.scalars().all()
+
+
+@router.post("/invoices/{invoice_id}/waive", response_model=schemas.WaiverResult)
+@require_permissions(Permission.FEES_WAIVE)
+async def waive_invoice(
+    invoice_id: int,
+    waiver: schemas.WaiverCreate,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """Waive part or all of an invoice's outstanding amount"""
+    invoice, entry = await ledger.waive_invoice(
+        db, invoice_id, waiver.amount, waiver.reason,
+        created_by=getattr(current_user, "id", None),
+    )
+    await db.commit()
+    await db.refresh(invoice)
+    await db.refresh(entry)
+    return schemas.WaiverResult(invoice=invoice, entry=entry)
+
+
+@router.post("/payments", response_model=schemas.PaymentResult, status_code=status.HTTP_201_CREATED)
+@require_permissions(Permission.FEES_COLLECT)
+async def record_payment(
+    payment: schemas.PaymentCreate,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """
+    Record a payment.
+
+    Settles ``invoice_id``, or the student's open invoices oldest due
+    first; rejected if it exceeds what is outstanding.
+    """
+    student = await ledger.get_student(db, payment.student_id)
+    balance, entries = await ledger.record_payment(
+        db, student,
+        amount=payment.amount,
+        invoice_id=payment.invoice_id,
+        reference=payment.reference,
+        note=payment.note,
+        created_by=getattr(current_user, "id", None),
+    )
+    await db.commit()
+    for entry in entries:
+        await db.refresh(entry)
+    await db.refresh(balance)
+    return schemas.PaymentResult(balance=_balance_response(balance), entries=entries)
+
+
+@router.get("/students/{student_id}/balance", response_model=schemas.StudentBalance)
+@require_permissions(Permission.FEES_VIEW)
+async def get_student_balance(
+    student_id: int,
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
+):
+    """O(1) primary-key read of a student's precomputed fee position"""
+    balance = await db.get(models.StudentBalance, student_id)
+    if not balance:
+        await ledger.get_student(db, student_id)
+        return schemas.StudentBalance(
+            student_id=student_id, balance=0, total_invoiced=0, total_paid=0, total_waived=0
+        )
+    return _balance_response(balance)
+
+
+@router.get("/students/{student_id}/ledger", response_model=list[schemas.LedgerEntry])
+@require_permissions(Permission.FEES_VIEW)
+async def get_student_ledger(
+    student_id: int,
+    before_id: Optional[int] = None,
+    pagination: Pagination = Depends(),
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
+):
+    """A student's ledger, newest first (pass the last id as ``before_id`` for the next page)"""
+    query = select(models.LedgerEntry).where(models.LedgerEntry.student_id == student_id)
+    if before_id:
+        query = query.where(models.LedgerEntry.id < before_id)
+    result = await db.execute(query.order_by(models.LedgerEntry.id.desc()).limit(pagination.limit))
+    return result.scalars().all()
+
+
+@router.get("/overdue", response_model=list[schemas.StudentBalance])
+@require_any_permission(Permission.FEES_VIEW, Permission.FEES_REPORT)
+async def list_overdue_students(
+    branch_id: Optional[int] = None,
+    pagination: Pagination = Depends(),
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
+):
+    """Students with an open invoice past its due date, longest overdue first"""
+    today = date.today()
+    query = select(models.StudentBalance).where(
+        models.StudentBalance.oldest_due_date < today,
+        models.StudentBalance.balance > 0,
+    )
+    if branch_id:
+        query = query.where(models.StudentBalance.branch_id == branch_id)
+    result = await db.execute(
+        query.order_by(models.StudentBalance.oldest_due_date, models.StudentBalance.student_id)
+        .offset(pagination.skip).limit(pagination.limit)
+    )
+    return [_balance_response(balance) for balance in result.scalars()]
+
+
+@router.post("/overdue/sweep")
+@require_permissions(Permission.FEES_EDIT)
+async def sweep_overdue_invoices(
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """Run the overdue sweep for this school now instead of waiting for the schedule"""
+    return {"marked_overdue": await overdue.sweep_session(db)}
@@ -0,0 +1,146 @@
+from pydantic import BaseModel, Field, computed_field
+from typing import Optional
+from datetime import date, datetime
+from decimal import Decimal
+from app.shared.enums import FeeStatus, LedgerEntryType, BatchJobStatus
+
+
+Amount = Field(..., gt=0, max_digits=12, decimal_places=2)
+
+
+class FeeStructureCreate(BaseModel):
+    """Schema for creating a fee structure (omit branch_id / current_grade to apply to all)"""
+    name: str = Field(..., min_length=1, max_length=100)
+    term: str = Field(..., min_length=1, max_length=50)
+    branch_id: Optional[int] = None
+    current_grade: Optional[str] = Field(None, max_length=20)
+    amount: Decimal = Amount
+    due_date: date
+    is_active: bool = True
+
+
+class FeeStructure(FeeStructureCreate):
+    """Schema for fee structure response"""
+    id: int
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class InvoiceBatchCreate(BaseModel):
+    """Schema for starting term invoice generation"""
+    term: str = Field(..., min_length=1, max_length=50)
+    issue_date: Optional[date] = None
+
+
+class InvoiceBatch(BaseModel):
+    """Schema for invoice batch progress"""
+    id: int
+    term: str
+    issue_date: date
+    status: BatchJobStatus
+    total_students: int
+    processed_students: int
+    invoices_created: int
+    last_student_id: int
+    error: Optional[str] = None
+    heartbeat_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+    @computed_field
+    @property
+    def progress_percent(self) -> float:
+        if self.status == BatchJobStatus.COMPLETED:
+            return 100.0
+        if not self.total_students:
+            return 0.0
+        return round(min(self.processed_students * 100 / self.total_students, 100.0), 1)
+
+
+class InvoiceCreate(BaseModel):
+    """Schema for issuing an invoice"""
+    student_id: int
+    description: str = Field(..., min_length=1, max_length=255)
+    amount: Decimal = Amount
+    due_date: date
+    issue_date: Optional[date] = None
+
+
+class PaymentCreate(BaseModel):
+    """Schema for recording a payment (settles oldest due invoices unless invoice_id is given)"""
+    student_id: int
+    amount: Decimal = Amount
+    invoice_id: Optional[int] = None
+    reference: Optional[str] = Field(None, max_length=100)
+    note: Optional[str] = Field(None, max_length=500)
+
+
+class WaiverCreate(BaseModel):
+    """Schema for waiving an invoice (the whole outstanding amount if amount is omitted)"""
+    amount: Optional[Decimal] = Field(None, gt=0, max_digits=12, decimal_places=2)
+    reason: str = Field(..., min_length=1, max_length=500)
+
+
+class FeeInvoice(BaseModel):
+    """Schema for invoice response"""
+    id: int
+    student_id: int
+    branch_id: Optional[int] = None
+    description: str
+    structure_id: Optional[int] = None
+    batch_id: Optional[int] = None
+    amount: Decimal
+    amount_paid: Decimal
+    amount_waived: Decimal
+    outstanding: Decimal
+    status: FeeStatus
+    issue_date: date
+    due_date: date
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class LedgerEntry(BaseModel):
+    """Schema for ledger entry response"""
+    id: int
+    student_id: int
+    invoice_id: Optional[int] = None
+    entry_type: LedgerEntryType
+    amount: Decimal
+    balance_after: Decimal
+    reference: Optional[str] = None
+    note: Optional[str] = None
+    created_by: Optional[int] = None
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class StudentBalance(BaseModel):
+    """Schema for a student's fee position"""
+    student_id: int
+    branch_id: Optional[int] = None
+    balance: Decimal
+    total_invoiced: Decimal
+    total_paid: Decimal
+    total_waived: Decimal
+    oldest_due_date: Optional[date] = None
+    is_overdue: bool = False
+
+    model_config = {"from_attributes": True}
+
+
+class PaymentResult(BaseModel):
+    """Ledger entries written for a payment and the resulting balance"""
+    balance: StudentBalance
+    entries: list[LedgerEntry]
+
+
+class WaiverResult(BaseModel):
+    """Waived invoice and its ledger entry"""
+    invoice: FeeInvoice
+    entry: LedgerEntry
@@ -0,0 +1 @@
+"""Marks module"""
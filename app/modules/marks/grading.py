@@ -0,0 +1,309 @@
+"""
+Vectorized grade computation.
+
+A class's marks for a term are loaded into one ``(students, courses, exams)``
+array of percentages, NaN where no mark was entered. Course percentages are
+exam-weighted averages over the last axis, the overall percentage is a
+credit-weighted average over courses, and grading-scheme lookups, class
+ranks and percentiles are array operations over the result; nothing loops
+per student.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional, Sequence
+import numpy as np
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.exceptions import NotFoundException
+from app.modules.marks.models import Exam, Mark, GradingScheme, TermResult, CourseResult
+from app.modules.courses.models import Course
+
+
+# Used when the school has no default scheme of its own
+DEFAULT_BANDS = (
+    {"grade": "A1", "min_percent": 91, "points": 10},
+    {"grade": "A2", "min_percent": 81, "points": 9},
+    {"grade": "B1", "min_percent": 71, "points": 8},
+    {"grade": "B2", "min_percent": 61, "points": 7},
+    {"grade": "C1", "min_percent": 51, "points": 6},
+    {"grade": "C2", "min_percent": 41, "points": 5},
+    {"grade": "D", "min_percent": 33, "points": 4},
+    {"grade": "E", "min_percent": 0, "points": 0},
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Scheme:
+    """Grading bands as ascending threshold arrays"""
+    id: Optional[int]
+    grades: tuple[str, ...]
+    thresholds: np.ndarray  # (b,) ascending min_percent
+    points: np.ndarray      # (b,) NaN where a band has no points
+
+    @classmethod
+    def from_bands(cls, bands: Sequence[dict], scheme_id: Optional[int] = None) -> "Scheme":
+        ordered = sorted(bands, key=lambda band: band["min_percent"])
+        return cls(
+            id=scheme_id,
+            grades=tuple(band["grade"] for band in ordered),
+            thresholds=np.array([band["min_percent"] for band in ordered], dtype=np.float64),
+            points=np.array([np.nan if band.get("points") is None else band["points"] for band in ordered],
+                            dtype=np.float64),
+        )
+
+    def bands(self) -> list[dict]:
+        """The bands as ``GradingScheme.bands`` stores them, highest first"""
+        return [
+            {"grade": grade, "min_percent": float(threshold), "points": None if np.isnan(points) else float(points)}
+            for grade, threshold, points in reversed(list(zip(self.grades, self.thresholds, self.points)))
+        ]
+
+    def band_index(self, percent: np.ndarray) -> np.ndarray:
+        """Band of each percentage (-1 for NaN)"""
+        index = np.searchsorted(self.thresholds, percent, side="right") - 1
+        return np.where(np.isnan(percent), -1, np.maximum(index, 0))
+
+
+def weighted_average(values: np.ndarray, weights: np.ndarray, axis: int = -1) -> np.ndarray:
+    """Weighted mean along ``axis`` ignoring NaN values; NaN where nothing is present"""
+    present = ~np.isnan(values)
+    w = np.where(present, weights, 0.0)
+    total = w.sum(axis=axis)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, (np.where(present, values, 0.0) * w).sum(axis=axis) / total, np.nan)
+
+
+def competition_rank(scores: np.ndarray) -> np.ndarray:
+    """
+    Rank down axis 0, highest first, ties sharing the best rank ("1224"
+    ranking); 0 for NaN scores. Works on ``(n,)`` or ``(n, k)`` arrays.
+    """
+    filled = np.where(np.isnan(scores), -np.inf, scores)
+    order = np.argsort(-filled, axis=0, kind="stable")
+    ranked = np.take_along_axis(filled, order, axis=0)
+    position = np.arange(scores.shape[0]).reshape((-1,) + (1,) * (scores.ndim - 1))
+    starts = np.ones(ranked.shape, dtype=bool)
+    starts[1:] = ranked[1:] != ranked[:-1]
+    first = np.maximum.accumulate(np.where(starts, position, 0), axis=0) + 1
+    ranks = np.empty_like(first)
+    np.put_along_axis(ranks, order, first, axis=0)
+    return np.where(np.isnan(scores), 0, ranks)
+
+
+def percentile_rank(scores: np.ndarray) -> np.ndarray:
+    """Percent of the class scoring below, counting ties as half (NaN scores excluded)"""
+    valid = np.sort(scores[~np.isnan(scores)])
+    if not valid.size:
+        return np.full(scores.shape, np.nan)
+    below = np.searchsorted(valid, scores, side="left")
+    equal = np.searchsorted(valid, scores, side="right") - below
+    return np.where(np.isnan(scores), np.nan, (below + equal / 2) * 100 / valid.size)
+
+
+@dataclass(frozen=True, slots=True)
+class ClassResults:
+    """Computed term results of one class"""
+    student_ids: np.ndarray     # (n,)
+    course_ids: np.ndarray      # (k,)
+    course_percent: np.ndarray  # (n, k) NaN where the student has no marks in the course
+    course_band: np.ndarray     # (n, k) band index, -1 where NaN
+    course_rank: np.ndarray     # (n, k)
+    percentage: np.ndarray      # (n,)
+    band: np.ndarray            # (n,)
+    rank: np.ndarray            # (n,)
+    percentile: np.ndarray      # (n,)
+
+    def summary(self, scheme: Scheme) -> dict:
+        counts = np.bincount(self.band[self.band >= 0], minlength=len(scheme.grades))
+        return {
+            "students": int(self.student_ids.size),
+            "courses": int(self.course_ids.size),
+            "average": round(float(np.nanmean(self.percentage)), 2) if self.student_ids.size else None,
+            "highest": round(float(np.nanmax(self.percentage)), 2) if self.student_ids.size else None,
+            "grades": {grade: int(count) for grade, count in zip(scheme.grades[::-1], counts[::-1].tolist())},
+        }
+
+
+def compute_results(
+    student_ids: np.ndarray,
+    course_ids: np.ndarray,
+    scores: np.ndarray,
+    exam_weights: np.ndarray,
+    course_weights: np.ndarray,
+    scheme: Scheme,
+) -> ClassResults:
+    """
+    Grade a class from ``scores[student, course, exam]`` percentages (NaN
+    = no mark). Percentages are rounded to 2 places before ranking, so
+    students who look tied are tied.
+    """
+    course_percent = np.round(weighted_average(scores, exam_weights, axis=2), 2)
+    percentage = np.round(weighted_average(course_percent, course_weights, axis=1), 2)
+    return ClassResults(
+        student_ids=student_ids,
+        course_ids=course_ids,
+        course_percent=course_percent,
+        course_band=scheme.band_index(course_percent),
+        course_rank=competition_rank(course_percent),
+        percentage=percentage,
+        band=scheme.band_index(percentage),
+        rank=competition_rank(percentage),
+        percentile=np.round(percentile_rank(percentage), 2),
+    )
+
+
+async def load_scheme(db: AsyncSession, scheme_id: Optional[int] = None) -> Scheme:
+    """The given scheme, else the school's default, else ``DEFAULT_BANDS``"""
+    if scheme_id is not None:
+        scheme = await db.get(GradingScheme, scheme_id)
+        if not scheme:
+            raise NotFoundException(f"Grading scheme with ID {scheme_id} not found")
+    else:
+        result = await db.execute(select(GradingScheme).where(GradingScheme.is_default == True).limit(1))
+        scheme = result.scalar_one_or_none()
+        if scheme is None:
+            return Scheme.from_bands(DEFAULT_BANDS)
+    return Scheme.from_bands(scheme.bands, scheme.id)
+
+
+async def load_class_scores(db: AsyncSession, term: str, current_grade: str, section: Optional[str]):
+    """
+    ``(student_ids, course_ids, scores, exam_weights, course_weights)`` for
+    a class and term, ready for ``compute_results``
+    """
+    rows = (await db.execute(
+        select(Mark.student_id, Mark.course_id, Mark.exam_id, Mark.marks_obtained, Exam.max_marks, Exam.weight)
+        .join(Exam, Exam.id == Mark.exam_id)
+        .where(Exam.term == term, Mark.current_grade == current_grade, Mark.section == (section or ""))
+    )).all()
+
+    student_ids, row_students = np.unique(np.fromiter((r.student_id for r in rows), np.int64, len(rows)), return_inverse=True)
+    course_ids, row_courses = np.unique(np.fromiter((r.course_id for r in rows), np.int64, len(rows)), return_inverse=True)
+    exam_ids, first_row, row_exams = np.unique(
+        np.fromiter((r.exam_id for r in rows), np.int64, len(rows)), return_index=True, return_inverse=True
+    )
+
+    obtained = np.array([0.0 if r.marks_obtained is None else float(r.marks_obtained) for r in rows], dtype=np.float64)
+    max_marks = np.array([float(r.max_marks) for r in rows], dtype=np.float64)
+    scores = np.full((student_ids.size, course_ids.size, exam_ids.size), np.nan)
+    scores[row_students, row_courses, row_exams] = obtained * 100 / max_marks
+    exam_weights = np.array([float(rows[i].weight) for i in first_row.tolist()], dtype=np.float64)
+
+    credits = dict((await db.execute(
+        select(Course.id, Course.credits).where(Course.id.in_(course_ids.tolist()))
+    )).all()) if course_ids.size else {}
+    course_weights = np.array([credits.get(cid) or 1 for cid in course_ids.tolist()], dtype=np.float64)
+
+    return student_ids, course_ids, scores, exam_weights, course_weights
+
+
+async def store_results(
+    db: AsyncSession,
+    term: str,
+    current_grade: str,
+    section: Optional[str],
+    results: ClassResults,
+    scheme: Scheme,
+):
+    """Replace the class's term and course results with ``results`` (caller commits)"""
+    section = section or ""
+    computed_at = datetime.now(timezone.utc)
+    stale = select(TermResult.student_id).where(
+        TermResult.term == term, TermResult.current_grade == current_grade, TermResult.section == section,
+        TermResult.student_id.not_in(results.student_ids.tolist()),
+    )
+    stale_ids = list((await db.execute(stale)).scalars())
+    if stale_ids:
+        await db.execute(delete(CourseResult).where(CourseResult.term == term, CourseResult.student_id.in_(stale_ids)))
+        await db.execute(delete(TermResult).where(TermResult.term == term, TermResult.student_id.in_(stale_ids)))
+    if not results.student_ids.size:
+        return
+
+    student_ids = results.student_ids.tolist()
+    points = np.append(scheme.points, np.nan)  # band -1 -> NaN
+
+    def _points(values: np.ndarray) -> list:
+        return [None if np.isnan(p) else p for p in values.tolist()]
+
+    band = results.band.tolist()
+    stmt = mysql_insert(TermResult).values([
+        {
+            "term": term,
+            "student_id": student_id,
+            "current_grade": current_grade,
+            "section": section,
+            "percentage": percentage,
+            "grade": scheme.grades[b],
+            "grade_points": p,
+            "class_rank": rank,
+            "percentile": percentile,
+            "class_size": len(student_ids),
+            "scheme_id": scheme.id,
+            "computed_at": computed_at,
+        }
+        for student_id, percentage, b, p, rank, percentile in zip(
+            student_ids, results.percentage.tolist(), band, _points(points[results.band]),
+            results.rank.tolist(), results.percentile.tolist(),
+        )
+    ])
+    await db.execute(stmt.on_duplicate_key_update(
+        current_grade=stmt.inserted.current_grade,
+        section=stmt.inserted.section,
+        percentage=stmt.inserted.percentage,
+        grade=stmt.inserted.grade,
+        grade_points=stmt.inserted.grade_points,
+        class_rank=stmt.inserted.class_rank,
+        percentile=stmt.inserted.percentile,
+        class_size=stmt.inserted.class_size,
+        scheme_id=stmt.inserted.scheme_id,
+        computed_at=stmt.inserted.computed_at,
+        updated_at=func.now(),
+    ))
+
+    # Course rows are replaced wholesale; courses without marks get none
+    await db.execute(delete(CourseResult).where(CourseResult.term == term, CourseResult.student_id.in_(student_ids)))
+    rows, cols = np.nonzero(~np.isnan(results.course_percent))
+    if not rows.size:
+        return
+
+    course_band = results.course_band[rows, cols]
+    stmt = mysql_insert(CourseResult).values([
+        {
+            "term": term,
+            "student_id": student_id,
+            "course_id": course_id,
+            "percentage": percentage,
+            "grade": scheme.grades[b],
+            "grade_points": p,
+            "class_rank": rank,
+        }
+        for student_id, course_id, percentage, b, p, rank in zip(
+            results.student_ids[rows].tolist(), results.course_ids[cols].tolist(),
+            results.course_percent[rows, cols].tolist(), course_band.tolist(),
+            _points(points[course_band]), results.course_rank[rows, cols].tolist(),
+        )
+    ])
+    await db.execute(stmt.on_duplicate_key_update(
+        percentage=stmt.inserted.percentage,
+        grade=stmt.inserted.grade,
+        grade_points=stmt.inserted.grade_points,
+        class_rank=stmt.inserted.class_rank,
+        updated_at=func.now(),
+    ))
+
+
+async def compute_class(
+    db: AsyncSession,
+    term: str,
+    current_grade: str,
+    section: Optional[str] = None,
+    scheme_id: Optional[int] = None,
+    scheme: Optional[Scheme] = None,
+) -> tuple[ClassResults, Scheme]:
+    """Load, grade and store a class's term results (caller commits); ``scheme`` overrides ``scheme_id``"""
+    if scheme is None:
+        scheme = await load_scheme(db, scheme_id)
+    results = compute_results(*await load_class_scores(db, term, current_grade, section), scheme)
+    await store_results(db, term, current_grade, section, results, scheme)
+    return results, scheme
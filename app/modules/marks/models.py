@@ -0,0 +1,170 @@
+from sqlalchemy import String, Integer, Float, Boolean, ForeignKey, DateTime, Numeric, Index, JSON, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from decimal import Decimal
+from app.shared.base_models import BaseModel
+
+
+Score = Numeric(6, 2)
+
+
+class GradingScheme(BaseModel):
+    """
+    Percentage bands mapped to grades and grade points.
+
+    ``bands`` is a list of ``{"grade", "min_percent", "points"}`` objects,
+    highest band first; the lowest band starts at 0.
+    """
+    __tablename__ = "grading_schemes"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(100), nullable=False, unique=True)
+    bands: Mapped[list] = mapped_column(JSON, nullable=False)
+    is_default: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<GradingScheme {self.name}>"
+
+
+class Exam(BaseModel):
+    """
+    An assessment within a term (unit test, mid-term, final...).
+
+    A course's term percentage is the ``weight``-weighted average of its
+    exam percentages.
+    """
+    __tablename__ = "exams"
+    __table_args__ = (
+        Index("ix_exams_term", "term", "branch_id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+    term: Mapped[str] = mapped_column(String(50), nullable=False)
+    branch_id: Mapped[int] = mapped_column(ForeignKey("branches.id"), nullable=True)
+    max_marks: Mapped[Decimal] = mapped_column(Score, nullable=False, default=Decimal("100"))
+    weight: Mapped[Decimal] = mapped_column(Numeric(5, 2), nullable=False, default=Decimal("1"))
+
+    def __repr__(self) -> str:
+        return f"<Exam {self.name} ({self.term})>"
+
+
+class Mark(BaseModel):
+    """
+    One student's score in one exam and course.
+
+    ``marks_obtained`` is NULL when the student was absent (scored as 0).
+    ``current_grade`` / ``section`` snapshot the class the mark was entered
+    for, so a class mark sheet can be read back after students move on.
+    """
+    __tablename__ = "marks"
+    __table_args__ = (
+        Index("ix_marks_class", "current_grade", "section", "exam_id", "course_id"),
+    )
+
+    exam_id: Mapped[int] = mapped_column(ForeignKey("exams.id", ondelete="CASCADE"), primary_key=True)
+    course_id: Mapped[int] = mapped_column(ForeignKey("courses.id"), primary_key=True)
+    student_id: Mapped[int] = mapped_column(ForeignKey("students.id", ondelete="CASCADE"), primary_key=True, index=True)
+    branch_id: Mapped[int] = mapped_column(ForeignKey("branches.id"), nullable=True)
+
+    # Class snapshot
+    current_grade: Mapped[str] = mapped_column(String(20), nullable=False)
+    section: Mapped[str] = mapped_column(String(10), nullable=False, default="")
+
+    marks_obtained: Mapped[Decimal] = mapped_column(Score, nullable=True)
+    entered_by: Mapped[int] = mapped_column(Integer, nullable=True)
+
+    @property
+    def is_absent(self) -> bool:
+        return self.marks_obtained is None
+
+    def __repr__(self) -> str:
+        return f"<Mark exam={self.exam_id} course={self.course_id} student={self.student_id}>"
+
+
+class TermResult(BaseModel):
+    """A student's computed result for a term: overall percentage, grade and class standing"""
+    __tablename__ = "term_results"
+    __table_args__ = (
+        Index("ix_term_results_class", "term", "current_grade", "section"),
+    )
+
+    term: Mapped[str] = mapped_column(String(50), primary_key=True)
+    student_id: Mapped[int] = mapped_column(ForeignKey("students.id", ondelete="CASCADE"), primary_key=True)
+    current_grade: Mapped[str] = mapped_column(String(20), nullable=False)
+    section: Mapped[str] = mapped_column(String(10), nullable=False, default="")
+
+    percentage: Mapped[float] = mapped_column(Float, nullable=False)
+    grade: Mapped[str] = mapped_column(String(10), nullable=False)
+    grade_points: Mapped[float] = mapped_column(Float, nullable=True)
+    class_rank: Mapped[int] = mapped_column(Integer, nullable=False)
+    percentile: Mapped[float] = mapped_column(Float, nullable=False)
+    class_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    scheme_id: Mapped[int] = mapped_column(ForeignKey("grading_schemes.id"), nullable=True)
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<TermResult {self.term} student={self.student_id} {self.grade}>"
+
+
+class CourseResult(BaseModel):
+    """A student's computed result in one course for a term"""
+    __tablename__ = "course_results"
+
+    term: Mapped[str] = mapped_column(String(50), primary_key=True)
+    student_id: Mapped[int] = mapped_column(ForeignKey("students.id", ondelete="CASCADE"), primary_key=True)
+    course_id: Mapped[int] = mapped_column(ForeignKey("courses.id"), primary_key=True)
+
+    percentage: Mapped[float] = mapped_column(Float, nullable=False)
+    grade: Mapped[str] = mapped_column(String(10), nullable=False)
+    grade_points: Mapped[float] = mapped_column(Float, nullable=True)
+    class_rank: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<CourseResult {self.term} student={self.student_id} course={self.course_id}>"
+
+
+class MarksPublication(BaseModel):
+    """
+    A class's term results released to students and parents.
+
+    ``bands`` snapshots the grading bands used at publication, so regrading
+    after a marks edit never picks up a different or edited scheme.
+    """
+    __tablename__ = "marks_publications"
+
+    term: Mapped[str] = mapped_column(String(50), primary_key=True)
+    current_grade: Mapped[str] = mapped_column(String(20), primary_key=True)
+    section: Mapped[str] = mapped_column(String(10), primary_key=True, default="")
+    scheme_id: Mapped[int] = mapped_column(ForeignKey("grading_schemes.id"), nullable=True)
+    bands: Mapped[list] = mapped_column(JSON, nullable=True)
+    published_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    published_by: Mapped[int] = mapped_column(Integer, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<MarksPublication {self.term} {self.current_grade}{self.section}>"
+
+
+class ReportCard(BaseModel):
+    """
+    A student's rendered report card for a published term.
+
+    ``content`` is the JSON document served as-is; ``etag`` is a hash of
+    it and ``version`` counts rebuilds that changed it.
+    """
+    __tablename__ = "report_cards"
+    __table_args__ = (
+        Index("ix_report_cards_class", "term", "current_grade", "section"),
+    )
+
+    term: Mapped[str] = mapped_column(String(50), primary_key=True)
+    student_id: Mapped[int] = mapped_column(ForeignKey("students.id", ondelete="CASCADE"), primary_key=True)
+    current_grade: Mapped[str] = mapped_column(String(20), nullable=False)
+    section: Mapped[str] = mapped_column(String(10), nullable=False, default="")
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    etag: Mapped[str] = mapped_column(String(40), nullable=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    built_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<ReportCard {self.term} student={self.student_id} v{self.version}>"
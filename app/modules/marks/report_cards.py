@@ -0,0 +1,210 @@
+"""
+Precomputed report cards.
+
+Publishing a class's term results renders every student's report card to
+a JSON document stored in ``report_cards`` under ``(term, student_id)``,
+with a content-hash ETag. Reading a card is then one primary-key lookup
+(and a 304 when the client's ETag still matches), no grading or joins.
+
+Marks edited after publication regrade the class and re-render its cards
+in memory, but only cards whose content actually changed are written
+(and get a new version and ETag): the students whose marks were edited,
+plus anyone whose rank or percentile moved as a result.
+"""
+import hashlib
+import json
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.modules.marks import grading
+from app.modules.marks.models import Exam, Mark, TermResult, CourseResult, ReportCard, MarksPublication
+from app.modules.courses.models import Course
+from app.modules.students.models import Student
+
+
+def _etag(content: bytes) -> str:
+    return '"' + hashlib.sha256(content).hexdigest()[:32] + '"'
+
+
+def _timestamp(value: datetime) -> str:
+    """UTC timestamp that reads back identically whether or not the driver keeps tzinfo"""
+    return value.replace(tzinfo=None, microsecond=0).isoformat() + "Z"
+
+
+def _render(card: dict) -> bytes:
+    return json.dumps(card, separators=(",", ":"), sort_keys=True, default=str).encode()
+
+
+async def render_class(
+    db: AsyncSession,
+    term: str,
+    current_grade: str,
+    section: str,
+    published_at: datetime,
+) -> dict[int, bytes]:
+    """Report card documents of a class from its stored term results"""
+    results = (await db.execute(
+        select(TermResult, Student.admission_number, Student.first_name, Student.last_name)
+        .join(Student, Student.id == TermResult.student_id)
+        .where(TermResult.term == term, TermResult.current_grade == current_grade, TermResult.section == section)
+    )).all()
+    if not results:
+        return {}
+    student_ids = [row.TermResult.student_id for row in results]
+
+    course_results = defaultdict(list)
+    for course_result, code, name in (await db.execute(
+        select(CourseResult, Course.code, Course.name)
+        .join(Course, Course.id == CourseResult.course_id)
+        .where(CourseResult.term == term, CourseResult.student_id.in_(student_ids))
+        .order_by(CourseResult.student_id, Course.name)
+    )).all():
+        course_results[course_result.student_id].append((course_result, code, name))
+
+    exam_marks = defaultdict(list)
+    for mark in (await db.execute(
+        select(Mark.student_id, Mark.course_id, Mark.marks_obtained, Exam.id, Exam.name, Exam.max_marks)
+        .join(Exam, Exam.id == Mark.exam_id)
+        .where(Exam.term == term, Mark.current_grade == current_grade, Mark.section == section,
+               Mark.student_id.in_(student_ids))
+        .order_by(Exam.id)
+    )).all():
+        exam_marks[mark.student_id, mark.course_id].append({
+            "exam_id": mark.id,
+            "exam": mark.name,
+            "marks_obtained": mark.marks_obtained,
+            "max_marks": mark.max_marks,
+            "absent": mark.marks_obtained is None,
+        })
+
+    cards = {}
+    for result, admission_number, first_name, last_name in results:
+        cards[result.student_id] = _render({
+            "term": term,
+            "published_at": _timestamp(published_at),
+            "student": {
+                "id": result.student_id,
+                "admission_number": admission_number,
+                "name": f"{first_name} {last_name}",
+                "current_grade": current_grade,
+                "section": section,
+            },
+            "overall": {
+                "percentage": result.percentage,
+                "grade": result.grade,
+                "grade_points": result.grade_points,
+                "class_rank": result.class_rank,
+                "class_size": result.class_size,
+                "percentile": result.percentile,
+            },
+            "courses": [
+                {
+                    "course_id": course.course_id,
+                    "code": code,
+                    "name": name,
+                    "percentage": course.percentage,
+                    "grade": course.grade,
+                    "grade_points": course.grade_points,
+                    "class_rank": course.class_rank,
+                    "exams": exam_marks[result.student_id, course.course_id],
+                }
+                for course, code, name in course_results[result.student_id]
+            ],
+        })
+    return cards
+
+
+async def store_cards(
+    db: AsyncSession,
+    term: str,
+    current_grade: str,
+    section: str,
+    cards: dict[int, bytes],
+) -> int:
+    """Write the cards whose content changed, bumping their version; returns how many (caller commits)"""
+    existing = dict((await db.execute(
+        select(ReportCard.student_id, ReportCard.etag)
+        .where(ReportCard.term == term, ReportCard.current_grade == current_grade, ReportCard.section == section)
+    )).all())
+
+    stale = [student_id for student_id in existing if student_id not in cards]
+    if stale:
+        await db.execute(delete(ReportCard).where(ReportCard.term == term, ReportCard.student_id.in_(stale)))
+
+    changed = [
+        {
+            "term": term,
+            "student_id": student_id,
+            "current_grade": current_grade,
+            "section": section,
+            "content": content.decode(),
+            "etag": etag,
+            "version": 1,
+            "built_at": datetime.now(timezone.utc),
+        }
+        for student_id, content in cards.items()
+        if (etag := _etag(content)) != existing.get(student_id)
+    ]
+    if not changed:
+        return 0
+
+    stmt = mysql_insert(ReportCard).values(changed)
+    await db.execute(stmt.on_duplicate_key_update(
+        current_grade=stmt.inserted.current_grade,
+        section=stmt.inserted.section,
+        content=stmt.inserted.content,
+        etag=stmt.inserted.etag,
+        version=ReportCard.version + 1,
+        built_at=stmt.inserted.built_at,
+        updated_at=func.now(),
+    ))
+    return len(changed)
+
+
+async def publish_class(
+    db: AsyncSession,
+    term: str,
+    current_grade: str,
+    section: Optional[str] = None,
+    scheme_id: Optional[int] = None,
+    published_by: Optional[int] = None,
+) -> tuple[MarksPublication, grading.ClassResults, grading.Scheme, int]:
+    """Grade a class and (re)build its report cards; re-publishing keeps the original publish time"""
+    section = section or ""
+    results, scheme = await grading.compute_class(db, term, current_grade, section, scheme_id)
+
+    publication = await db.get(MarksPublication, (term, current_grade, section))
+    if publication is None:
+        publication = MarksPublication(
+            term=term, current_grade=current_grade, section=section,
+            published_at=datetime.now(timezone.utc),
+        )
+        db.add(publication)
+    publication.scheme_id = scheme.id
+    publication.bands = scheme.bands()
+    publication.published_by = published_by
+    await db.flush()
+
+    cards = await render_class(db, term, current_grade, section, publication.published_at)
+    written = await store_cards(db, term, current_grade, section, cards)
+    return publication, results, scheme, written
+
+
+async def refresh_if_published(db: AsyncSession, term: str, current_grade: str, section: Optional[str]) -> Optional[int]:
+    """
+    After marks of a class change: if its term is published, regrade and
+    rewrite the cards that changed. Returns the number rewritten, or None
+    if the class is not published (caller commits).
+    """
+    section = section or ""
+    publication = await db.get(MarksPublication, (term, current_grade, section))
+    if publication is None:
+        return None
+    # Grade with the bands published, not whatever the default scheme is today
+    scheme = grading.Scheme.from_bands(publication.bands, publication.scheme_id) if publication.bands else None
+    await grading.compute_class(db, term, current_grade, section, publication.scheme_id, scheme)
+    cards = await render_class(db, term, current_grade, section, publication.published_at)
+    return await store_cards(db, term, current_grade, section, cards)
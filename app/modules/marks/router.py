@@ -0,0 +1,336 @@
+from fastapi import APIRouter, Depends, Header, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, or_, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from typing import Optional
+import numpy as np
+from app.tenancy.database import get_tenant_db, get_tenant_db_readonly
+from app.modules.marks import schemas, models, grading, report_cards
+from app.modules.courses.models import Course
+from app.modules.students.models import Student
+from app.core.exceptions import BaseAppException, NotFoundException, ConflictException, ForbiddenException
+from app.rbac.decorators import require_permissions, require_any_permission
+from app.rbac.engine import PermissionEngine
+from app.rbac.constants import Permission
+
+router = APIRouter()
+
+
+def _in_class(grade: str, section: Optional[str]):
+    """Student filter for a grade + section (no section matches NULL or '')"""
+    if section:
+        return (Student.current_grade == grade, Student.section == section)
+    return (Student.current_grade == grade, or_(Student.section.is_(None), Student.section == ""))
+
+
+async def _get_exam(db: AsyncSession, exam_id: int) -> models.Exam:
+    exam = await db.get(models.Exam, exam_id)
+    if not exam:
+        raise NotFoundException(f"Exam with ID {exam_id} not found")
+    return exam
+
+
+@router.post("/grading-schemes", response_model=schemas.GradingScheme, status_code=status.HTTP_201_CREATED)
+@require_permissions(Permission.MARKS_EDIT)
+async def create_grading_scheme(
+    scheme_data: schemas.GradingSchemeCreate,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """Define a grading scheme; a new default replaces the previous one"""
+    if scheme_data.is_default:
+        await db.execute(
+            update(models.GradingScheme).where(models.GradingScheme.is_default == True).values(is_default=False)
+        )
+    scheme = models.GradingScheme(**scheme_data.model_dump())
+    db.add(scheme)
+    await db.commit()
+    await db.refresh(scheme)
+    return scheme
+
+
+@router.get("/grading-schemes", response_model=list[schemas.GradingScheme])
+@require_any_permission(Permission.MARKS_ENTER, Permission.MARKS_VIEW_ALL)
+async def list_grading_schemes(
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
+):
+    """List grading schemes"""
+    result = await db.execute(select(models.GradingScheme).order_by(models.GradingScheme.id))
+    return result.scalars().all()
+
+
+@router.post("/exams", response_model=schemas.Exam, status_code=status.HTTP_201_CREATED)
+@require_permissions(Permission.MARKS_EDIT)
+async def create_exam(
+    exam_data: schemas.ExamCreate,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """Create an exam within a term"""
+    exam = models.Exam(**exam_data.model_dump())
+    db.add(exam)
+    await db.commit()
+    await db.refresh(exam)
+    return exam
+
+
+@router.get("/exams", response_model=list[schemas.Exam])
+@require_any_permission(Permission.MARKS_ENTER, Permission.MARKS_VIEW_ALL)
+async def list_exams(
+    term: Optional[str] = None,
+    branch_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
+):
+    """List exams"""
+    query = select(models.Exam)
+    if term:
+        query = query.where(models.Exam.term == term)
+    if branch_id:
+        query = query.where(models.Exam.branch_id == branch_id)
+    result = await db.execute(query.order_by(models.Exam.id))
+    return result.scalars().all()
+
+
+@router.post("/bulk", response_model=schemas.BulkMarksResult)
+@require_any_permission(Permission.MARKS_ENTER, Permission.MARKS_EDIT)
+async def enter_marks_bulk(
+    sheet: schemas.BulkMarksEntry,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """
+    Enter a class's marks for one exam and course.
+
+    The whole sheet is written with a single multi-row insert. Entering
+    (``marks.enter``) only fills marks nobody has entered yet; overwriting
+    existing marks or changing a published class requires ``marks.edit``,
+    and then re-submitting a corrected sheet overwrites the earlier scores
+    via ``INSERT ... ON DUPLICATE KEY UPDATE``. If the class's term is
+    already published, it is regraded and changed report cards are rebuilt
+    in the same transaction.
+    """
+    exam = await _get_exam(db, sheet.exam_id)
+    if not await db.get(Course, sheet.course_id):
+        raise NotFoundException(f"Course with ID {sheet.course_id} not found")
+
+    present = [value for value in sheet.marks if value is not None]
+    if max(present, default=0) > exam.max_marks:
+        raise BaseAppException(f"Marks must not exceed the exam maximum of {exam.max_marks}")
+
+    # One round trip to check every student belongs to the class
+    query = select(Student.id, Student.branch_id).where(
+        Student.id.in_(sheet.student_ids), *_in_class(sheet.current_grade, sheet.section)
+    )
+    if sheet.branch_id:
+        query = query.where(Student.branch_id == sheet.branch_id)
+    branches = dict((await db.execute(query)).all())
+
+    unknown = [sid for sid in sheet.student_ids if sid not in branches]
+    if unknown:
+        raise BaseAppException(
+            f"Students not in class {sheet.current_grade}{sheet.section or ''}: {unknown[:20]}"
+        )
+
+    section = sheet.section or ""
+    overwrites = (await db.execute(
+        select(models.Mark.student_id).where(
+            models.Mark.exam_id == sheet.exam_id,
+            models.Mark.course_id == sheet.course_id,
+            models.Mark.student_id.in_(sheet.student_ids),
+        ).limit(1)
+    )).first() is not None
+    published = await db.get(models.MarksPublication, (exam.term, sheet.current_grade, section)) is not None
+    can_edit = await PermissionEngine().check_user_permissions(db, current_user, [Permission.MARKS_EDIT])
+    if (overwrites or published) and not can_edit:
+        raise ForbiddenException(
+            f"Requires {Permission.MARKS_EDIT.value} to "
+            + ("change marks of a published class" if published else "overwrite entered marks")
+        )
+
+    entered_by = getattr(current_user, "id", None)
+    stmt = mysql_insert(models.Mark).values([
+        {
+            "exam_id": sheet.exam_id,
+            "course_id": sheet.course_id,
+            "student_id": student_id,
+            "branch_id": branches[student_id],
+            "current_grade": sheet.current_grade,
+            "section": section,
+            "marks_obtained": value,
+            "entered_by": entered_by,
+        }
+        for student_id, value in zip(sheet.student_ids, sheet.marks)
+    ])
+    if can_edit:
+        stmt = stmt.on_duplicate_key_update(
+            marks_obtained=stmt.inserted.marks_obtained,
+            branch_id=stmt.inserted.branch_id,
+            current_grade=stmt.inserted.current_grade,
+            section=stmt.inserted.section,
+            entered_by=stmt.inserted.entered_by,
+            updated_at=func.now(),
+        )
+    try:
+        await db.execute(stmt)
+    except IntegrityError:
+        # Insert-only: someone entered these marks since the check above
+        await db.rollback()
+        raise ConflictException("Marks for this exam and course were entered meanwhile; reload the sheet")
+    rebuilt = await report_cards.refresh_if_published(db, exam.term, sheet.current_grade, sheet.section)
+    await db.commit()
+
+    return schemas.BulkMarksResult(
+        saved=len(sheet.student_ids),
+        absent=len(sheet.marks) - len(present),
+        average=round(float(np.mean(np.array(present, dtype=np.float64))), 2) if present else None,
+        highest=max(present, default=None),
+        lowest=min(present, default=None),
+        report_cards_rebuilt=rebuilt,
+    )
+
+
+@router.get("/sheet", response_model=list[schemas.MarkEntry])
+@require_any_permission(Permission.MARKS_ENTER, Permission.MARKS_VIEW_ALL)
+async def get_mark_sheet(
+    exam_id: int,
+    course_id: int,
+    current_grade: str,
+    section: Optional[str] = None,
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
+):
+    """Marks of one exam x course x class, ordered by student"""
+    result = await db.execute(
+        select(models.Mark)
+        .where(
+            models.Mark.exam_id == exam_id,
+            models.Mark.course_id == course_id,
+            models.Mark.current_grade == current_grade,
+            models.Mark.section == (section or ""),
+        )
+        .order_by(models.Mark.student_id)
+    )
+    return result.scalars().all()
+
+
+@router.post("/results/compute", response_model=schemas.ComputeSummary)
+@require_permissions(Permission.MARKS_EDIT)
+async def compute_class_results(
+    request: schemas.ComputeResults,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """
+    Grade a class for a term: exam-weighted course percentages,
+    credit-weighted overall percentage, grades, class ranks and
+    percentiles, computed in one NumPy pass and stored as term results.
+    """
+    publication = await db.get(
+        models.MarksPublication, (request.term, request.current_grade, request.section or "")
+    )
+    if publication is not None:
+        raise ConflictException("Results of this class are published; publish again to regrade them")
+
+    results, scheme = await grading.compute_class(
+        db, request.term, request.current_grade, request.section, request.scheme_id
+    )
+    await db.commit()
+    return results.summary(scheme)
+
+
+@router.post("/results/publish", response_model=schemas.PublishSummary)
+@require_permissions(Permission.MARKS_PUBLISH)
+async def publish_class_results(
+    request: schemas.ComputeResults,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """
+    Grade a class for a term and build every student's report card.
+    Publishing again regrades (e.g. with another scheme) and rewrites only
+    the cards that changed.
+    """
+    publication, results, scheme, written = await report_cards.publish_class(
+        db, request.term, request.current_grade, request.section, request.scheme_id,
+        published_by=getattr(current_user, "id", None),
+    )
+    await db.commit()
+    return schemas.PublishSummary(
+        **results.summary(scheme),
+        term=publication.term,
+        current_grade=publication.current_grade,
+        section=publication.section,
+        published_at=publication.published_at,
+        report_cards_written=written,
+    )
+
+
+@router.get("/report-cards/{student_id}")
+@require_permissions(Permission.MARKS_VIEW_ALL)  # No ownership check yet for students and parents
+async def get_report_card(
+    student_id: int,
+    term: str,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
+):
+    """
+    A student's published report card for a term, served from the
+    precomputed document. Send the last ``ETag`` as ``If-None-Match`` to
+    get a 304 while the card is unchanged.
+    """
+    key = (models.ReportCard.term == term, models.ReportCard.student_id == student_id)
+    card = (await db.execute(
+        select(models.ReportCard.etag, models.ReportCard.version).where(*key)
+    )).one_or_none()
+    if card is None:
+        raise NotFoundException(f"No published report card for student {student_id} in {term}")
+
+    headers = {"ETag": card.etag, "Cache-Control": "private, no-cache", "X-Report-Card-Version": str(card.version)}
+    if if_none_match and card.etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    content = (await db.execute(select(models.ReportCard.content).where(*key))).scalar_one()
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+@router.get("/results", response_model=list[schemas.TermResult])
+@require_any_permission(Permission.MARKS_VIEW_ALL, Permission.REPORTS_ACADEMIC)
+async def list_class_results(
+    term: str,
+    current_grade: str,
+    section: Optional[str] = None,
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
+):
+    """A class's term results in rank order"""
+    result = await db.execute(
+        select(models.TermResult)
+        .where(
+            models.TermResult.term == term,
+            models.TermResult.current_grade == current_grade,
+            models.TermResult.section == (section or ""),
+        )
+        .order_by(models.TermResult.class_rank, models.TermResult.student_id)
+    )
+    return result.scalars().all()
+
+
+@router.get("/results/students/{student_id}", response_model=list[schemas.CourseResult])
+@require_permissions(Permission.MARKS_VIEW_ALL)
+async def get_student_course_results(
+    student_id: int,
+    term: str,
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
+):
+    """A student's per-course results for a term"""
+    result = await db.execute(
+        select(models.CourseResult)
+        .where(models.CourseResult.term == term, models.CourseResult.student_id == student_id)
+        .order_by(models.CourseResult.course_id)
+    )
+    return result.scalars().all()
@@ -0,0 +1,156 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional
+from datetime import datetime
+from decimal import Decimal
+
+
+class GradeBand(BaseModel):
+    """Percentages from ``min_percent`` up to the next band earn ``grade``"""
+    grade: str = Field(..., min_length=1, max_length=10)
+    min_percent: float = Field(..., ge=0, le=100)
+    points: Optional[float] = Field(None, ge=0)
+
+
+class GradingSchemeCreate(BaseModel):
+    """Schema for creating a grading scheme"""
+    name: str = Field(..., min_length=1, max_length=100)
+    bands: list[GradeBand] = Field(..., min_length=1, max_length=20)
+    is_default: bool = False
+
+    @model_validator(mode="after")
+    def check_bands(self):
+        thresholds = [band.min_percent for band in self.bands]
+        if len(set(thresholds)) != len(thresholds):
+            raise ValueError("Band thresholds must be distinct")
+        if min(thresholds) != 0:
+            raise ValueError("The lowest band must start at 0")
+        self.bands.sort(key=lambda band: band.min_percent, reverse=True)
+        return self
+
+
+class GradingScheme(GradingSchemeCreate):
+    """Schema for grading scheme response"""
+    id: int
+
+    model_config = {"from_attributes": True}
+
+
+class ExamCreate(BaseModel):
+    """Schema for creating an exam"""
+    name: str = Field(..., min_length=1, max_length=100)
+    term: str = Field(..., min_length=1, max_length=50)
+    branch_id: Optional[int] = None
+    max_marks: Decimal = Field(Decimal("100"), gt=0, max_digits=6, decimal_places=2)
+    weight: Decimal = Field(Decimal("1"), gt=0, max_digits=5, decimal_places=2)
+
+
+class Exam(ExamCreate):
+    """Schema for exam response"""
+    id: int
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class ClassCourse(BaseModel):
+    """One exam and course taken by a class (grade + section)"""
+    exam_id: int
+    course_id: int
+    current_grade: str = Field(..., min_length=1, max_length=20)
+    section: Optional[str] = Field(None, max_length=10)
+
+
+class BulkMarksEntry(ClassCourse):
+    """
+    Mark sheet for one exam x course x class.
+
+    ``marks[i]`` is the score of ``student_ids[i]``; ``None`` records the
+    student as absent. Re-posting overwrites earlier scores of the listed
+    students and leaves the others untouched.
+    """
+    branch_id: Optional[int] = None
+    student_ids: list[int] = Field(..., min_length=1, max_length=500)
+    marks: list[Optional[Decimal]] = Field(..., min_length=1, max_length=500)
+
+    @model_validator(mode="after")
+    def check_vector(self):
+        if len(self.student_ids) != len(self.marks):
+            raise ValueError("student_ids and marks must have the same length")
+        if len(set(self.student_ids)) != len(self.student_ids):
+            raise ValueError("student_ids must not contain duplicates")
+        if any(value is not None and value < 0 for value in self.marks):
+            raise ValueError("marks must not be negative")
+        return self
+
+
+class BulkMarksResult(BaseModel):
+    """Outcome of a bulk marks entry"""
+    saved: int
+    absent: int
+    average: Optional[float] = None
+    highest: Optional[Decimal] = None
+    lowest: Optional[Decimal] = None
+    report_cards_rebuilt: Optional[int] = Field(None, description="Set when the class's term is published")
+
+
+class MarkEntry(BaseModel):
+    """One student's score on a mark sheet"""
+    student_id: int
+    marks_obtained: Optional[Decimal] = None
+    is_absent: bool
+
+    model_config = {"from_attributes": True}
+
+
+class ComputeResults(BaseModel):
+    """Grade a class for a term (omit scheme_id to use the default scheme)"""
+    term: str = Field(..., min_length=1, max_length=50)
+    current_grade: str = Field(..., min_length=1, max_length=20)
+    section: Optional[str] = Field(None, max_length=10)
+    scheme_id: Optional[int] = None
+
+
+class ComputeSummary(BaseModel):
+    """Outcome of a grade computation"""
+    students: int
+    courses: int
+    average: Optional[float] = None
+    highest: Optional[float] = None
+    grades: dict[str, int]
+
+
+class PublishSummary(ComputeSummary):
+    """Outcome of publishing a class's term results"""
+    term: str
+    current_grade: str
+    section: str
+    published_at: datetime
+    report_cards_written: int
+
+
+class CourseResult(BaseModel):
+    """A student's result in one course"""
+    course_id: int
+    percentage: float
+    grade: str
+    grade_points: Optional[float] = None
+    class_rank: int
+
+    model_config = {"from_attributes": True}
+
+
+class TermResult(BaseModel):
+    """A student's term result and class standing"""
+    term: str
+    student_id: int
+    current_grade: str
+    section: str
+    percentage: float
+    grade: str
+    grade_points: Optional[float] = None
+    class_rank: int
+    percentile: float
+    class_size: int
+    computed_at: datetime
+
+    model_config = {"from_attributes": True}
@@ -5,9 +5,12 @@ from typing import Optional
 import secrets
 from app.tenancy.database import get_master_db
 from app.tenancy.models import School
-from app.core.security import get_password_hash
+from app.tenancy.encryption import encrypt_password
 from app.core.dependencies import get_current_super_admin
 from app.tenancy.provisioning import provision_new_tenant
+from app.tenancy.quota import quota_service
+from app.tenancy.cache import tenant_cache
+from app.tenancy.manager import connection_manager
 from pydantic import BaseModel, Field, EmailStr
 from datetime import datetime
 
@@ -29,6 +32,7 @@ class SchoolCreateMaster(BaseModel):
     db_port: int = Field(default=3306, ge=1, le=65535)
     db_user: str = Field(default="root")
     db_password: str = Field(..., description="Database password")
+    db_replica_host: Optional[str] = Field(None, max_length=255, description="Optional read replica host")
     
     # Subscription
     max_students: Optional[int] = Field(None, ge=0)
@@ -45,6 +49,8 @@ class SchoolUpdateMaster(BaseModel):
     max_teachers: Optional[int] = Field(None, ge=0)
     subscription_tier: Optional[str] = Field(None, max_length=50)
     is_active: Optional[bool] = None
+    db_replica_host: Optional[str] = Field(None, max_length=255)
+    db_password: Optional[str] = Field(None, description="Rotate the tenant database password")
 
 
 class SchoolResponseMaster(BaseModel):
@@ -59,6 +65,7 @@ class SchoolResponseMaster(BaseModel):
     db_port: int
     db_name: str
     db_user: str
+    db_replica_host: Optional[str] = None
     max_students: Optional[int]
     max_teachers: Optional[int]
     subscription_tier: Optional[str]
@@ -148,7 +155,7 @@ async def create_school(
     db_name = f"{school_data.subdomain.lower().replace('-', '_')}_db"
     
     # Encrypt database password
-    encrypted_password = get_password_hash(school_data.db_password)
+    encrypted_password = encrypt_password(school_data.db_password)
     
     # Inherit Aiven host/user if using defaults
     db_host = school_data.db_host
@@ -179,6 +186,7 @@ async def create_school(
         db_name=db_name,
         db_user=db_user,
         db_password_encrypted=encrypted_password,
+        db_replica_host=school_data.db_replica_host,
         max_students=school_data.max_students,
         max_teachers=school_data.max_teachers,
         subscription_tier=school_data.subscription_tier,
@@ -275,12 +283,28 @@ async def update_school(
     
     # Update fields
     update_data = school_data.model_dump(exclude_unset=True)
+    new_password = update_data.pop("db_password", None)
     for field, value in update_data.items():
         setattr(school, field, value)
     
+    # Connection details changed: new version invalidates vault entries
+    credentials_changed = new_password is not None or "db_replica_host" in update_data
+    if new_password is not None:
+        school.db_password_encrypted = encrypt_password(new_password)
+    if credentials_changed:
+        school.credential_version = (school.credential_version or 1) + 1
+    
     await db.commit()
     await db.refresh(school)
     
+    # Limits or plan tier may have changed
+    await quota_service.invalidate_limits(school.id)
+    
+    # Drop cached tenant metadata; rebuild pools if credentials or the replica changed
+    await tenant_cache.invalidate_tenant(school.subdomain, school.id)
+    if credentials_changed:
+        await connection_manager.close_tenant(school.id)
+    
     return SchoolResponseMaster.model_validate(school)
 
 
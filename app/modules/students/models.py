@@ -15,6 +15,7 @@ class Student(BaseModel):
     
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     school_id: Mapped[int] = mapped_column(ForeignKey("schools.id"), nullable=False)
+    branch_id: Mapped[int] = mapped_column(ForeignKey("branches.id"), nullable=True, index=True)
     
     # Personal Information
     first_name: Mapped[str] = mapped_column(String(50), nullable=False)
@@ -1,81 +1,113 @@
 from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from typing import Optional
-from app.database import get_db
+from app.tenancy.database import get_tenant_db, get_tenant_db_readonly
+from app.tenancy.quota import quota_service
 from app.modules.students import schemas, models
 from app.core.dependencies import Pagination
 from app.core.exceptions import NotFoundException, ConflictException
+from app.rbac.decorators import require_permissions
+from app.rbac.constants import Permission
 
-router = APIRouter(prefix="/students", tags=["Students"])
+router = APIRouter()
 
 
 @router.get("/", response_model=list[schemas.Student])
-def list_students(
-    school_id: Optional[int] = None,
+@require_permissions(Permission.STUDENTS_VIEW)
+async def list_students(
+    branch_id: Optional[int] = None,
     pagination: Pagination = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
 ):
     """List all students"""
-    query = db.query(models.Student)
-    if school_id:
-        query = query.filter(models.Student.school_id == school_id)
-    students = query.offset(pagination.skip).limit(pagination.limit).all()
-    return students
+    query = select(models.Student)
+    if branch_id:
+        query = query.where(models.Student.branch_id == branch_id)
+    result = await db.execute(query.offset(pagination.skip).limit(pagination.limit))
+    return result.scalars().all()
 
 
 @router.get("/{student_id}", response_model=schemas.Student)
-def get_student(student_id: int, db: Session = Depends(get_db)):
+@require_permissions(Permission.STUDENTS_VIEW)
+async def get_student(
+    student_id: int,
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
+):
     """Get student by ID"""
-    student = db.query(models.Student).filter(models.Student.id == student_id).first()
+    student = await db.get(models.Student, student_id)
     if not student:
         raise NotFoundException(f"Student with ID {student_id} not found")
     return student
 
 
 @router.post("/", response_model=schemas.Student, status_code=status.HTTP_201_CREATED)
-def create_student(student_data: schemas.StudentCreate, db: Session = Depends(get_db)):
-    """Create a new student"""
+@require_permissions(Permission.STUDENTS_CREATE)
+async def create_student(
+    student_data: schemas.StudentCreate,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """
+    Create a new student.
+
+    Rejected with 403 when the school's plan limit (max_students) is reached.
+    """
     # Check if admission number already exists
-    existing = db.query(models.Student).filter(
-        models.Student.admission_number == student_data.admission_number
-    ).first()
-    if existing:
+    existing = await db.execute(
+        select(models.Student.id).where(
+            models.Student.admission_number == student_data.admission_number
+        )
+    )
+    if existing.scalar_one_or_none():
         raise ConflictException(f"Student with admission number '{student_data.admission_number}' already exists")
-    
-    student = models.Student(**student_data.model_dump())
-    db.add(student)
-    db.commit()
-    db.refresh(student)
+
+    async with quota_service.reserve(db, "students"):
+        student = models.Student(**student_data.model_dump())
+        db.add(student)
+        await db.commit()
+
+    await db.refresh(student)
     return student
 
 
 @router.patch("/{student_id}", response_model=schemas.Student)
-def update_student(
+@require_permissions(Permission.STUDENTS_EDIT)
+async def update_student(
     student_id: int,
     student_data: schemas.StudentUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
 ):
-    """Update a student"""
-    student = db.query(models.Student).filter(models.Student.id == student_id).first()
+    """Update a student (including branch transfer via branch_id)"""
+    student = await db.get(models.Student, student_id)
     if not student:
         raise NotFoundException(f"Student with ID {student_id} not found")
-    
+
     update_data = student_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(student, field, value)
-    
-    db.commit()
-    db.refresh(student)
+
+    await db.commit()
+    await db.refresh(student)
     return student
 
 
 @router.delete("/{student_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_student(student_id: int, db: Session = Depends(get_db)):
+@require_permissions(Permission.STUDENTS_DELETE)
+async def delete_student(
+    student_id: int,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
     """Delete a student"""
-    student = db.query(models.Student).filter(models.Student.id == student_id).first()
+    student = await db.get(models.Student, student_id)
     if not student:
         raise NotFoundException(f"Student with ID {student_id} not found")
-    
-    db.delete(student)
-    db.commit()
+
+    await db.delete(student)
+    await db.commit()
+    await quota_service.release(db.info["tenant_id"], "students")
     return None
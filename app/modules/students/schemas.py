@@ -7,6 +7,7 @@ from app.shared.enums import Gender
 class StudentBase(BaseModel):
     """Base student schema"""
     school_id: int
+    branch_id: Optional[int] = None
     first_name: str = Field(..., min_length=1, max_length=50)
     last_name: str = Field(..., min_length=1, max_length=50)
     date_of_birth: date
@@ -30,6 +31,7 @@ class StudentCreate(StudentBase):
 
 class StudentUpdate(BaseModel):
     """Schema for updating a student"""
+    branch_id: Optional[int] = None
     first_name: Optional[str] = Field(None, min_length=1, max_length=50)
     last_name: Optional[str] = Field(None, min_length=1, max_length=50)
     email: Optional[EmailStr] = None
@@ -1,81 +1,113 @@
 from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from typing import Optional
-from app.database import get_db
+from app.tenancy.database import get_tenant_db, get_tenant_db_readonly
+from app.tenancy.quota import quota_service
 from app.modules.teachers import schemas, models
 from app.core.dependencies import Pagination
 from app.core.exceptions import NotFoundException, ConflictException
+from app.rbac.decorators import require_permissions
+from app.rbac.constants import Permission
 
-router = APIRouter(prefix="/teachers", tags=["Teachers"])
+router = APIRouter()
 
 
 @router.get("/", response_model=list[schemas.Teacher])
-def list_teachers(
-    school_id: Optional[int] = None,
+@require_permissions(Permission.TEACHERS_VIEW)
+async def list_teachers(
+    branch_id: Optional[int] = None,
     pagination: Pagination = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
 ):
     """List all teachers"""
-    query = db.query(models.Teacher)
-    if school_id:
-        query = query.filter(models.Teacher.school_id == school_id)
-    teachers = query.offset(pagination.skip).limit(pagination.limit).all()
-    return teachers
+    query = select(models.Teacher)
+    if branch_id:
+        query = query.where(models.Teacher.branch_id == branch_id)
+    result = await db.execute(query.offset(pagination.skip).limit(pagination.limit))
+    return result.scalars().all()
 
 
 @router.get("/{teacher_id}", response_model=schemas.Teacher)
-def get_teacher(teacher_id: int, db: Session = Depends(get_db)):
+@require_permissions(Permission.TEACHERS_VIEW)
+async def get_teacher(
+    teacher_id: int,
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
+):
     """Get teacher by ID"""
-    teacher = db.query(models.Teacher).filter(models.Teacher.id == teacher_id).first()
+    teacher = await db.get(models.Teacher, teacher_id)
     if not teacher:
         raise NotFoundException(f"Teacher with ID {teacher_id} not found")
     return teacher
 
 
 @router.post("/", response_model=schemas.Teacher, status_code=status.HTTP_201_CREATED)
-def create_teacher(teacher_data: schemas.TeacherCreate, db: Session = Depends(get_db)):
-    """Create a new teacher"""
+@require_permissions(Permission.TEACHERS_CREATE)
+async def create_teacher(
+    teacher_data: schemas.TeacherCreate,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """
+    Create a new teacher.
+
+    Rejected with 403 when the school's plan limit (max_teachers) is reached.
+    """
     # Check if employee ID already exists
-    existing = db.query(models.Teacher).filter(
-        models.Teacher.employee_id == teacher_data.employee_id
-    ).first()
-    if existing:
+    existing = await db.execute(
+        select(models.Teacher.id).where(
+            models.Teacher.employee_id == teacher_data.employee_id
+        )
+    )
+    if existing.scalar_one_or_none():
         raise ConflictException(f"Teacher with employee ID '{teacher_data.employee_id}' already exists")
-    
-    teacher = models.Teacher(**teacher_data.model_dump())
-    db.add(teacher)
-    db.commit()
-    db.refresh(teacher)
+
+    async with quota_service.reserve(db, "teachers"):
+        teacher = models.Teacher(**teacher_data.model_dump())
+        db.add(teacher)
+        await db.commit()
+
+    await db.refresh(teacher)
     return teacher
 
 
 @router.patch("/{teacher_id}", response_model=schemas.Teacher)
-def update_teacher(
+@require_permissions(Permission.TEACHERS_EDIT)
+async def update_teacher(
     teacher_id: int,
     teacher_data: schemas.TeacherUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
 ):
-    """Update a teacher"""
-    teacher = db.query(models.Teacher).filter(models.Teacher.id == teacher_id).first()
+    """Update a teacher (including branch transfer via branch_id)"""
+    teacher = await db.get(models.Teacher, teacher_id)
     if not teacher:
         raise NotFoundException(f"Teacher with ID {teacher_id} not found")
-    
+
     update_data = teacher_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(teacher, field, value)
-    
-    db.commit()
-    db.refresh(teacher)
+
+    await db.commit()
+    await db.refresh(teacher)
     return teacher
 
 
 @router.delete("/{teacher_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_teacher(teacher_id: int, db: Session = Depends(get_db)):
+@require_permissions(Permission.TEACHERS_DELETE)
+async def delete_teacher(
+    teacher_id: int,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
     """Delete a teacher"""
-    teacher = db.query(models.Teacher).filter(models.Teacher.id == teacher_id).first()
+    teacher = await db.get(models.Teacher, teacher_id)
     if not teacher:
         raise NotFoundException(f"Teacher with ID {teacher_id} not found")
-    
-    db.delete(teacher)
-    db.commit()
+
+    await db.delete(teacher)
+    await db.commit()
+    await quota_service.release(db.info["tenant_id"], "teachers")
     return None
@@ -7,6 +7,7 @@ from app.shared.enums import Gender
 class TeacherBase(BaseModel):
     """Base teacher schema"""
     school_id: int
+    branch_id: Optional[int] = None
     first_name: str = Field(..., min_length=1, max_length=50)
     last_name: str = Field(..., min_length=1, max_length=50)
     date_of_birth: date
@@ -29,6 +30,7 @@ class TeacherCreate(TeacherBase):
 
 class TeacherUpdate(BaseModel):
     """Schema for updating a teacher"""
+    branch_id: Optional[int] = None
     first_name: Optional[str] = Field(None, min_length=1, max_length=50)
     last_name: Optional[str] = Field(None, min_length=1, max_length=50)
     email: Optional[EmailStr] = None
@@ -0,0 +1 @@
+"""Timetable module"""
@@ -0,0 +1,360 @@
+"""
+Timetable conflict index.
+
+Every booking (a timetable slot) occupies a half-open interval of
+minutes-of-week, from its period's start in the bell schedule
+(``TIMETABLE_PERIOD_STARTS``) for ``TIMETABLE_PERIOD_MINUTES``. Each
+teacher, room and class of a timetable has an ``IntervalSet`` of its
+bookings, which never overlap, so whether a new interval collides is a
+single bisect: only the last booking starting before the new one ends can
+overlap it.
+
+Indexes are held in memory per tenant and built lazily from the DB: the
+active timetables plus the teacher roster on first use, a draft
+timetable the first time it is edited. Edits made through this worker
+update the index in place. Other workers notice through a per-tenant
+version counter in Redis and rebuild; without Redis an index is simply
+rebuilt after ``TIMETABLE_INDEX_TTL_SECONDS``. Indexes are only ever
+loaded from the primary: rows read from a lagging replica would be cached
+under the current version and served until the next change.
+"""
+import asyncio
+import bisect
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from zoneinfo import ZoneInfo
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.modules.timetable.generator import WEEKDAYS
+from app.modules.timetable.models import Timetable, TimetableSlot
+from app.modules.teachers.models import Teacher
+from app.shared.enums import DayOfWeek
+from app.tenancy.cache import tenant_cache, REDIS_UNAVAILABLE
+
+logger = logging.getLogger(__name__)
+
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def _bell_schedule() -> list[int]:
+    starts = [int(hours) * 60 + int(minutes) for hours, minutes in
+              (value.split(":") for value in settings.TIMETABLE_PERIOD_STARTS)]
+    if any(b - a < settings.TIMETABLE_PERIOD_MINUTES for a, b in zip(starts, starts[1:])):
+        raise ValueError("TIMETABLE_PERIOD_STARTS must be ascending and at least a period apart")
+    return starts
+
+
+PERIOD_STARTS = _bell_schedule()
+
+
+def period_interval(day: DayOfWeek, period: int) -> tuple[int, int]:
+    """Minutes-of-week ``[start, end)`` of a period (numbered from 1)"""
+    start = WEEKDAYS.index(day) * MINUTES_PER_DAY + PERIOD_STARTS[period - 1]
+    return start, start + settings.TIMETABLE_PERIOD_MINUTES
+
+
+def minute_of_week(at: datetime) -> int:
+    """School-local minute of the week (Monday 00:00 is 0); naive times are taken as school-local"""
+    if at.tzinfo is not None:
+        at = at.astimezone(ZoneInfo(settings.TIMETABLE_TIMEZONE))
+    return at.weekday() * MINUTES_PER_DAY + at.hour * 60 + at.minute
+
+
+def period_at(minute: int) -> Optional[int]:
+    """The period running at a minute of the week, if any"""
+    i = bisect.bisect_right(PERIOD_STARTS, minute % MINUTES_PER_DAY) - 1
+    if i >= 0 and minute % MINUTES_PER_DAY < PERIOD_STARTS[i] + settings.TIMETABLE_PERIOD_MINUTES:
+        return i + 1
+    return None
+
+
+def clock(minute: int) -> str:
+    return f"{minute % MINUTES_PER_DAY // 60:02d}:{minute % 60:02d}"
+
+
+class IntervalSet:
+    """Disjoint half-open intervals of one resource, sorted by start"""
+
+    __slots__ = ("starts", "ends", "refs")
+
+    def __init__(self):
+        self.starts: list[int] = []
+        self.ends: list[int] = []
+        self.refs: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def find(self, start: int, end: int, ignore: Optional[int] = None) -> Optional[int]:
+        """Ref of a booking overlapping ``[start, end)``, skipping ``ignore``"""
+        i = bisect.bisect_left(self.starts, end) - 1
+        if i >= 0 and self.refs[i] == ignore:
+            i -= 1
+        if i >= 0 and self.ends[i] > start:
+            return self.refs[i]
+        return None
+
+    def next_start(self, minute: int) -> Optional[int]:
+        """Start of the first booking after ``minute``"""
+        i = bisect.bisect_right(self.starts, minute)
+        return self.starts[i] if i < len(self.starts) else None
+
+    def add(self, start: int, end: int, ref: int):
+        i = bisect.bisect_left(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.refs.insert(i, ref)
+
+    def remove(self, start: int, ref: int):
+        i = bisect.bisect_left(self.starts, start)
+        while i < len(self.starts) and self.starts[i] == start:
+            if self.refs[i] == ref:
+                del self.starts[i], self.ends[i], self.refs[i]
+                return
+            i += 1
+
+
+def resource_keys(current_grade: str, section: str, teacher_id: int, room_id: Optional[int]) -> tuple:
+    """The resources a booking occupies"""
+    keys = (("class", current_grade, section), ("teacher", teacher_id))
+    return keys + (("room", room_id),) if room_id else keys
+
+
+@dataclass(frozen=True, slots=True)
+class Booking:
+    day: DayOfWeek
+    period: int
+    start: int
+    end: int
+    keys: tuple
+
+
+@dataclass(frozen=True, slots=True)
+class Conflict:
+    """An existing booking a proposed one collides with"""
+    resource: str  # "class", "teacher" or "room"
+    timetable_id: int
+    slot_id: int
+    day: DayOfWeek
+    period: int
+
+
+class TimetableIndex:
+    """Bookings of one timetable, per teacher, room and class"""
+
+    def __init__(self, timetable_id: int, branch_id: Optional[int]):
+        self.timetable_id = timetable_id
+        self.branch_id = branch_id
+        self.bookings: dict[int, Booking] = {}
+        self.resources: dict[tuple, IntervalSet] = {}
+
+    def add(self, slot_id: int, day: DayOfWeek, period: int, keys: tuple):
+        start, end = period_interval(day, period)
+        self.bookings[slot_id] = Booking(day, period, start, end, keys)
+        for key in keys:
+            self.resources.setdefault(key, IntervalSet()).add(start, end, slot_id)
+
+    def remove(self, slot_id: int):
+        booking = self.bookings.pop(slot_id, None)
+        if booking is None:
+            return
+        for key in booking.keys:
+            self.resources[key].remove(booking.start, slot_id)
+
+    def add_slot(self, slot: TimetableSlot):
+        self.add(slot.id, slot.day, slot.period,
+                 resource_keys(slot.current_grade, slot.section, slot.teacher_id, slot.room_id))
+
+    def conflicts(self, keys: tuple, start: int, end: int, ignore: Optional[int] = None) -> list[Conflict]:
+        found = []
+        for key in keys:
+            intervals = self.resources.get(key)
+            slot_id = intervals.find(start, end, ignore) if intervals else None
+            if slot_id is not None:
+                booking = self.bookings[slot_id]
+                found.append(Conflict(key[0], self.timetable_id, slot_id, booking.day, booking.period))
+        return found
+
+
+class TenantSchedule:
+    """One tenant's indexes: active timetables, edited drafts and the teacher roster"""
+
+    def __init__(self, version: Optional[int]):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.active: dict[Optional[int], int] = {}  # branch_id -> active timetable id
+        self.timetables: dict[int, TimetableIndex] = {}
+        self.teachers: dict[int, tuple[Optional[int], str]] = {}  # id -> (branch_id, name)
+        self.lock = asyncio.Lock()  # Serializes check-then-write edits within this worker
+
+    def conflicts(
+        self,
+        index: TimetableIndex,
+        keys: tuple,
+        day: DayOfWeek,
+        period: int,
+        ignore: Optional[int] = None,
+    ) -> list[Conflict]:
+        """
+        Collisions of a booking proposed for ``index``'s timetable: its class,
+        teacher and room within that timetable, and its teacher in the active
+        timetables of other branches.
+        """
+        start, end = period_interval(day, period)
+        found = index.conflicts(keys, start, end, ignore)
+        teacher = (keys[1],)
+        for branch_id, timetable_id in self.active.items():
+            if branch_id != index.branch_id and timetable_id != index.timetable_id:
+                found += self.timetables[timetable_id].conflicts(teacher, start, end)
+        return found
+
+    def free_teachers(self, minute: int, branch_id: Optional[int] = None) -> list[tuple[int, str, Optional[int]]]:
+        """
+        ``(teacher_id, name, busy_from)`` of teachers not teaching at a minute
+        of the week under any active timetable; ``busy_from`` is when their
+        next lesson that day starts. A branch filter keeps school-level
+        teachers (no branch).
+        """
+        active = [self.timetables[timetable_id] for timetable_id in self.active.values()]
+        day_end = (minute // MINUTES_PER_DAY + 1) * MINUTES_PER_DAY
+        free = []
+        for teacher_id, (teacher_branch, name) in self.teachers.items():
+            if branch_id is not None and teacher_branch not in (branch_id, None):
+                continue
+            key = ("teacher", teacher_id)
+            busy_from = None
+            for index in active:
+                intervals = index.resources.get(key)
+                if not intervals:
+                    continue
+                if intervals.find(minute, minute + 1) is not None:
+                    break
+                start = intervals.next_start(minute)
+                if start is not None and start < day_end and (busy_from is None or start < busy_from):
+                    busy_from = start
+            else:
+                free.append((teacher_id, name, busy_from))
+        return free
+
+
+class ConflictIndex:
+    """
+    Per-tenant conflict indexes of this worker, least recently used
+    tenants evicted beyond ``TIMETABLE_INDEX_MAX_TENANTS``.
+    """
+
+    def __init__(self):
+        self._tenants: OrderedDict[int, TenantSchedule] = OrderedDict()
+
+    def _version_key(self, tenant_id: int) -> str:
+        return f"timetable:version:{tenant_id}"
+
+    def _tenant_id(self, db: AsyncSession) -> int:
+        tenant_id: Optional[int] = db.info.get("tenant_id")
+        if tenant_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Tenant context not available for timetable index"
+            )
+        return tenant_id
+
+    async def _remote_version(self, tenant_id: int) -> Optional[int]:
+        if not tenant_cache.redis:
+            return None
+        try:
+            value = await tenant_cache.redis.get(self._version_key(tenant_id))
+        except REDIS_UNAVAILABLE as e:
+            logger.warning(f"Timetable index version unavailable for tenant {tenant_id}: {e}")
+            return None
+        return int(value or 0)
+
+    async def _build(self, db: AsyncSession, version: Optional[int]) -> TenantSchedule:
+        schedule = TenantSchedule(version)
+        for teacher_id, branch_id, first_name, last_name in (await db.execute(
+            select(Teacher.id, Teacher.branch_id, Teacher.first_name, Teacher.last_name)
+        )).all():
+            schedule.teachers[teacher_id] = (branch_id, f"{first_name} {last_name}")
+
+        for timetable_id, branch_id in (await db.execute(
+            select(Timetable.id, Timetable.branch_id).where(Timetable.is_active == True)
+        )).all():
+            schedule.active[branch_id] = timetable_id
+            schedule.timetables[timetable_id] = TimetableIndex(timetable_id, branch_id)
+        if schedule.active:
+            for slot in (await db.execute(
+                select(TimetableSlot).where(TimetableSlot.timetable_id.in_(list(schedule.active.values())))
+            )).scalars():
+                schedule.timetables[slot.timetable_id].add_slot(slot)
+        return schedule
+
+    async def get(self, db: AsyncSession) -> TenantSchedule:
+        """The tenant's index, rebuilt when stale (``db`` must be a primary session)"""
+        if db.info.get("readonly"):
+            raise RuntimeError("The timetable conflict index must be loaded from the primary")
+        tenant_id = self._tenant_id(db)
+        schedule = self._tenants.get(tenant_id)
+        version = await self._remote_version(tenant_id)
+        if (
+            schedule is None
+            or schedule.version != version
+            or time.monotonic() - schedule.built_at > settings.TIMETABLE_INDEX_TTL_SECONDS
+        ):
+            schedule = await self._build(db, version)
+            self._tenants[tenant_id] = schedule
+        self._tenants.move_to_end(tenant_id)
+        while len(self._tenants) > settings.TIMETABLE_INDEX_MAX_TENANTS:
+            self._tenants.popitem(last=False)
+        return schedule
+
+    async def timetable(self, db: AsyncSession, schedule: TenantSchedule, timetable: Timetable) -> TimetableIndex:
+        """Index of one timetable, loading a draft's slots on first use"""
+        index = schedule.timetables.get(timetable.id)
+        if index is None:
+            index = TimetableIndex(timetable.id, timetable.branch_id)
+            for slot in (await db.execute(
+                select(TimetableSlot).where(TimetableSlot.timetable_id == timetable.id)
+            )).scalars():
+                index.add_slot(slot)
+            schedule.timetables[timetable.id] = index
+        return index
+
+    async def changed(self, db: AsyncSession, schedule: TenantSchedule):
+        """
+        After committing an edit already applied to ``schedule``: tell other
+        workers, keeping this index unless another edit slipped in between.
+        """
+        tenant_id = self._tenant_id(db)
+        if not tenant_cache.redis:
+            return
+        try:
+            version = await tenant_cache.redis.incr(self._version_key(tenant_id))
+        except REDIS_UNAVAILABLE as e:
+            logger.warning(f"Timetable index version not bumped for tenant {tenant_id}: {e}")
+            self._tenants.pop(tenant_id, None)
+            return
+        if schedule.version == version - 1:
+            schedule.version = version
+        else:
+            self._tenants.pop(tenant_id, None)
+
+    async def invalidate(self, db: AsyncSession):
+        """Drop the tenant's indexes everywhere (after activating or deleting a timetable)"""
+        tenant_id = self._tenant_id(db)
+        self._tenants.pop(tenant_id, None)
+        if not tenant_cache.redis:
+            return
+        try:
+            await tenant_cache.redis.incr(self._version_key(tenant_id))
+        except REDIS_UNAVAILABLE as e:
+            logger.warning(f"Timetable index version not bumped for tenant {tenant_id}: {e}")
+
+
+# Global conflict index instance
+conflict_index = ConflictIndex()
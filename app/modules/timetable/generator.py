@@ -0,0 +1,201 @@
+"""
+Timetable generation.
+
+Loads a branch's teaching assignments, rooms, class sizes and teacher
+unavailability into a ``solver.Problem``, solves it off the event loop and
+stores the result as a draft ``Timetable``.
+
+A branch's scope is its own assignments and rooms; ``branch_id=None`` is
+the school-level scope (assignments and rooms without a branch). Teachers
+who also teach in another scope's active timetable are treated as
+unavailable in those periods, so activating both never double-books them.
+"""
+import asyncio
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import select, insert, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.modules.timetable.models import Room, TeachingAssignment, TeacherUnavailability, Timetable, TimetableSlot
+from app.modules.timetable.solver import Lesson, Problem, Solution, solve
+from app.modules.courses.models import Course
+from app.modules.students.models import Student
+from app.core.exceptions import BaseAppException
+from app.shared.enums import DayOfWeek
+
+
+WEEKDAYS = tuple(DayOfWeek)  # Monday first, like date.weekday()
+
+
+def in_scope(column, branch_id: Optional[int]):
+    """Rows of a branch, or the school-level rows (no branch) when ``branch_id`` is None"""
+    return column.is_(None) if branch_id is None else column == branch_id
+
+
+@dataclass(slots=True)
+class Instance:
+    """A solver problem plus the ids its indices stand for"""
+    problem: Problem
+    classes: list[tuple[str, str]]  # group index -> (grade, section)
+    teacher_ids: list[int]
+    room_ids: list[int]
+
+
+async def load_instance(db: AsyncSession, branch_id: Optional[int], days: int, periods: int) -> Instance:
+    """Build the scheduling problem of a branch"""
+    assignments = (await db.execute(
+        select(TeachingAssignment, Course.credits)
+        .join(Course, Course.id == TeachingAssignment.course_id)
+        .where(in_scope(TeachingAssignment.branch_id, branch_id))
+        .order_by(TeachingAssignment.current_grade, TeachingAssignment.section, TeachingAssignment.course_id)
+    )).all()
+    if not assignments:
+        raise BaseAppException("No teaching assignments to schedule")
+    missing = [a.id for a, credits in assignments if not (a.periods_per_week or credits)]
+    if missing:
+        raise BaseAppException(
+            f"Teaching assignments without periods_per_week or course credits: {missing[:20]}"
+        )
+
+    size_query = (
+        select(Student.current_grade, func.coalesce(Student.section, ""), func.count())
+        .group_by(Student.current_grade, func.coalesce(Student.section, ""))
+    )
+    if branch_id is not None:
+        size_query = size_query.where(Student.branch_id == branch_id)
+    sizes = {(grade, section): count for grade, section, count in (await db.execute(size_query)).all()}
+
+    classes = sorted({(a.current_grade, a.section) for a, _ in assignments})
+    teacher_ids = sorted({a.teacher_id for a, _ in assignments})
+    group = {key: i for i, key in enumerate(classes)}
+    teacher = {tid: i for i, tid in enumerate(teacher_ids)}
+
+    lessons = []
+    for a, credits in assignments:
+        key = (a.current_grade, a.section)
+        lesson = Lesson(group[key], teacher[a.teacher_id], a.course_id, sizes.get(key, 0))
+        lessons += [lesson] * (a.periods_per_week or credits)
+
+    rooms = (await db.execute(
+        select(Room.id, Room.capacity)
+        .where(in_scope(Room.branch_id, branch_id), Room.is_active == True)
+        .order_by(Room.id)
+    )).all()
+
+    unavailable = defaultdict(set)
+
+    def block(teacher_id: int, day: DayOfWeek, period: int):
+        d = WEEKDAYS.index(day)
+        if d >= days or period > periods:
+            return
+        first, last = (0, periods) if period == 0 else (period - 1, period)
+        unavailable[teacher[teacher_id]].update(d * periods + p for p in range(first, last))
+
+    for row in (await db.execute(
+        select(TeacherUnavailability.teacher_id, TeacherUnavailability.day, TeacherUnavailability.period)
+        .where(TeacherUnavailability.teacher_id.in_(teacher_ids))
+    )).all():
+        block(*row)
+
+    # Periods these teachers already teach under another scope's active timetable
+    other_scope = Timetable.branch_id.is_not(None) if branch_id is None else (
+        (Timetable.branch_id != branch_id) | Timetable.branch_id.is_(None)
+    )
+    for row in (await db.execute(
+        select(TimetableSlot.teacher_id, TimetableSlot.day, TimetableSlot.period)
+        .join(Timetable, Timetable.id == TimetableSlot.timetable_id)
+        .where(Timetable.is_active == True, other_scope, TimetableSlot.teacher_id.in_(teacher_ids))
+    )).all():
+        block(*row)
+
+    problem = Problem(
+        days=days,
+        periods=periods,
+        lessons=lessons,
+        groups=len(classes),
+        teachers=len(teacher_ids),
+        room_capacity=[row.capacity for row in rooms],
+        teacher_unavailable=dict(unavailable),
+    )
+    return Instance(problem, classes, teacher_ids, [row.id for row in rooms])
+
+
+def unplaced_lessons(instance: Instance, solution: Solution) -> list[dict]:
+    """Lessons the solver could not fit, counted per class and course"""
+    counts = Counter(instance.problem.lessons[l] for l in solution.unplaced)
+    return [
+        {
+            "current_grade": instance.classes[lesson.group][0],
+            "section": instance.classes[lesson.group][1],
+            "course_id": lesson.course,
+            "teacher_id": instance.teacher_ids[lesson.teacher],
+            "periods": count,
+        }
+        for lesson, count in counts.items()
+    ]
+
+
+async def store_timetable(
+    db: AsyncSession,
+    instance: Instance,
+    solution: Solution,
+    name: str,
+    branch_id: Optional[int],
+    seed: int,
+    created_by: Optional[int] = None,
+) -> Timetable:
+    """Save a solution as a draft timetable (caller commits)"""
+    problem = instance.problem
+    timetable = Timetable(
+        branch_id=branch_id,
+        name=name,
+        days=problem.days,
+        periods_per_day=problem.periods,
+        is_active=False,
+        lessons=len(problem.lessons),
+        unplaced=len(solution.unplaced),
+        penalty=solution.penalty,
+        seed=seed,
+        generated_at=datetime.now(timezone.utc),
+        created_by=created_by,
+    )
+    db.add(timetable)
+    await db.flush()
+
+    rows = []
+    for lesson, s, room in zip(problem.lessons, solution.slot, solution.room):
+        if s < 0:
+            continue
+        grade, section = instance.classes[lesson.group]
+        rows.append({
+            "timetable_id": timetable.id,
+            "day": WEEKDAYS[s // problem.periods],
+            "period": s % problem.periods + 1,
+            "current_grade": grade,
+            "section": section,
+            "course_id": lesson.course,
+            "teacher_id": instance.teacher_ids[lesson.teacher],
+            "room_id": instance.room_ids[room] if room >= 0 else None,
+        })
+    if rows:
+        await db.execute(insert(TimetableSlot), rows)
+    return timetable
+
+
+async def generate(
+    db: AsyncSession,
+    branch_id: Optional[int],
+    name: str,
+    days: int,
+    periods: int,
+    seed: int = 0,
+    time_limit: float = 10.0,
+    created_by: Optional[int] = None,
+) -> tuple[Timetable, Instance, Solution]:
+    """Schedule a branch and store the draft timetable (caller commits)"""
+    instance = await load_instance(db, branch_id, days, periods)
+    # CPU-bound; keep the event loop serving other requests meanwhile
+    solution = await asyncio.to_thread(solve, instance.problem, time_limit, seed)
+    timetable = await store_timetable(db, instance, solution, name, branch_id, seed, created_by)
+    return timetable, instance, solution
@@ -0,0 +1,117 @@
+from sqlalchemy import String, Integer, Boolean, ForeignKey, DateTime, Index, UniqueConstraint, Enum as SQLEnum
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from app.shared.base_models import BaseModel
+from app.shared.enums import DayOfWeek
+
+
+class Room(BaseModel):
+    """A teaching room and how many students it seats"""
+    __tablename__ = "rooms"
+    __table_args__ = (
+        UniqueConstraint("branch_id", "name", name="uq_rooms_branch_name"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    branch_id: Mapped[int] = mapped_column(ForeignKey("branches.id"), nullable=True)
+    name: Mapped[str] = mapped_column(String(50), nullable=False)
+    capacity: Mapped[int] = mapped_column(Integer, nullable=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<Room {self.name} ({self.capacity})>"
+
+
+class TeachingAssignment(BaseModel):
+    """
+    Who teaches a course to a class (grade + section), and how often.
+
+    ``periods_per_week`` overrides the course's ``credits`` when set.
+    """
+    __tablename__ = "teaching_assignments"
+    __table_args__ = (
+        UniqueConstraint(
+            "branch_id", "current_grade", "section", "course_id", name="uq_teaching_assignments_class_course"
+        ),
+        Index("ix_teaching_assignments_teacher", "teacher_id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    branch_id: Mapped[int] = mapped_column(ForeignKey("branches.id"), nullable=True)
+    current_grade: Mapped[str] = mapped_column(String(20), nullable=False)
+    section: Mapped[str] = mapped_column(String(10), nullable=False, default="")
+    course_id: Mapped[int] = mapped_column(ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
+    teacher_id: Mapped[int] = mapped_column(ForeignKey("teachers.id", ondelete="CASCADE"), nullable=False)
+    periods_per_week: Mapped[int] = mapped_column(Integer, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<TeachingAssignment {self.current_grade}{self.section} course={self.course_id} teacher={self.teacher_id}>"
+
+
+class TeacherUnavailability(BaseModel):
+    """A period a teacher cannot teach; period 0 blocks the whole day"""
+    __tablename__ = "teacher_unavailability"
+
+    teacher_id: Mapped[int] = mapped_column(ForeignKey("teachers.id", ondelete="CASCADE"), primary_key=True)
+    day: Mapped[DayOfWeek] = mapped_column(SQLEnum(DayOfWeek), primary_key=True)
+    period: Mapped[int] = mapped_column(Integer, primary_key=True, default=0)
+
+    def __repr__(self) -> str:
+        return f"<TeacherUnavailability teacher={self.teacher_id} {self.day.value} {self.period}>"
+
+
+class Timetable(BaseModel):
+    """
+    A generated weekly timetable of a branch (or the whole school when
+    ``branch_id`` is NULL). Generation creates a draft; activating it
+    retires the previous active timetable of the same branch.
+    """
+    __tablename__ = "timetables"
+    __table_args__ = (
+        Index("ix_timetables_branch_active", "branch_id", "is_active"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    branch_id: Mapped[int] = mapped_column(ForeignKey("branches.id"), nullable=True)
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+    days: Mapped[int] = mapped_column(Integer, nullable=False)
+    periods_per_day: Mapped[int] = mapped_column(Integer, nullable=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+
+    # Solver outcome
+    lessons: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    unplaced: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    penalty: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    seed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    generated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    created_by: Mapped[int] = mapped_column(Integer, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<Timetable {self.name} ({'active' if self.is_active else 'draft'})>"
+
+
+class TimetableSlot(BaseModel):
+    """
+    One lesson of a timetable: a class taking a course with a teacher in a
+    room at a day and period. Periods are numbered from 1, matching
+    period-wise attendance.
+    """
+    __tablename__ = "timetable_slots"
+    __table_args__ = (
+        UniqueConstraint("timetable_id", "current_grade", "section", "day", "period", name="uq_timetable_slots_class"),
+        UniqueConstraint("timetable_id", "teacher_id", "day", "period", name="uq_timetable_slots_teacher"),
+        UniqueConstraint("timetable_id", "room_id", "day", "period", name="uq_timetable_slots_room"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    timetable_id: Mapped[int] = mapped_column(ForeignKey("timetables.id", ondelete="CASCADE"), nullable=False)
+    day: Mapped[DayOfWeek] = mapped_column(SQLEnum(DayOfWeek), nullable=False)
+    period: Mapped[int] = mapped_column(Integer, nullable=False)
+    current_grade: Mapped[str] = mapped_column(String(20), nullable=False)
+    section: Mapped[str] = mapped_column(String(10), nullable=False, default="")
+    course_id: Mapped[int] = mapped_column(ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
+    teacher_id: Mapped[int] = mapped_column(ForeignKey("teachers.id", ondelete="CASCADE"), nullable=False)
+    room_id: Mapped[int] = mapped_column(ForeignKey("rooms.id", ondelete="SET NULL"), nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<TimetableSlot {self.current_grade}{self.section} {self.day.value} P{self.period}>"
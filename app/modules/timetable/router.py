@@ -0,0 +1,507 @@
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, delete
+from sqlalchemy.exc import IntegrityError
+from typing import Optional
+from datetime import datetime, timezone
+from app.config import settings
+from app.tenancy.database import get_tenant_db, get_tenant_db_readonly
+from app.modules.timetable import schemas, models, generator
+from app.modules.timetable.conflicts import (
+    conflict_index, resource_keys, minute_of_week, period_at, clock, MINUTES_PER_DAY,
+)
+from app.modules.courses.models import Course
+from app.modules.teachers.models import Teacher
+from app.core.exceptions import BaseAppException, NotFoundException, ConflictException
+from app.rbac.decorators import require_permissions
+from app.rbac.constants import Permission
+
+router = APIRouter()
+
+
+async def _get_timetable(db: AsyncSession, timetable_id: int) -> models.Timetable:
+    timetable = await db.get(models.Timetable, timetable_id)
+    if not timetable:
+        raise NotFoundException(f"Timetable with ID {timetable_id} not found")
+    return timetable
+
+
+async def _get_slot(db: AsyncSession, timetable_id: int, slot_id: int) -> models.TimetableSlot:
+    slot = await db.get(models.TimetableSlot, slot_id)
+    if not slot or slot.timetable_id != timetable_id:
+        raise NotFoundException(f"Slot {slot_id} not found in timetable {timetable_id}")
+    return slot
+
+
+def _check_period(timetable: models.Timetable, day, period: int):
+    if generator.WEEKDAYS.index(day) >= timetable.days or period > timetable.periods_per_day:
+        raise BaseAppException(
+            f"Timetable {timetable.id} runs {timetable.days} days of {timetable.periods_per_day} periods"
+        )
+
+
+def _describe(conflicts) -> str:
+    return "; ".join(
+        f"{c.resource} already booked on {c.day.value} period {c.period} (timetable {c.timetable_id}, slot {c.slot_id})"
+        for c in conflicts
+    )
+
+
+async def _commit_slot_edit(db: AsyncSession):
+    """Commit a slot edit; a unique-constraint hit means the index was stale"""
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        await conflict_index.invalidate(db)
+        raise ConflictException("The lesson double-books a class, teacher or room")
+
+
+async def _get_teacher(db: AsyncSession, teacher_id: int) -> Teacher:
+    teacher = await db.get(Teacher, teacher_id)
+    if not teacher:
+        raise NotFoundException(f"Teacher with ID {teacher_id} not found")
+    return teacher
+
+
+@router.post("/rooms", response_model=schemas.Room, status_code=status.HTTP_201_CREATED)
+@require_permissions(Permission.TIMETABLE_MANAGE)
+async def create_room(
+    room_data: schemas.RoomCreate,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """Add a room"""
+    existing = await db.execute(
+        select(models.Room.id).where(
+            generator.in_scope(models.Room.branch_id, room_data.branch_id),
+            models.Room.name == room_data.name,
+        )
+    )
+    if existing.scalar_one_or_none():
+        raise ConflictException(f"Room '{room_data.name}' already exists")
+    room = models.Room(**room_data.model_dump())
+    db.add(room)
+    await db.commit()
+    await db.refresh(room)
+    return room
+
+
+@router.get("/rooms", response_model=list[schemas.Room])
+@require_permissions(Permission.TIMETABLE_VIEW)
+async def list_rooms(
+    branch_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
+):
+    """List rooms"""
+    query = select(models.Room)
+    if branch_id:
+        query = query.where(models.Room.branch_id == branch_id)
+    result = await db.execute(query.order_by(models.Room.name))
+    return result.scalars().all()
+
+
+@router.put("/rooms/{room_id}", response_model=schemas.Room)
+@require_permissions(Permission.TIMETABLE_MANAGE)
+async def update_room(
+    room_id: int,
+    room_data: schemas.RoomUpdate,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """Rename, resize or retire a room; existing timetables keep it"""
+    room = await db.get(models.Room, room_id)
+    if not room:
+        raise NotFoundException(f"Room with ID {room_id} not found")
+    for field, value in room_data.model_dump(exclude_unset=True).items():
+        setattr(room, field, value)
+    await db.commit()
+    await db.refresh(room)
+    return room
+
+
+@router.post("/assignments", response_model=schemas.Assignment, status_code=status.HTTP_201_CREATED)
+@require_permissions(Permission.TIMETABLE_MANAGE)
+async def create_assignment(
+    assignment_data: schemas.AssignmentCreate,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """Assign a teacher to teach a course to a class"""
+    if not await db.get(Course, assignment_data.course_id):
+        raise NotFoundException(f"Course with ID {assignment_data.course_id} not found")
+    await _get_teacher(db, assignment_data.teacher_id)
+
+    existing = await db.execute(
+        select(models.TeachingAssignment.id).where(
+            generator.in_scope(models.TeachingAssignment.branch_id, assignment_data.branch_id),
+            models.TeachingAssignment.current_grade == assignment_data.current_grade,
+            models.TeachingAssignment.section == assignment_data.section,
+            models.TeachingAssignment.course_id == assignment_data.course_id,
+        )
+    )
+    if existing.scalar_one_or_none():
+        raise ConflictException(
+            f"Course {assignment_data.course_id} of class "
+            f"{assignment_data.current_grade}{assignment_data.section} is already assigned"
+        )
+    assignment = models.TeachingAssignment(**assignment_data.model_dump())
+    db.add(assignment)
+    await db.commit()
+    await db.refresh(assignment)
+    return assignment
+
+
+@router.get("/assignments", response_model=list[schemas.Assignment])
+@require_permissions(Permission.TIMETABLE_VIEW)
+async def list_assignments(
+    branch_id: Optional[int] = None,
+    current_grade: Optional[str] = None,
+    teacher_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
+):
+    """List teaching assignments"""
+    query = select(models.TeachingAssignment)
+    if branch_id:
+        query = query.where(models.TeachingAssignment.branch_id == branch_id)
+    if current_grade:
+        query = query.where(models.TeachingAssignment.current_grade == current_grade)
+    if teacher_id:
+        query = query.where(models.TeachingAssignment.teacher_id == teacher_id)
+    result = await db.execute(query.order_by(
+        models.TeachingAssignment.current_grade, models.TeachingAssignment.section, models.TeachingAssignment.course_id
+    ))
+    return result.scalars().all()
+
+
+@router.delete("/assignments/{assignment_id}", status_code=status.HTTP_204_NO_CONTENT)
+@require_permissions(Permission.TIMETABLE_MANAGE)
+async def delete_assignment(
+    assignment_id: int,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """Remove a teaching assignment; existing timetables are unaffected"""
+    assignment = await db.get(models.TeachingAssignment, assignment_id)
+    if not assignment:
+        raise NotFoundException(f"Teaching assignment with ID {assignment_id} not found")
+    await db.delete(assignment)
+    await db.commit()
+    return None
+
+
+@router.get("/teachers/{teacher_id}/unavailability", response_model=list[schemas.UnavailablePeriod])
+@require_permissions(Permission.TIMETABLE_VIEW)
+async def get_teacher_unavailability(
+    teacher_id: int,
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
+):
+    """Periods a teacher cannot be scheduled in"""
+    result = await db.execute(
+        select(models.TeacherUnavailability)
+        .where(models.TeacherUnavailability.teacher_id == teacher_id)
+        .order_by(models.TeacherUnavailability.day, models.TeacherUnavailability.period)
+    )
+    return result.scalars().all()
+
+
+@router.put("/teachers/{teacher_id}/unavailability", response_model=list[schemas.UnavailablePeriod])
+@require_permissions(Permission.TIMETABLE_MANAGE)
+async def set_teacher_unavailability(
+    teacher_id: int,
+    periods: list[schemas.UnavailablePeriod],
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """Replace the periods a teacher cannot be scheduled in (applies to future generations)"""
+    await _get_teacher(db, teacher_id)
+    await db.execute(
+        delete(models.TeacherUnavailability).where(models.TeacherUnavailability.teacher_id == teacher_id)
+    )
+    unique = sorted({(p.day, p.period) for p in periods}, key=lambda dp: (generator.WEEKDAYS.index(dp[0]), dp[1]))
+    db.add_all(models.TeacherUnavailability(teacher_id=teacher_id, day=day, period=period) for day, period in unique)
+    await db.commit()
+    return [schemas.UnavailablePeriod(day=day, period=period) for day, period in unique]
+
+
+@router.post("/generate", response_model=schemas.GenerateResult, status_code=status.HTTP_201_CREATED)
+@require_permissions(Permission.TIMETABLE_MANAGE)
+async def generate_timetable(
+    request: schemas.GenerateRequest,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """
+    Generate a draft timetable for a branch from its teaching assignments.
+
+    Every class gets each course for its ``periods_per_week`` (or the
+    course's credits); no class, teacher or room is double-booked, teachers
+    are only scheduled when available and rooms seat the class. Lessons
+    that could not be fitted are listed in ``unplaced_lessons``. Review the
+    draft, then activate it.
+    """
+    timetable, instance, solution = await generator.generate(
+        db,
+        request.branch_id,
+        request.name,
+        request.days,
+        request.periods_per_day,
+        seed=request.seed,
+        time_limit=request.time_limit or settings.TIMETABLE_SOLVER_TIME_LIMIT_SECONDS,
+        created_by=getattr(current_user, "id", None),
+    )
+    await db.commit()
+    await db.refresh(timetable)
+    return schemas.GenerateResult(
+        **schemas.Timetable.model_validate(timetable).model_dump(),
+        unplaced_lessons=generator.unplaced_lessons(instance, solution),
+        repairs=solution.iterations,
+        elapsed_seconds=round(solution.elapsed, 3),
+    )
+
+
+@router.get("/timetables", response_model=list[schemas.Timetable])
+@require_permissions(Permission.TIMETABLE_VIEW)
+async def list_timetables(
+    branch_id: Optional[int] = None,
+    is_active: Optional[bool] = None,
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
+):
+    """List timetables, newest first"""
+    query = select(models.Timetable)
+    if branch_id:
+        query = query.where(models.Timetable.branch_id == branch_id)
+    if is_active is not None:
+        query = query.where(models.Timetable.is_active == is_active)
+    result = await db.execute(query.order_by(models.Timetable.id.desc()))
+    return result.scalars().all()
+
+
+@router.get("/timetables/{timetable_id}", response_model=schemas.Timetable)
+@require_permissions(Permission.TIMETABLE_VIEW)
+async def get_timetable(
+    timetable_id: int,
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
+):
+    """Get timetable by ID"""
+    return await _get_timetable(db, timetable_id)
+
+
+@router.get("/timetables/{timetable_id}/slots", response_model=list[schemas.TimetableSlot])
+@require_permissions(Permission.TIMETABLE_VIEW)
+async def get_timetable_slots(
+    timetable_id: int,
+    current_grade: Optional[str] = None,
+    section: Optional[str] = None,
+    teacher_id: Optional[int] = None,
+    room_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_tenant_db_readonly),
+    current_user=None  # Injected by decorator
+):
+    """A timetable's lessons, optionally for one class, teacher or room"""
+    await _get_timetable(db, timetable_id)
+    query = select(models.TimetableSlot).where(models.TimetableSlot.timetable_id == timetable_id)
+    if current_grade:
+        query = query.where(
+            models.TimetableSlot.current_grade == current_grade, models.TimetableSlot.section == (section or "")
+        )
+    if teacher_id:
+        query = query.where(models.TimetableSlot.teacher_id == teacher_id)
+    if room_id:
+        query = query.where(models.TimetableSlot.room_id == room_id)
+    result = await db.execute(query.order_by(
+        models.TimetableSlot.day, models.TimetableSlot.period,
+        models.TimetableSlot.current_grade, models.TimetableSlot.section,
+    ))
+    return result.scalars().all()
+
+
+@router.post("/timetables/{timetable_id}/activate", response_model=schemas.Timetable)
+@require_permissions(Permission.TIMETABLE_MANAGE)
+async def activate_timetable(
+    timetable_id: int,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """Make a timetable the branch's active one, retiring the previous one"""
+    timetable = await _get_timetable(db, timetable_id)
+    await db.execute(
+        update(models.Timetable)
+        .where(
+            generator.in_scope(models.Timetable.branch_id, timetable.branch_id),
+            models.Timetable.is_active == True,
+            models.Timetable.id != timetable_id,
+        )
+        .values(is_active=False)
+    )
+    timetable.is_active = True
+    await db.commit()
+    await conflict_index.invalidate(db)
+    await db.refresh(timetable)
+    return timetable
+
+
+@router.delete("/timetables/{timetable_id}", status_code=status.HTTP_204_NO_CONTENT)
+@require_permissions(Permission.TIMETABLE_MANAGE)
+async def delete_timetable(
+    timetable_id: int,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """Discard a draft timetable"""
+    timetable = await _get_timetable(db, timetable_id)
+    if timetable.is_active:
+        raise ConflictException("The active timetable cannot be deleted; activate another one first")
+    await db.execute(delete(models.TimetableSlot).where(models.TimetableSlot.timetable_id == timetable_id))
+    await db.delete(timetable)
+    await db.commit()
+    await conflict_index.invalidate(db)
+    return None
+
+
+@router.post("/timetables/{timetable_id}/slots/check", response_model=list[schemas.SlotConflict])
+@require_permissions(Permission.TIMETABLE_MANAGE)
+async def check_timetable_slot(
+    timetable_id: int,
+    proposal: schemas.SlotCheck,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """
+    Lessons a proposed lesson would double-book, without saving anything:
+    the same class, teacher or room in this timetable, and the same teacher
+    in another branch's active timetable. Pass ``slot_id`` when moving an
+    existing lesson so it does not conflict with itself.
+    """
+    timetable = await _get_timetable(db, timetable_id)
+    _check_period(timetable, proposal.day, proposal.period)
+    schedule = await conflict_index.get(db)
+    index = await conflict_index.timetable(db, schedule, timetable)
+    keys = resource_keys(proposal.current_grade, proposal.section, proposal.teacher_id, proposal.room_id)
+    return schedule.conflicts(index, keys, proposal.day, proposal.period, ignore=proposal.slot_id)
+
+
+@router.post("/timetables/{timetable_id}/slots", response_model=schemas.TimetableSlot, status_code=status.HTTP_201_CREATED)
+@require_permissions(Permission.TIMETABLE_MANAGE)
+async def add_timetable_slot(
+    timetable_id: int,
+    slot_data: schemas.SlotCreate,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """Add a lesson to a timetable; rejected with 409 if it double-books anyone"""
+    timetable = await _get_timetable(db, timetable_id)
+    _check_period(timetable, slot_data.day, slot_data.period)
+    if not await db.get(Course, slot_data.course_id):
+        raise NotFoundException(f"Course with ID {slot_data.course_id} not found")
+    await _get_teacher(db, slot_data.teacher_id)
+    if slot_data.room_id and not await db.get(models.Room, slot_data.room_id):
+        raise NotFoundException(f"Room with ID {slot_data.room_id} not found")
+
+    schedule = await conflict_index.get(db)
+    async with schedule.lock:
+        index = await conflict_index.timetable(db, schedule, timetable)
+        keys = resource_keys(slot_data.current_grade, slot_data.section, slot_data.teacher_id, slot_data.room_id)
+        conflicts = schedule.conflicts(index, keys, slot_data.day, slot_data.period)
+        if conflicts:
+            raise ConflictException(_describe(conflicts))
+
+        slot = models.TimetableSlot(timetable_id=timetable_id, **slot_data.model_dump())
+        db.add(slot)
+        await _commit_slot_edit(db)
+        await db.refresh(slot)
+        index.add_slot(slot)
+        await conflict_index.changed(db, schedule)
+    return slot
+
+
+@router.put("/timetables/{timetable_id}/slots/{slot_id}", response_model=schemas.TimetableSlot)
+@require_permissions(Permission.TIMETABLE_MANAGE)
+async def update_timetable_slot(
+    timetable_id: int,
+    slot_id: int,
+    slot_data: schemas.SlotUpdate,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """Move a lesson or change its teacher or room; rejected with 409 if it double-books anyone"""
+    timetable = await _get_timetable(db, timetable_id)
+    slot = await _get_slot(db, timetable_id, slot_id)
+    changes = slot_data.model_dump(exclude_unset=True)
+    day, period = changes.get("day") or slot.day, changes.get("period") or slot.period
+    teacher_id = changes.get("teacher_id") or slot.teacher_id
+    room_id = changes["room_id"] if "room_id" in changes else slot.room_id
+    _check_period(timetable, day, period)
+    if teacher_id != slot.teacher_id:
+        await _get_teacher(db, teacher_id)
+    if room_id and room_id != slot.room_id and not await db.get(models.Room, room_id):
+        raise NotFoundException(f"Room with ID {room_id} not found")
+
+    schedule = await conflict_index.get(db)
+    async with schedule.lock:
+        index = await conflict_index.timetable(db, schedule, timetable)
+        keys = resource_keys(slot.current_grade, slot.section, teacher_id, room_id)
+        conflicts = schedule.conflicts(index, keys, day, period, ignore=slot_id)
+        if conflicts:
+            raise ConflictException(_describe(conflicts))
+
+        slot.day, slot.period, slot.teacher_id, slot.room_id = day, period, teacher_id, room_id
+        await _commit_slot_edit(db)
+        await db.refresh(slot)
+        index.remove(slot_id)
+        index.add_slot(slot)
+        await conflict_index.changed(db, schedule)
+    return slot
+
+
+@router.delete("/timetables/{timetable_id}/slots/{slot_id}", status_code=status.HTTP_204_NO_CONTENT)
+@require_permissions(Permission.TIMETABLE_MANAGE)
+async def delete_timetable_slot(
+    timetable_id: int,
+    slot_id: int,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """Remove a lesson from a timetable"""
+    timetable = await _get_timetable(db, timetable_id)
+    slot = await _get_slot(db, timetable_id, slot_id)
+    schedule = await conflict_index.get(db)
+    async with schedule.lock:
+        index = await conflict_index.timetable(db, schedule, timetable)
+        await db.delete(slot)
+        await db.commit()
+        index.remove(slot_id)
+        await conflict_index.changed(db, schedule)
+    return None
+
+
+@router.get("/free-teachers", response_model=schemas.FreeTeachers)
+@require_permissions(Permission.TIMETABLE_VIEW)
+async def get_free_teachers(
+    branch_id: Optional[int] = None,
+    at: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user=None  # Injected by decorator
+):
+    """
+    Teachers not teaching right now (or at ``at``) under any active
+    timetable, e.g. to find a substitute, with when their next lesson that
+    day starts. Served from the in-memory conflict index, which is only
+    loaded from the primary.
+    """
+    minute = minute_of_week(at or datetime.now(timezone.utc))
+    schedule = await conflict_index.get(db)
+    return schemas.FreeTeachers(
+        day=generator.WEEKDAYS[minute // MINUTES_PER_DAY],
+        time=clock(minute),
+        period=period_at(minute),
+        teachers=[
+            schemas.FreeTeacher(teacher_id=teacher_id, name=name, busy_from=clock(busy) if busy is not None else None)
+            for teacher_id, name, busy in schedule.free_teachers(minute, branch_id)
+        ],
+    )
@@ -0,0 +1,158 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+from app.config import settings
+from app.modules.attendance.packing import PERIODS_PER_DAY
+from app.shared.enums import DayOfWeek
+
+
+MAX_PERIODS = PERIODS_PER_DAY - 1  # Period 0 of attendance is the whole day
+
+
+class RoomCreate(BaseModel):
+    """Schema for creating a room"""
+    name: str = Field(..., min_length=1, max_length=50)
+    branch_id: Optional[int] = None
+    capacity: int = Field(..., gt=0, le=1000)
+    is_active: bool = True
+
+
+class RoomUpdate(BaseModel):
+    """Schema for updating a room"""
+    name: Optional[str] = Field(None, min_length=1, max_length=50)
+    capacity: Optional[int] = Field(None, gt=0, le=1000)
+    is_active: Optional[bool] = None
+
+
+class Room(RoomCreate):
+    """Schema for room response"""
+    id: int
+
+    model_config = {"from_attributes": True}
+
+
+class AssignmentCreate(BaseModel):
+    """Schema for assigning a teacher to a class's course"""
+    branch_id: Optional[int] = None
+    current_grade: str = Field(..., min_length=1, max_length=20)
+    section: str = Field("", max_length=10)
+    course_id: int
+    teacher_id: int
+    periods_per_week: Optional[int] = Field(None, gt=0, le=7 * MAX_PERIODS)  # Default: course credits
+
+
+class Assignment(AssignmentCreate):
+    """Schema for teaching assignment response"""
+    id: int
+
+    model_config = {"from_attributes": True}
+
+
+class UnavailablePeriod(BaseModel):
+    """A period a teacher cannot teach; period 0 means the whole day"""
+    day: DayOfWeek
+    period: int = Field(0, ge=0, le=MAX_PERIODS)
+
+    model_config = {"from_attributes": True}
+
+
+class GenerateRequest(BaseModel):
+    """Parameters of a timetable generation run"""
+    name: str = Field(..., min_length=1, max_length=100)
+    branch_id: Optional[int] = None
+    days: int = Field(settings.TIMETABLE_DAYS, ge=1, le=7)
+    periods_per_day: int = Field(
+        settings.TIMETABLE_PERIODS_PER_DAY, ge=1, le=min(MAX_PERIODS, len(settings.TIMETABLE_PERIOD_STARTS))
+    )
+    seed: int = Field(0, ge=0)
+    time_limit: Optional[float] = Field(None, gt=0, le=60)  # Default: TIMETABLE_SOLVER_TIME_LIMIT_SECONDS
+
+
+class Timetable(BaseModel):
+    """Schema for timetable response"""
+    id: int
+    name: str
+    branch_id: Optional[int] = None
+    days: int
+    periods_per_day: int
+    is_active: bool
+    lessons: int
+    unplaced: int
+    penalty: int
+    seed: int
+    generated_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class UnplacedLesson(BaseModel):
+    """Weekly periods of a class's course the solver could not fit"""
+    current_grade: str
+    section: str
+    course_id: int
+    teacher_id: int
+    periods: int
+
+
+class GenerateResult(Timetable):
+    """A generated draft timetable with solver statistics"""
+    unplaced_lessons: list[UnplacedLesson]
+    repairs: int
+    elapsed_seconds: float
+
+
+class SlotCreate(BaseModel):
+    """Schema for adding a lesson to a timetable"""
+    day: DayOfWeek
+    period: int = Field(..., ge=1, le=MAX_PERIODS)
+    current_grade: str = Field(..., min_length=1, max_length=20)
+    section: str = Field("", max_length=10)
+    course_id: int
+    teacher_id: int
+    room_id: Optional[int] = None
+
+
+class SlotUpdate(BaseModel):
+    """Schema for moving a lesson or changing its teacher or room"""
+    day: Optional[DayOfWeek] = None
+    period: Optional[int] = Field(None, ge=1, le=MAX_PERIODS)
+    teacher_id: Optional[int] = None
+    room_id: Optional[int] = None
+
+
+class SlotCheck(SlotCreate):
+    """A proposed lesson to check; ``slot_id`` is the lesson being moved, if any"""
+    slot_id: Optional[int] = None
+
+
+class TimetableSlot(SlotCreate):
+    """Schema for one lesson of a timetable"""
+    id: int
+
+    model_config = {"from_attributes": True}
+
+
+class SlotConflict(BaseModel):
+    """An existing lesson that a proposed one would double-book"""
+    resource: str  # class, teacher or room
+    timetable_id: int
+    slot_id: int
+    day: DayOfWeek
+    period: int
+
+    model_config = {"from_attributes": True}
+
+
+class FreeTeacher(BaseModel):
+    """A teacher with no lesson at the queried time"""
+    teacher_id: int
+    name: str
+    busy_from: Optional[str] = None  # HH:MM of their next lesson that day
+
+
+class FreeTeachers(BaseModel):
+    """Teachers free at a moment of the week"""
+    day: DayOfWeek
+    time: str
+    period: Optional[int] = None  # Period running then, if any
+    teachers: list[FreeTeacher]
@@ -0,0 +1,373 @@
+"""
+Timetable constraint solver.
+
+Works on plain integers, no database: a week is ``days x periods`` slots
+numbered day-major, and each weekly period a class needs of a course is one
+``Lesson``. Hard constraints: no class, teacher or room is double-booked, a
+teacher only teaches in available slots, and a lesson's room seats the
+class. Soft constraint: a course's lessons are spread across the week (no
+more per day than its weekly count requires).
+
+Solving runs in three phases:
+
+1. Greedy construction, most constrained lessons first, each placed in its
+   cheapest feasible slot with the smallest room that fits.
+2. Repair for lessons that did not fit: place the lesson anyway in the
+   slot that evicts the fewest others, re-queue the evicted lessons, and
+   keep a short tabu list so lessons do not bounce straight back.
+3. Simulated annealing on the soft constraint: move lessons from overfull
+   days to a random slot of their class, into a free period or by swapping
+   with the lesson there, keeping the best timetable seen.
+
+All occupancy is kept in per-slot arrays, so every move is O(1) apart from
+the room lookup, a bisect over the rooms still free in the slot.
+"""
+import bisect
+import math
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+SPREAD_PENALTY = 10
+TABU_TENURE = 7
+
+
+@dataclass(frozen=True, slots=True)
+class Lesson:
+    """One weekly period of a course for a class"""
+    group: int    # class index
+    teacher: int  # teacher index
+    course: int   # course id
+    size: int     # students in the class
+
+
+@dataclass(slots=True)
+class Problem:
+    days: int
+    periods: int
+    lessons: list[Lesson]
+    groups: int
+    teachers: int
+    room_capacity: list[int] = field(default_factory=list)  # No rooms: room constraint off
+    teacher_unavailable: dict[int, set[int]] = field(default_factory=dict)  # teacher -> slots
+
+    @property
+    def slots(self) -> int:
+        return self.days * self.periods
+
+
+@dataclass(slots=True)
+class Solution:
+    slot: list[int]      # per lesson, -1 if unplaced
+    room: list[int]      # per lesson, -1 if unplaced or no rooms
+    unplaced: list[int]  # lesson indices
+    penalty: int         # soft-constraint violations
+    iterations: int
+    elapsed: float
+
+
+class Scheduler:
+    """Solver state for one problem; use ``solve``"""
+
+    def __init__(self, problem: Problem, seed: int = 0):
+        self.p = problem
+        self.rng = random.Random(seed)
+        slots = problem.slots
+        self.use_rooms = bool(problem.room_capacity)
+        self.max_room = max(problem.room_capacity, default=0)
+
+        self.group_at = [[-1] * slots for _ in range(problem.groups)]
+        self.teacher_at = [[-1] * slots for _ in range(problem.teachers)]
+        self.room_at = [[-1] * slots for _ in problem.room_capacity]
+        rooms = sorted((capacity, room) for room, capacity in enumerate(problem.room_capacity))
+        self.free_rooms = [list(rooms) for _ in range(slots)]
+
+        self.slot = [-1] * len(problem.lessons)
+        self.room = [-1] * len(problem.lessons)
+        self.tabu: dict[tuple[int, int], int] = {}
+
+        # Slots each teacher may teach in, and lessons per day a course may have
+        self.allowed = [
+            [s for s in range(slots) if s not in problem.teacher_unavailable.get(t, ())]
+            for t in range(problem.teachers)
+        ]
+        weekly = defaultdict(int)
+        for lesson in problem.lessons:
+            weekly[lesson.group, lesson.course] += 1
+        self.per_day = {key: -(-count // problem.days) for key, count in weekly.items()}
+        self.day_count: dict[tuple[int, int, int], int] = defaultdict(int)
+
+    # Occupancy
+
+    def _fit_room(self, s: int, size: int) -> int:
+        """Smallest free room in slot ``s`` seating ``size`` (-1 if none)"""
+        free = self.free_rooms[s]
+        i = bisect.bisect_left(free, (size, -1))
+        return free[i][1] if i < len(free) else -1
+
+    def _place(self, l: int, s: int, room: int):
+        lesson = self.p.lessons[l]
+        self.slot[l], self.room[l] = s, room
+        self.group_at[lesson.group][s] = l
+        self.teacher_at[lesson.teacher][s] = l
+        if room >= 0:
+            self.room_at[room][s] = l
+            self.free_rooms[s].remove((self.p.room_capacity[room], room))
+        self.day_count[lesson.group, lesson.course, s // self.p.periods] += 1
+
+    def _unplace(self, l: int):
+        lesson, s, room = self.p.lessons[l], self.slot[l], self.room[l]
+        self.group_at[lesson.group][s] = -1
+        self.teacher_at[lesson.teacher][s] = -1
+        if room >= 0:
+            self.room_at[room][s] = -1
+            bisect.insort(self.free_rooms[s], (self.p.room_capacity[room], room))
+        self.day_count[lesson.group, lesson.course, s // self.p.periods] -= 1
+        self.slot[l], self.room[l] = -1, -1
+
+    def _cost(self, lesson: Lesson, s: int) -> int:
+        """Soft cost of adding ``lesson`` at slot ``s``"""
+        key = (lesson.group, lesson.course)
+        return SPREAD_PENALTY if self.day_count[key + (s // self.p.periods,)] >= self.per_day[key] else 0
+
+    def _feasible_room(self, lesson: Lesson, s: int) -> Optional[int]:
+        """Room to use at a free slot (-1 without rooms), None if none fits"""
+        if not self.use_rooms:
+            return -1
+        room = self._fit_room(s, lesson.size)
+        return room if room >= 0 else None
+
+    def penalty(self) -> int:
+        return sum(
+            max(count - self.per_day[group, course], 0)
+            for (group, course, _), count in self.day_count.items()
+        )
+
+    # Phase 1: greedy construction
+
+    def _best_free_slot(self, l: int) -> Optional[tuple[int, int]]:
+        lesson = self.p.lessons[l]
+        group_at, teacher_at = self.group_at[lesson.group], self.teacher_at[lesson.teacher]
+        best, best_cost = None, None
+        for s in self.allowed[lesson.teacher]:
+            if group_at[s] >= 0 or teacher_at[s] >= 0:
+                continue
+            room = self._feasible_room(lesson, s)
+            if room is None:
+                continue
+            cost = self._cost(lesson, s) + self.rng.random()
+            if best_cost is None or cost < best_cost:
+                best, best_cost = (s, room), cost
+        return best
+
+    def construct(self) -> list[int]:
+        """Place lessons greedily; returns the ones that did not fit"""
+        load = defaultdict(int)
+        for lesson in self.p.lessons:
+            load[lesson.teacher] += 1
+            load["group", lesson.group] += 1
+        # Least slack first: busy teachers with few available slots, then full classes, then large classes
+        order = sorted(
+            range(len(self.p.lessons)),
+            key=lambda l: (
+                len(self.allowed[self.p.lessons[l].teacher]) - load[self.p.lessons[l].teacher],
+                -load["group", self.p.lessons[l].group],
+                -self.p.lessons[l].size,
+                self.rng.random(),
+            ),
+        )
+        failed = []
+        for l in order:
+            best = self._best_free_slot(l)
+            if best is None:
+                failed.append(l)
+            else:
+                self._place(l, *best)
+        return failed
+
+    # Phase 2: ejection repair
+
+    def _evictions(self, lesson: Lesson, s: int) -> Optional[tuple[set[int], int]]:
+        """Lessons to evict to put ``lesson`` at ``s`` and the room it would get"""
+        evict = {self.group_at[lesson.group][s], self.teacher_at[lesson.teacher][s]} - {-1}
+        if not self.use_rooms:
+            return evict, -1
+        room = self._fit_room(s, lesson.size)
+        if room >= 0:
+            return evict, room
+        # Reuse a room freed by an eviction, else evict the best-fitting occupant
+        freed = [self.room[e] for e in evict if self.p.room_capacity[self.room[e]] >= lesson.size]
+        if freed:
+            return evict, min(freed, key=lambda r: self.p.room_capacity[r])
+        occupied = [
+            (capacity, room) for room, capacity in enumerate(self.p.room_capacity)
+            if capacity >= lesson.size and self.room_at[room][s] >= 0
+        ]
+        if not occupied:
+            return None
+        room = min(occupied)[1]
+        return evict | {self.room_at[room][s]}, room
+
+    def repair(self, queue: list[int], deadline: float, max_iterations: int) -> tuple[list[int], int]:
+        iterations, stuck = 0, []
+        while queue and iterations < max_iterations and time.perf_counter() < deadline:
+            iterations += 1
+            l = queue.pop(self.rng.randrange(len(queue)))
+            lesson = self.p.lessons[l]
+            if self.use_rooms and lesson.size > self.max_room:
+                stuck.append(l)  # No room seats this class
+                continue
+
+            candidates, fallback = [], []
+            for s in self.allowed[lesson.teacher]:
+                move = self._evictions(lesson, s)
+                if move is None:
+                    continue
+                evict, room = move
+                score = len(evict) * 100 + self._cost(lesson, s) + self.rng.random()
+                target = fallback if self.tabu.get((l, s), -1) > iterations else candidates
+                target.append((score, s, room, evict))
+            if not candidates and not fallback:
+                stuck.append(l)  # Teacher has no usable slot at all
+                continue
+            _, s, room, evict = min(candidates or fallback)
+
+            for e in evict:
+                self.tabu[e, self.slot[e]] = iterations + TABU_TENURE
+                self._unplace(e)
+            self._place(l, s, room)
+            for e in evict:
+                best = self._best_free_slot(e)
+                if best is None:
+                    queue.append(e)
+                else:
+                    self._place(e, *best)
+        return queue + stuck, iterations
+
+    # Phase 3: local search on the soft constraint
+
+    def _clustered(self) -> list[int]:
+        """Placed lessons on a day holding more of their course than allowed"""
+        periods = self.p.periods
+        return [
+            l for l, s in enumerate(self.slot)
+            if s >= 0 and self.day_count[
+                self.p.lessons[l].group, self.p.lessons[l].course, s // periods
+            ] > self.per_day[self.p.lessons[l].group, self.p.lessons[l].course]
+        ]
+
+    def _teacher_ok(self, teacher: int, s: int, other: int) -> bool:
+        """Teacher available at ``s`` and free there (or teaching ``other``, which moves away)"""
+        return self.teacher_at[teacher][s] in (-1, other) and s not in self.p.teacher_unavailable.get(teacher, ())
+
+    def _try_move(self, a: int, sb: int, temperature: float = 0.0) -> Optional[int]:
+        """
+        Move lesson ``a`` to slot ``sb`` of its class, swapping with the
+        lesson there if any. Kept if the soft penalty does not increase, or
+        with probability ``exp(-delta / temperature)`` if it does; returns
+        the change, or None if infeasible or reverted.
+        """
+        la, sa = self.p.lessons[a], self.slot[a]
+        b = self.group_at[la.group][sb]
+        if sb == sa or (b >= 0 and self.p.lessons[b].course == la.course):
+            return None
+        lb = self.p.lessons[b] if b >= 0 else None
+        if not self._teacher_ok(la.teacher, sb, b) or (lb and not self._teacher_ok(lb.teacher, sa, a)):
+            return None
+        ra, rb = self.room[a], self.room[b] if b >= 0 else -1
+        if b < 0 and self.use_rooms:
+            rb = self._fit_room(sb, la.size)
+            if rb < 0:
+                return None
+
+        moved = (la, lb) if lb else (la,)
+        before = self.penalty_of(*moved)
+        self._unplace(a)
+        if lb:
+            self._unplace(b)
+        self._place(a, sb, rb)  # A swap partner is the same class, so rooms fit both ways
+        if lb:
+            self._place(b, sa, ra)
+        delta = self.penalty_of(*moved) - before
+        if delta <= 0 or (temperature > 0 and self.rng.random() < math.exp(-delta / temperature)):
+            return delta
+
+        self._unplace(a)
+        if lb:
+            self._unplace(b)
+            self._place(b, sb, rb)
+        self._place(a, sa, ra)
+        return None
+
+    def _restore(self, slots: list[int], rooms: list[int]):
+        for l, s in enumerate(self.slot):
+            if s >= 0:
+                self._unplace(l)
+        for l, (s, room) in enumerate(zip(slots, rooms)):
+            if s >= 0:
+                self._place(l, s, room)
+
+    def improve(self, deadline: float, steps: Optional[int] = None, temperature: float = 1.0) -> int:
+        """
+        Simulated annealing over relocations and same-class swaps of
+        lessons on overfull days. The temperature falls linearly to zero
+        over ``steps`` moves; the best timetable seen is kept. Returns the
+        penalty removed.
+        """
+        steps = steps or 100 * max(len(self.p.lessons), 1)
+        penalty = best_penalty = initial = self.penalty()
+        best = (list(self.slot), list(self.room))
+        clustered = self._clustered()
+        for step in range(steps):
+            if not penalty or not clustered:
+                break
+            if step % 256 == 0:
+                if time.perf_counter() >= deadline:
+                    break
+                clustered = self._clustered() or clustered
+            a = self.rng.choice(clustered)
+            lesson, s = self.p.lessons[a], self.slot[a]
+            if self.day_count[lesson.group, lesson.course, s // self.p.periods] <= self.per_day[lesson.group, lesson.course]:
+                continue
+            delta = self._try_move(a, self.rng.randrange(self.p.slots), temperature * (1 - step / steps))
+            if delta:
+                penalty += delta
+                if penalty < best_penalty:
+                    best_penalty, best = penalty, (list(self.slot), list(self.room))
+                clustered = self._clustered()
+
+        if penalty > best_penalty:
+            self._restore(*best)
+        return initial - best_penalty
+
+    def penalty_of(self, *lessons: Lesson) -> int:
+        return sum(
+            max(self.day_count[lesson.group, lesson.course, d] - self.per_day[lesson.group, lesson.course], 0)
+            for lesson in {(x.group, x.course): x for x in lessons}.values()
+            for d in range(self.p.days)
+        )
+
+    def solve(self, time_limit: float = 10.0, max_iterations: Optional[int] = None) -> Solution:
+        started = time.perf_counter()
+        deadline = started + time_limit
+        queue = self.construct()
+        unplaced, iterations = self.repair(
+            queue, deadline, max_iterations or 200 * max(len(self.p.lessons), 1)
+        )
+        self.improve(deadline)
+        return Solution(
+            slot=list(self.slot),
+            room=list(self.room),
+            unplaced=sorted(set(unplaced) | {l for l, s in enumerate(self.slot) if s < 0}),
+            penalty=self.penalty(),
+            iterations=iterations,
+            elapsed=time.perf_counter() - started,
+        )
+
+
+def solve(problem: Problem, time_limit: float = 10.0, seed: int = 0) -> Solution:
+    """Schedule ``problem``, stopping after ``time_limit`` seconds at the latest"""
+    return Scheduler(problem, seed).solve(time_limit)
@@ -43,6 +43,10 @@ class Permission(str, Enum):
     FEES_WAIVE = "fees.waive"
     FEES_REPORT = "fees.report"
     
+    # Timetable
+    TIMETABLE_VIEW = "timetable.view"
+    TIMETABLE_MANAGE = "timetable.manage"  # Rooms, assignments, generation
+    
     # Reports
     REPORTS_ACADEMIC = "reports.academic"
     REPORTS_FINANCIAL = "reports.financial"
@@ -114,6 +118,8 @@ ROLE_PERMISSIONS = {
         Permission.FEES_VIEW,
         Permission.FEES_EDIT,
         Permission.FEES_REPORT,
+        Permission.TIMETABLE_VIEW,
+        Permission.TIMETABLE_MANAGE,
         Permission.REPORTS_ACADEMIC,
         Permission.REPORTS_FINANCIAL,
         Permission.REPORTS_ATTENDANCE,
@@ -132,6 +138,7 @@ ROLE_PERMISSIONS = {
         Permission.MARKS_VIEW_ALL,
         Permission.FEES_VIEW,
         Permission.FEES_REPORT,
+        Permission.TIMETABLE_VIEW,
         Permission.REPORTS_ACADEMIC,
         Permission.REPORTS_FINANCIAL,
         Permission.REPORTS_ATTENDANCE,
@@ -146,6 +153,7 @@ ROLE_PERMISSIONS = {
         Permission.MARKS_VIEW,
         Permission.MARKS_ENTER,
         Permission.MARKS_EDIT,
+        Permission.TIMETABLE_VIEW,
     ],
     
     Role.STUDENT: [
@@ -153,6 +161,7 @@ ROLE_PERMISSIONS = {
         Permission.ATTENDANCE_VIEW,  # Own attendance only
         Permission.MARKS_VIEW,        # Own marks only
         Permission.FEES_VIEW,         # Own fees only
+        Permission.TIMETABLE_VIEW,
     ],
     
     Role.PARENT: [
@@ -160,6 +169,7 @@ ROLE_PERMISSIONS = {
         Permission.ATTENDANCE_VIEW,   # Child's attendance
         Permission.MARKS_VIEW,        # Child's marks
         Permission.FEES_VIEW,         # Child's fees
+        Permission.TIMETABLE_VIEW,
     ],
     
     Role.ACCOUNTANT: [
@@ -208,6 +218,8 @@ ROLE_PERMISSIONS = {
         Permission.FEES_EDIT,
         Permission.FEES_WAIVE,
         Permission.FEES_REPORT,
+        Permission.TIMETABLE_VIEW,
+        Permission.TIMETABLE_MANAGE,
         Permission.REPORTS_ACADEMIC,
         Permission.REPORTS_FINANCIAL,
         Permission.REPORTS_ATTENDANCE,
@@ -227,6 +239,7 @@ ROLE_PERMISSIONS = {
         Permission.MARKS_VIEW_ALL,
         Permission.FEES_VIEW,
         Permission.FEES_REPORT,
+        Permission.TIMETABLE_VIEW,
         Permission.REPORTS_ACADEMIC,
         Permission.REPORTS_FINANCIAL,
         Permission.REPORTS_ATTENDANCE,
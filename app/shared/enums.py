@@ -36,6 +36,21 @@ class FeeStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
+class LedgerEntryType(str, Enum):
+    """Fee ledger entry type"""
+    INVOICE = "invoice"
+    PAYMENT = "payment"
+    WAIVER = "waiver"
+
+
+class BatchJobStatus(str, Enum):
+    """Background batch job status"""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
 class AcademicYear(str, Enum):
     """Academic year status"""
     ACTIVE = "active"
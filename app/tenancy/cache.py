@@ -1,113 +1,216 @@
+import asyncio
 import json
+import logging
+import time
+from collections import OrderedDict
 from typing import Optional
 import redis.asyncio as aioredis
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
 from app.config import settings
-from app.tenancy.models import School
+from app.tenancy.schemas import TenantContext, TenantConnectionKey
+
+logger = logging.getLogger(__name__)
+
+
+# Errors that mean Redis is unreachable (as opposed to a bad command)
+REDIS_UNAVAILABLE = (RedisConnectionError, RedisTimeoutError, OSError)
+
+# Bump when the layout of the cached tuple changes
+CACHE_FORMAT = 3
+
+
+class LocalTenantLRU:
+    """Bounded in-process copy of recent tenant entries, used while Redis is down"""
+    
+    def __init__(self, max_entries: int, ttl: int):
+        self._entries: OrderedDict[str, tuple[float, TenantContext]] = OrderedDict()
+        self._max_entries = max_entries
+        self._ttl = ttl
+    
+    def get(self, key: str) -> Optional[TenantContext]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, tenant = item
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return tenant
+    
+    def set(self, key: str, tenant: TenantContext):
+        self._entries[key] = (time.monotonic() + self._ttl, tenant)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+    
+    def delete(self, *keys: str):
+        for key in keys:
+            self._entries.pop(key, None)
+
 
 class TenantCache:
-    """Redis-based tenant metadata caching"""
+    """
+    Redis-based tenant metadata caching.
+    
+    - One explicitly sized connection pool with short socket timeouts, so a
+      slow Redis degrades to a miss instead of stalling requests.
+    - Both lookup keys of a tenant are written in one pipelined round trip.
+    - Every entry read from or written to Redis is mirrored into a local LRU
+      that keeps serving tenants while Redis is unreachable; a background
+      task reconnects with backoff. ``redis`` is None while disconnected.
+    """
     
     def __init__(self):
         self.redis: Optional[aioredis.Redis] = None
         self._cache_ttl = 3600  # 1 hour
+        self._local = LocalTenantLRU(settings.TENANT_LOCAL_CACHE_SIZE, self._cache_ttl)
+        self._reconnect_task: Optional[asyncio.Task] = None
+    
+    def _build_client(self) -> aioredis.Redis:
+        pool_kwargs = {
+            "max_connections": settings.REDIS_MAX_CONNECTIONS,
+            "socket_timeout": settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+            "socket_connect_timeout": settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+            "health_check_interval": 30,
+            "decode_responses": True,
+        }
+        if settings.REDIS_URL:
+            pool = aioredis.ConnectionPool.from_url(settings.REDIS_URL, **pool_kwargs)
+        else:
+            pool = aioredis.ConnectionPool(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                db=settings.REDIS_DB,
+                password=settings.REDIS_PASSWORD if settings.REDIS_PASSWORD else None,
+                **pool_kwargs
+            )
+        return aioredis.Redis(connection_pool=pool)
+    
+    async def _try_connect(self) -> bool:
+        client = self._build_client()
+        try:
+            await client.ping()
+        except REDIS_UNAVAILABLE:
+            await client.aclose()
+            return False
+        self.redis = client
+        return True
     
     async def connect(self):
         """Initialize Redis connection"""
-        try:
-            if settings.REDIS_URL:
-                self.redis = await aioredis.from_url(
-                    settings.REDIS_URL,
-                    decode_responses=True
-                )
-            else:
-                self.redis = await aioredis.from_url(
-                    f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}",
-                    password=settings.REDIS_PASSWORD if settings.REDIS_PASSWORD else None,
-                    decode_responses=True
-                )
-            # Test connection
-            await self.redis.ping()
+        if await self._try_connect():
             print("✅ Redis cache connected")
-        except Exception as e:
-            print(f"⚠️ Redis connection failed: {e}")
-            print("⚠️ Running in database-fallback mode (no caching)")
-            self.redis = None
+        else:
+            print("⚠️ Redis connection failed, serving tenants from the local cache / master DB")
+            self._start_reconnect()
     
     async def disconnect(self):
         """Close Redis connection"""
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
         if self.redis:
-            await self.redis.close()
-    
-    def _serialize_school(self, school: School) -> str:
-        """Serialize school object to JSON"""
-        return json.dumps({
-            "id": school.id,
-            "subdomain": school.subdomain,
-            "name": school.name,
-            "code": school.code,
-            "db_host": school.db_host,
-            "db_port": school.db_port,
-            "db_name": school.db_name,
-            "db_user": school.db_user,
-            "db_password_encrypted": school.db_password_encrypted,
-            "is_active": school.is_active
-        })
-    
-    def _deserialize_school(self, data: str) -> dict:
-        """Deserialize JSON to school dict"""
-        return json.loads(data)
-    
-    async def get_tenant(self, subdomain: str) -> Optional[dict]:
-        """Get tenant by subdomain from cache"""
-        if not self.redis:
-            return None
-        
-        key = f"tenant:subdomain:{subdomain}"
-        data = await self.redis.get(key)
-        
-        if data:
-            return self._deserialize_school(data)
-        return None
+            await self.redis.aclose()
+            self.redis = None
     
-    async def set_tenant(self, subdomain: str, school: School):
-        """Cache tenant by subdomain"""
-        if not self.redis:
+    def _start_reconnect(self):
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.create_task(self._reconnect_loop())
+    
+    async def _reconnect_loop(self):
+        delay = 1.0
+        while True:
+            await asyncio.sleep(delay)
+            if await self._try_connect():
+                logger.info("Redis cache reconnected")
+                return
+            delay = min(delay * 2, 30.0)
+    
+    async def _on_redis_error(self, error: Exception):
+        """Drop the broken client and reconnect in the background"""
+        if self.redis is None:
             return
-        
-        key = f"tenant:subdomain:{subdomain}"
-        data = self._serialize_school(school)
-        await self.redis.setex(key, self._cache_ttl, data)
+        logger.warning(f"Redis unavailable, falling back to local tenant cache: {error}")
+        client, self.redis = self.redis, None
+        try:
+            await client.aclose()
+        except Exception:
+            pass
+        self._start_reconnect()
     
-    async def get_tenant_by_id(self, tenant_id: int) -> Optional[dict]:
-        """Get tenant by ID from cache"""
-        if not self.redis:
+    def _serialize_tenant(self, tenant: TenantContext) -> str:
+        """
+        Serialize a tenant to a positional JSON array (no repeated keys;
+        decoding is one C-level loads()). The encrypted DB password is not
+        cached; the credential vault loads it from the master DB.
+        """
+        conn = tenant.connection
+        return json.dumps([
+            CACHE_FORMAT,
+            tenant.tenant_id, tenant.tenant_name, tenant.subdomain, tenant.is_active, tenant.subscription_tier,
+            conn.db_host, conn.db_port, conn.db_name, conn.db_user, conn.db_replica_host, conn.credential_version,
+        ], separators=(",", ":"))
+    
+    def _deserialize_tenant(self, data: str) -> Optional[TenantContext]:
+        """Decode a cache entry; entries in another format count as a miss"""
+        v = json.loads(data)
+        if not isinstance(v, list) or v[0] != CACHE_FORMAT:
             return None
-        
-        key = f"tenant:id:{tenant_id}"
-        data = await self.redis.get(key)
-        
-        if data:
-            return self._deserialize_school(data)
-        return None
+        return TenantContext(
+            v[1], v[2], v[3], v[4],
+            TenantConnectionKey(v[6], v[7], v[8], v[9], v[10], v[11]),
+            v[5],
+        )
+    
+    async def _get(self, key: str) -> Optional[TenantContext]:
+        if self.redis:
+            try:
+                data = await self.redis.get(key)
+            except REDIS_UNAVAILABLE as e:
+                await self._on_redis_error(e)
+            else:
+                tenant = self._deserialize_tenant(data) if data else None
+                if tenant:
+                    self._local.set(key, tenant)
+                return tenant
+        return self._local.get(key)
+    
+    async def get_tenant(self, subdomain: str) -> Optional[TenantContext]:
+        """Get tenant by subdomain from cache"""
+        return await self._get(f"tenant:subdomain:{subdomain}")
     
-    async def set_tenant_by_id(self, tenant_id: int, school: School):
-        """Cache tenant by ID"""
+    async def get_tenant_by_id(self, tenant_id: int) -> Optional[TenantContext]:
+        """Get tenant by ID from cache"""
+        return await self._get(f"tenant:id:{tenant_id}")
+    
+    async def set_tenant(self, tenant: TenantContext):
+        """Cache tenant under both its subdomain and ID keys (one round trip)"""
+        keys = (f"tenant:subdomain:{tenant.subdomain}", f"tenant:id:{tenant.tenant_id}")
+        for key in keys:
+            self._local.set(key, tenant)
         if not self.redis:
             return
         
-        key = f"tenant:id:{tenant_id}"
-        data = self._serialize_school(school)
-        await self.redis.setex(key, self._cache_ttl, data)
+        data = self._serialize_tenant(tenant)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.setex(key, self._cache_ttl, data)
+                await pipe.execute()
+        except REDIS_UNAVAILABLE as e:
+            await self._on_redis_error(e)
     
     async def invalidate_tenant(self, subdomain: str, tenant_id: int):
         """Invalidate tenant cache"""
+        keys = (f"tenant:subdomain:{subdomain}", f"tenant:id:{tenant_id}")
+        self._local.delete(*keys)
         if not self.redis:
             return
-        
-        await self.redis.delete(
-            f"tenant:subdomain:{subdomain}",
-            f"tenant:id:{tenant_id}"
-        )
+        try:
+            await self.redis.delete(*keys)
+        except REDIS_UNAVAILABLE as e:
+            await self._on_redis_error(e)
 
 
 # Global cache instance
@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.config import settings
+from app.core.exceptions import ServiceUnavailableException
+from app.core.metrics import registry, Gauge
+
+logger = logging.getLogger(__name__)
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class TenantUnavailableException(ServiceUnavailableException):
+    """Tenant database marked unreachable by its circuit breaker"""
+    def __init__(self, retry_after: int):
+        super().__init__(
+            detail="School database is temporarily unavailable, please retry later",
+            retry_after=retry_after
+        )
+
+
+class CircuitBreaker:
+    """
+    Connect-failure breaker for one tenant pool.
+
+    closed    -> requests pass; consecutive connect failures are counted
+    open      -> requests fail fast until the reset timeout elapses
+    half_open -> one request probes the database; success closes the
+                 circuit, failure re-opens it
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._probe_lock = asyncio.Lock()
+
+    def retry_after(self) -> int:
+        if self.opened_at is None:
+            return settings.CIRCUIT_RESET_TIMEOUT_SECONDS
+        remaining = settings.CIRCUIT_RESET_TIMEOUT_SECONDS - (time.monotonic() - self.opened_at)
+        return max(int(remaining) + 1, 1)
+
+    def record_success(self):
+        if self.state != CLOSED:
+            logger.info(f"Circuit {self.name} closed")
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+
+    def record_failure(self, error: BaseException):
+        self.failures += 1
+        self.last_error = f"{type(error).__name__}: {error}"[:200]
+        if self.state == HALF_OPEN or self.failures >= settings.CIRCUIT_FAILURE_THRESHOLD:
+            if self.state != OPEN:
+                logger.warning(f"Circuit {self.name} opened after {self.failures} failures: {self.last_error}")
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    async def before_request(self, engine: AsyncEngine):
+        """Fail fast while open; probe the database once the reset timeout passed"""
+        if self.state == CLOSED:
+            return
+        if self.state == OPEN and time.monotonic() - self.opened_at < settings.CIRCUIT_RESET_TIMEOUT_SECONDS:
+            raise TenantUnavailableException(self.retry_after())
+        # Only one probe at a time; everyone else keeps failing fast
+        if self._probe_lock.locked():
+            raise TenantUnavailableException(self.retry_after())
+
+        async with self._probe_lock:
+            self.state = HALF_OPEN
+            try:
+                await asyncio.wait_for(self._probe(engine), settings.CIRCUIT_PROBE_TIMEOUT_SECONDS)
+            except Exception as e:
+                # Connect errors were already recorded by the engine hook
+                if self.state != OPEN:
+                    self.record_failure(e)
+                raise TenantUnavailableException(self.retry_after())
+            self.record_success()
+
+    async def _probe(self, engine: AsyncEngine):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    def status(self) -> dict:
+        return {
+            "pool": self.name,
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_after": self.retry_after() if self.state != CLOSED else None,
+            "last_error": self.last_error,
+        }
+
+
+def is_connect_failure(context) -> bool:
+    """
+    handle_error filter: failures to open a connection, not query errors,
+    stale pre-pings or our own budget rejections
+    """
+    if context.connection is not None or context.is_pre_ping:
+        return False
+    error = context.original_exception
+    return context.sqlalchemy_exception is not None or isinstance(error, (OSError, asyncio.TimeoutError))
+
+
+class CircuitBreakerRegistry:
+    """Breakers keyed by pool name (tenant:<id> or tenant:<id>:ro)"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = self._breakers[name] = CircuitBreaker(name)
+        return breaker
+
+    def statuses(self) -> list[dict]:
+        """Every breaker that is not closed"""
+        return [b.status() for b in self._breakers.values() if b.state != CLOSED]
+
+    def reset(self, name: str):
+        self._breakers.pop(name, None)
+
+
+# Global circuit breaker registry
+circuit_breakers = CircuitBreakerRegistry()
+
+registry.register(Gauge(
+    "db_circuit_open",
+    "1 while a tenant pool's circuit breaker is open or half-open",
+    ("pool",),
+    collect=lambda: [({"pool": s["pool"]}, 1) for s in circuit_breakers.statuses()],
+))
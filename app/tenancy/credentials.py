@@ -0,0 +1,119 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import quote_plus
+from sqlalchemy import select
+from app.config import settings
+from app.tenancy.encryption import decrypt_password
+from app.tenancy.models import School
+from app.tenancy.periodic import run_periodic
+from app.tenancy.schemas import TenantContext
+
+
+class _VaultEntry:
+    __slots__ = ("url", "expires_at")
+
+    def __init__(self, url: bytearray, expires_at: float):
+        self.url = url
+        self.expires_at = expires_at
+
+    def zeroize(self):
+        self.url[:] = bytes(len(self.url))
+
+
+class CredentialVault:
+    """
+    In-memory cache of decrypted tenant connection URLs.
+
+    Entries are keyed by ``(tenant_id, credential_version, host)``, so a
+    credential rotation (which bumps ``School.credential_version``) misses
+    the cache without an explicit flush. URLs are held in bytearrays and
+    overwritten with zeros when evicted (best effort: the ``str`` handed to
+    SQLAlchemy is not ours to wipe). Expired entries are zeroized on every
+    vault lookup and by a periodic sweep, not only when their own key is
+    requested again.
+
+    Tenant contexts never carry the encrypted password; it is loaded from
+    the master DB on a vault miss.
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        self._entries: OrderedDict[tuple, _VaultEntry] = OrderedDict()
+        self._max_entries = max_entries
+
+    def _evict(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry.zeroize()
+
+    def evict_tenant(self, tenant_id: int):
+        """Drop every cached URL of a tenant (all versions and hosts)"""
+        for key in [k for k in self._entries if k[0] == tenant_id]:
+            self._evict(key)
+
+    def sweep_expired(self, now: Optional[float] = None) -> int:
+        """Zeroize and drop every expired entry; returns how many"""
+        now = time.monotonic() if now is None else now
+        expired = [key for key, entry in self._entries.items() if entry.expires_at <= now]
+        for key in expired:
+            self._evict(key)
+        return len(expired)
+
+    async def run_sweep(self):
+        """Periodic job (see ``run_credential_sweep_loop``)"""
+        self.sweep_expired()
+
+    def clear(self):
+        for key in list(self._entries):
+            self._evict(key)
+
+    async def _load_encrypted_password(self, tenant_id: int) -> str:
+        # Local import: the master DB module imports the connection manager
+        from app.tenancy.database import get_master_session
+        async with get_master_session() as db:
+            result = await db.execute(
+                select(School.db_password_encrypted).where(School.id == tenant_id)
+            )
+            return result.scalar_one()
+
+    async def get_url(self, tenant: TenantContext, host: Optional[str] = None) -> str:
+        """Async MySQL URL for the tenant (``host`` overrides db_host, e.g. a replica)"""
+        conn = tenant.connection
+        host = host or conn.db_host
+        version = conn.credential_version
+        key = (tenant.tenant_id, version, host)
+        now = time.monotonic()
+        self.sweep_expired(now)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry.url.decode()
+
+        # Older versions of this tenant's credentials are dead weight
+        for stale in [k for k in self._entries if k[0] == tenant.tenant_id and k[1] != version]:
+            self._evict(stale)
+
+        password = decrypt_password(await self._load_encrypted_password(tenant.tenant_id))
+        url = bytearray(
+            f"mysql+aiomysql://{conn.db_user}:{quote_plus(password)}"
+            f"@{host}:{conn.db_port}/{conn.db_name}"
+            f"?charset=utf8mb4",
+            "utf-8"
+        )
+        self._entries[key] = _VaultEntry(url, now + settings.CREDENTIAL_CACHE_TTL_SECONDS)
+        while len(self._entries) > self._max_entries:
+            self._evict(next(iter(self._entries)))
+        return url.decode()
+
+
+# Global credential vault instance
+credential_vault = CredentialVault()
+
+
+async def run_credential_sweep_loop():
+    """Background loop started from the application lifespan (every worker has its own vault)"""
+    await run_periodic(
+        "Credential vault sweep", settings.CREDENTIAL_SWEEP_INTERVAL_SECONDS, credential_vault.run_sweep,
+        delay_first=True,
+    )
@@ -5,7 +5,10 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sess
 from app.config import settings
 from app.tenancy.resolver import tenant_resolver
 from app.tenancy.manager import connection_manager
-from app.tenancy.models import School
+from app.tenancy.schemas import TenantContext
+from app.core.metrics import register_pool_source, set_request_tenant
+from app.core.sql_monitor import instrument_engine
+from app.core.connection_budget import BudgetedAsyncQueuePool
 
 import ssl
 
@@ -13,6 +16,8 @@ master_engine_kwargs = {
     "pool_size": 20,
     "max_overflow": 10,
     "pool_pre_ping": True,
+    "poolclass": BudgetedAsyncQueuePool,
+    "pool_logging_name": "master",
     "echo": settings.DEBUG
 }
 
@@ -23,10 +28,11 @@ if settings.MASTER_DATABASE_URL and "aivencloud" in settings.MASTER_DATABASE_URL
     master_engine_kwargs["connect_args"] = {"ssl": ctx}
 
 # Master database engine (Control Plane)
-master_engine = create_async_engine(
+master_engine = instrument_engine(create_async_engine(
     settings.MASTER_DATABASE_URL,
     **master_engine_kwargs
-)
+), tenant_label="master")
+register_pool_source(lambda: {"master": master_engine.pool})
 
 # Master database session maker
 MasterSessionLocal = async_sessionmaker(
@@ -108,18 +114,19 @@ async def get_tenant_db(
     - Close properly
     """
     # Resolve tenant from request
-    school: School = await tenant_resolver.resolve(request, master_session)
+    tenant: TenantContext = await tenant_resolver.resolve(request, master_session)
+    set_request_tenant(tenant.subdomain)
     
     # Get session maker for this specific tenant
-    session_maker = await connection_manager.get_session_maker(school)
+    session_maker = await connection_manager.get_session_maker(tenant)
     
     # Create scoped session
     async with session_maker() as session:
         try:
             # Store tenant context in session for audit trails
-            session.info["tenant_id"] = school.id
-            session.info["tenant_name"] = school.name
-            session.info["tenant_subdomain"] = school.subdomain
+            session.info["tenant_id"] = tenant.tenant_id
+            session.info["tenant_name"] = tenant.tenant_name
+            session.info["tenant_subdomain"] = tenant.subdomain
             
             yield session
             await session.commit()
@@ -130,16 +137,46 @@ async def get_tenant_db(
             await session.close()
 
 
+async def get_tenant_db_readonly(
+    request: Request,
+    master_session: AsyncSession = Depends(get_master_db)
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Read-only variant of get_tenant_db for pure GET endpoints.
+    
+    - Routes to the tenant's read replica when ``db_replica_host`` is set
+    - Connections run in READ ONLY transaction mode (writes fail fast)
+    - Never flushes or commits; the transaction is simply ended on close
+    
+    Usage:
+        @router.get("/students")
+        async def list_students(db: AsyncSession = Depends(get_tenant_db_readonly)):
+            ...
+    """
+    tenant: TenantContext = await tenant_resolver.resolve(request, master_session)
+    set_request_tenant(tenant.subdomain)
+    
+    session_maker = await connection_manager.get_session_maker(tenant, readonly=True)
+    
+    async with session_maker() as session:
+        session.info["tenant_id"] = tenant.tenant_id
+        session.info["tenant_name"] = tenant.tenant_name
+        session.info["tenant_subdomain"] = tenant.subdomain
+        session.info["readonly"] = True
+        
+        yield session
+
+
 async def get_current_tenant(
     request: Request,
     master_session: AsyncSession = Depends(get_master_db)
-) -> School:
+) -> TenantContext:
     """
     Dependency to get current tenant metadata without database session.
     
     Use when you need tenant info but don't need database access:
         @router.get("/tenant-info")
-        async def get_info(school: School = Depends(get_current_tenant)):
-            return {"name": school.name}
+        async def get_info(tenant: TenantContext = Depends(get_current_tenant)):
+            return {"name": tenant.tenant_name}
     """
     return await tenant_resolver.resolve(request, master_session)
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import time
+from typing import Any, Optional, Sequence
+from sqlalchemy import text
+from app.config import settings
+from app.tenancy.manager import connection_manager, ConnectionManager
+from app.tenancy.circuit_breaker import TenantUnavailableException
+from app.tenancy.models import School
+from app.tenancy.schemas import TenantQueryResult, FanOutResult, TenantContext
+
+logger = logging.getLogger(__name__)
+
+
+class FanOutExecutor:
+    """
+    Runs the same read-only query against many tenant databases concurrently.
+
+    - Concurrency is bounded by a semaphore so a large fleet cannot exhaust
+      worker connections.
+    - Each tenant gets its own timeout; a slow or unreachable school is
+      reported as a failure instead of stalling the whole request.
+    - A tenant whose circuit breaker is open fails immediately, without
+      taking a concurrency slot or waiting for the connect timeout.
+    - Every statement runs inside a READ ONLY transaction that is always
+      rolled back.
+    """
+
+    def __init__(self, manager: ConnectionManager = connection_manager):
+        self._manager = manager
+
+    async def _query_tenant(
+        self,
+        tenant: TenantContext,
+        sql: str,
+        params: dict[str, Any],
+    ) -> list[dict]:
+        """Execute the query on one tenant inside a read-only transaction"""
+        engine = await self._manager.get_engine(tenant)
+        async with engine.connect() as conn:
+            try:
+                await conn.execute(text("SET TRANSACTION READ ONLY"))
+                result = await conn.execute(text(sql), params)
+                return [dict(row) for row in result.mappings().all()]
+            finally:
+                await conn.rollback()
+
+    async def _run_one(
+        self,
+        school: School,
+        sql: str,
+        params: dict[str, Any],
+        semaphore: asyncio.Semaphore,
+        timeout: float,
+    ) -> TenantQueryResult:
+        """Run a single tenant leg, converting errors and timeouts into results"""
+        tenant = TenantContext.from_school(school)
+        started = time.perf_counter()
+        error: Optional[str] = None
+        rows: list[dict] = []
+        try:
+            await self._manager.check_circuit(tenant)
+        except TenantUnavailableException as e:
+            error = f"Circuit open, retry after {e.headers['Retry-After']}s"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+
+        if error is None:
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    rows = await asyncio.wait_for(
+                        self._query_tenant(tenant, sql, params),
+                        timeout=timeout
+                    )
+                except asyncio.TimeoutError:
+                    error = f"Timed out after {timeout:.1f}s"
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+
+        if error:
+            logger.warning(f"Fan-out query failed for tenant {school.id} ({school.subdomain}): {error}")
+
+        return TenantQueryResult(
+            tenant_id=school.id,
+            subdomain=school.subdomain,
+            name=school.name,
+            ok=error is None,
+            rows=rows,
+            error=error,
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+        )
+
+    async def run(
+        self,
+        schools: Sequence[School],
+        sql: str,
+        params: Optional[dict[str, Any]] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> FanOutResult:
+        """
+        Execute ``sql`` on every school and collect per-tenant results.
+
+        Never raises for tenant-level failures; inspect ``FanOutResult.failed``.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or settings.FANOUT_MAX_CONCURRENCY)
+        timeout = timeout or settings.FANOUT_TENANT_TIMEOUT_SECONDS
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*[
+            self._run_one(school, sql, params or {}, semaphore, timeout)
+            for school in schools
+        ])
+
+        return FanOutResult(
+            results=list(results),
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+        )
+
+
+# Global fan-out executor instance
+fanout_executor = FanOutExecutor()
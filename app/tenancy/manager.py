@@ -1,7 +1,18 @@
 from typing import Dict
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
-from app.tenancy.models import School
-from app.tenancy.encryption import decrypt_password
+from app.config import settings
+from app.tenancy.schemas import TenantContext
+from app.tenancy.credentials import credential_vault
+from app.core.metrics import register_pool_source
+from app.core.sql_monitor import instrument_engine
+from app.core.connection_budget import BudgetedAsyncQueuePool
+from app.tenancy.circuit_breaker import circuit_breakers, is_connect_failure, CLOSED
+
+
+def overflow_for(pool_size: int) -> int:
+    """Burst capacity allowed above a base pool size"""
+    return max(pool_size // 2, 1)
 
 
 class ConnectionManager:
@@ -10,59 +21,164 @@ class ConnectionManager:
     
     Each tenant (school) gets its own connection pool to its isolated database.
     Connections are cached and reused for performance.
+    
+    Read-only traffic gets a separate pool per tenant that targets the
+    school's replica (``db_replica_host``) when one is configured, and whose
+    connections are put in READ ONLY mode once at connect time.
+    
+    Tenants are identified by a ``TenantContext``; when its connection key
+    (hosts, user, credential version) changes, e.g. after an update handled
+    by another worker, the tenant's engines are rebuilt.
+    
+    Pools start at the size of the school's plan tier and are resized from
+    observed load by ``app/tenancy/pool_sizing.py`` within a per-worker
+    connection budget.
     """
     
     def __init__(self):
         self._engines: Dict[int, AsyncEngine] = {}
         self._session_makers: Dict[int, async_sessionmaker] = {}
+        self._readonly_engines: Dict[int, AsyncEngine] = {}
+        self._readonly_session_makers: Dict[int, async_sessionmaker] = {}
+        self._tenants: Dict[int, TenantContext] = {}
+        # max_overflow each live engine was built with, keyed like tenant_pools()
+        self._max_overflows: Dict[tuple, int] = {}
     
-    def _build_connection_string(self, school: School) -> str:
-        """Build async MySQL connection string for tenant"""
-        password = decrypt_password(school.db_password_encrypted)
+    def _engine_kwargs(self, connection_string: str, pool_name: str, pool_size: int, max_overflow: int) -> dict:
+        """Pool and driver settings shared by primary and read-only engines"""
+        engine_kwargs = {
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_pre_ping": True,
+            "pool_recycle": 3600,
+            "poolclass": BudgetedAsyncQueuePool,
+            "pool_logging_name": pool_name,
+            "echo": False
+        }
         
-        # URL-encode special characters in password
-        from urllib.parse import quote_plus
-        password_encoded = quote_plus(password)
+        if "aivencloud" in connection_string:
+            import ssl
+            ctx = ssl.create_default_context()
+            ctx.check_hostname = False
+            ctx.verify_mode = ssl.CERT_NONE
+            engine_kwargs["connect_args"] = {"ssl": ctx}
         
-        return (
-            f"mysql+aiomysql://{school.db_user}:{password_encoded}"
-            f"@{school.db_host}:{school.db_port}/{school.db_name}"
-            f"?charset=utf8mb4"
+        return engine_kwargs
+    
+    def tier_pool_size(self, tenant_id: int) -> int:
+        """Largest base pool size the tenant's plan tier allows"""
+        tenant = self._tenants.get(tenant_id)
+        tier = ((tenant.subscription_tier if tenant else None) or "").lower()
+        return settings.TENANT_POOL_TIER_SIZES.get(tier, settings.TENANT_POOL_DEFAULT_SIZE)
+    
+    def allocated_connections(self) -> int:
+        """pool_size + max_overflow summed over every live tenant pool"""
+        return sum(
+            pool.size() + self._max_overflows.get(key, 0) for key, pool in self.tenant_pools().items()
         )
     
-    async def get_engine(self, school: School) -> AsyncEngine:
+    def _initial_pool_size(self, tenant_id: int) -> int:
+        """Tier size, capped by what is left of the worker connection budget"""
+        remaining = settings.WORKER_CONNECTION_BUDGET - self.allocated_connections()
+        return max(settings.TENANT_POOL_MIN_SIZE, min(self.tier_pool_size(tenant_id), remaining * 2 // 3))
+    
+    def _pool_name(self, tenant_id: int, readonly: bool) -> str:
+        return f"tenant:{tenant_id}:ro" if readonly else f"tenant:{tenant_id}"
+    
+    async def _create_engine(self, tenant: TenantContext, readonly: bool, pool_size: int) -> AsyncEngine:
+        """Build an instrumented engine; read-only engines target the replica if configured"""
+        host = tenant.connection.db_replica_host if readonly else None
+        pool_name = self._pool_name(tenant.tenant_id, readonly)
+        connection_string = await credential_vault.get_url(tenant, host=host)
+        max_overflow = overflow_for(pool_size)
+        engine = instrument_engine(create_async_engine(
+            connection_string,
+            **self._engine_kwargs(connection_string, pool_name, pool_size, max_overflow)
+        ), tenant_label=str(tenant.tenant_id))
+        self._max_overflows[tenant.tenant_id, readonly] = max_overflow
+        
+        if readonly:
+            @event.listens_for(engine.sync_engine, "connect")
+            def _set_read_only(dbapi_connection, connection_record):
+                # Once per physical connection, not per request
+                cursor = dbapi_connection.cursor()
+                cursor.execute("SET SESSION TRANSACTION READ ONLY")
+                cursor.close()
+        
+        breaker = circuit_breakers.get(pool_name)
+        
+        @event.listens_for(engine.sync_engine, "handle_error")
+        def _record_connect_failure(context):
+            if is_connect_failure(context):
+                breaker.record_failure(context.original_exception)
+        
+        @event.listens_for(engine.sync_engine, "connect")
+        def _record_connect_success(dbapi_connection, connection_record):
+            breaker.record_success()
+        
+        return engine
+    
+    async def _track(self, tenant: TenantContext):
+        """Remember the latest context; rebuild engines if its connection key changed"""
+        known = self._tenants.get(tenant.tenant_id)
+        if known is not None and known.connection != tenant.connection:
+            await self.close_tenant(tenant.tenant_id)
+        # Latest tier for sizing and connection key for later rebuilds
+        self._tenants[tenant.tenant_id] = tenant
+    
+    async def get_engine(self, tenant: TenantContext, readonly: bool = False) -> AsyncEngine:
         """Get or create async engine for tenant"""
-        if school.id not in self._engines:
-            connection_string = self._build_connection_string(school)
-            
-            engine_kwargs = {
-                "pool_size": 20,
-                "max_overflow": 10,
-                "pool_pre_ping": True,
-                "pool_recycle": 3600,
-                "echo": False
-            }
-            
-            if "aivencloud" in connection_string:
-                import ssl
-                ctx = ssl.create_default_context()
-                ctx.check_hostname = False
-                ctx.verify_mode = ssl.CERT_NONE
-                engine_kwargs["connect_args"] = {"ssl": ctx}
-                
-            self._engines[school.id] = create_async_engine(
-                connection_string,
-                **engine_kwargs
+        await self._track(tenant)
+        engines = self._readonly_engines if readonly else self._engines
+        
+        if tenant.tenant_id not in engines:
+            engines[tenant.tenant_id] = await self._create_engine(
+                tenant, readonly, self._initial_pool_size(tenant.tenant_id)
             )
         
-        return self._engines[school.id]
+        return engines[tenant.tenant_id]
     
-    async def get_session_maker(self, school: School) -> async_sessionmaker:
-        """Get or create async session maker for tenant"""
-        if school.id not in self._session_makers:
-            engine = await self.get_engine(school)
+    async def resize_pool(self, tenant_id: int, pool_size: int, readonly: bool = False) -> bool:
+        """
+        Replace a tenant's engine with one sized ``pool_size``.
+        
+        Sessions already running keep the old engine; its idle connections
+        are closed now and checked-out ones when they are returned.
+        """
+        engines = self._readonly_engines if readonly else self._engines
+        makers = self._readonly_session_makers if readonly else self._session_makers
+        old_engine = engines.get(tenant_id)
+        tenant = self._tenants.get(tenant_id)
+        if old_engine is None or tenant is None or old_engine.pool.size() == pool_size:
+            return False
+        
+        engines[tenant_id] = await self._create_engine(tenant, readonly, pool_size)
+        makers.pop(tenant_id, None)
+        await old_engine.dispose()
+        return True
+    
+    async def check_circuit(self, tenant: TenantContext, readonly: bool = False):
+        """Raise TenantUnavailableException (503) while the tenant's circuit breaker is open"""
+        breaker = circuit_breakers.get(self._pool_name(tenant.tenant_id, readonly))
+        if breaker.state != CLOSED:
+            await breaker.before_request(await self.get_engine(tenant, readonly=readonly))
+    
+    async def get_session_maker(self, tenant: TenantContext, readonly: bool = False) -> async_sessionmaker:
+        """
+        Get or create async session maker for tenant.
+        
+        Raises TenantUnavailableException (503) while the tenant's circuit
+        breaker is open, instead of waiting for the driver connect timeout.
+        """
+        await self._track(tenant)
+        tenant_id = tenant.tenant_id
+        await self.check_circuit(tenant, readonly)
+        
+        makers = self._readonly_session_makers if readonly else self._session_makers
+        if tenant_id not in makers:
+            engine = await self.get_engine(tenant, readonly=readonly)
             
-            self._session_makers[school.id] = async_sessionmaker(
+            makers[tenant_id] = async_sessionmaker(
                 engine,
                 class_=AsyncSession,
                 expire_on_commit=False,
@@ -70,23 +186,52 @@ class ConnectionManager:
                 autocommit=False
             )
         
-        return self._session_makers[school.id]
+        return makers[tenant_id]
+    
+    def tenant_pools(self) -> Dict[tuple, object]:
+        """Pools of every live tenant engine, keyed by (tenant_id, readonly)"""
+        pools = {(tenant_id, False): engine.pool for tenant_id, engine in self._engines.items()}
+        pools.update({(tenant_id, True): engine.pool for tenant_id, engine in self._readonly_engines.items()})
+        return pools
+    
+    def live_pools(self) -> Dict[str, object]:
+        """Pools of every live tenant engine, keyed by pool name (tenant:<id>[:ro])"""
+        return {
+            self._pool_name(tenant_id, readonly): pool
+            for (tenant_id, readonly), pool in self.tenant_pools().items()
+        }
     
     async def close_all(self):
         """Close all tenant engine connections (for graceful shutdown)"""
-        for engine in self._engines.values():
+        for engine in [*self._engines.values(), *self._readonly_engines.values()]:
             await engine.dispose()
         
         self._engines.clear()
         self._session_makers.clear()
+        self._readonly_engines.clear()
+        self._readonly_session_makers.clear()
+        self._tenants.clear()
+        self._max_overflows.clear()
+        credential_vault.clear()
     
     async def close_tenant(self, tenant_id: int):
         """Close connection for specific tenant (useful for maintenance)"""
         if tenant_id in self._engines:
             await self._engines[tenant_id].dispose()
             del self._engines[tenant_id]
-            del self._session_makers[tenant_id]
+            self._session_makers.pop(tenant_id, None)
+        if tenant_id in self._readonly_engines:
+            await self._readonly_engines[tenant_id].dispose()
+            del self._readonly_engines[tenant_id]
+            self._readonly_session_makers.pop(tenant_id, None)
+        self._tenants.pop(tenant_id, None)
+        self._max_overflows.pop((tenant_id, False), None)
+        self._max_overflows.pop((tenant_id, True), None)
+        credential_vault.evict_tenant(tenant_id)
+        circuit_breakers.reset(self._pool_name(tenant_id, False))
+        circuit_breakers.reset(self._pool_name(tenant_id, True))
 
 
 # Global connection manager instance
 connection_manager = ConnectionManager()
+register_pool_source(connection_manager.live_pools)
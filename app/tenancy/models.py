@@ -1,4 +1,4 @@
-from sqlalchemy import String, Integer, Boolean, DateTime, func, ForeignKey, Text
+from sqlalchemy import String, Integer, BigInteger, Boolean, DateTime, func, ForeignKey, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime
 from app.shared.base_models import Base, MasterBase
@@ -24,6 +24,8 @@ class School(MasterBase):
     db_name: Mapped[str] = mapped_column(String(100), nullable=False)
     db_user: Mapped[str] = mapped_column(String(100), nullable=False)
     db_password_encrypted: Mapped[str] = mapped_column(String(500), nullable=False)
+    db_replica_host: Mapped[str] = mapped_column(String(255), nullable=True)  # Optional read replica
+    credential_version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")  # Bumped on credential/host change
     
     # Subscription & limits
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False, index=True)
@@ -177,3 +179,34 @@ class Ticket(MasterBase):
     
     def __repr__(self) -> str:
         return f"<Ticket {self.id} (user_id={self.user_id})>"
+
+
+class TenantUsageSnapshot(MasterBase):
+    """
+    Periodic per-school usage counts collected from each tenant database.
+    Stored in the master database so dashboards and plan enforcement read
+    one indexed table instead of querying every tenant live.
+    """
+    __tablename__ = "tenant_usage_snapshots"
+    __table_args__ = (
+        Index("ix_tenant_usage_snapshots_school_collected", "school_id", "collected_at"),
+    )
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    school_id: Mapped[int] = mapped_column(Integer, ForeignKey("schools.id", ondelete="CASCADE"), nullable=False)
+    
+    students: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    teachers: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    users: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    branches: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    storage_bytes: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    
+    collected_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        index=True
+    )
+    
+    def __repr__(self) -> str:
+        return f"<TenantUsageSnapshot school={self.school_id} at={self.collected_at}>"
@@ -0,0 +1,47 @@
+"""
+Periodic background jobs started from the application lifespan.
+
+``run_periodic`` runs a job every interval until cancelled, logging and
+skipping failed runs. Jobs that must run once per interval across all
+workers (not once per worker) pass a ``lock_key``: the worker that wins a
+Redis ``SET NX`` with a TTL just under the interval runs it. Without
+Redis every worker runs it (acceptable for single-worker dev).
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+from app.tenancy.cache import tenant_cache, REDIS_UNAVAILABLE
+
+logger = logging.getLogger(__name__)
+
+
+async def acquire_interval_lock(key: str, interval: int) -> bool:
+    """Claim ``key`` for this interval; True if this worker should run the job"""
+    redis = tenant_cache.redis
+    if not redis:
+        return True
+    try:
+        return bool(await redis.set(key, "1", nx=True, ex=max(interval - 1, 1)))
+    except REDIS_UNAVAILABLE:
+        return True
+
+
+async def run_periodic(
+    name: str,
+    interval: int,
+    job: Callable[[], Awaitable[object]],
+    lock_key: Optional[str] = None,
+    delay_first: bool = False,
+):
+    """Run ``job`` every ``interval`` seconds until cancelled"""
+    if delay_first:
+        await asyncio.sleep(interval)
+    while True:
+        try:
+            if lock_key is None or await acquire_interval_lock(lock_key, interval):
+                await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"{name} failed: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,93 @@
+import logging
+import math
+import time
+from app.config import settings
+from app.tenancy.manager import connection_manager, overflow_for
+from app.tenancy.periodic import run_periodic
+
+logger = logging.getLogger(__name__)
+
+
+# Keep this much headroom above the peak concurrency seen in an interval
+HEADROOM = 1.5
+
+
+class PoolSizer:
+    """
+    Periodically resizes tenant pools in this worker.
+
+    - A pool idle for ``TENANT_POOL_IDLE_SECONDS`` shrinks to
+      ``TENANT_POOL_MIN_SIZE``.
+    - A busy pool is sized from its peak checked-out connections during the
+      last interval (plus headroom), capped by its plan tier's size.
+    - When the targets together exceed ``WORKER_CONNECTION_BUDGET``
+      (counting overflow), every pool is scaled down proportionally,
+      never below the minimum size.
+
+    Small changes are ignored so pools are not rebuilt for noise.
+    """
+
+    def target_size(self, tenant_id: int, pool, now: float) -> int:
+        """Desired base size for one pool from its plan tier and observed load"""
+        stats = pool.wait_stats
+        if now - stats.last_checkout >= settings.TENANT_POOL_IDLE_SECONDS:
+            return settings.TENANT_POOL_MIN_SIZE
+
+        peak = max(stats.peak_checked_out, pool.checkedout(), 1)
+        demand = math.ceil(peak * HEADROOM)
+        return max(settings.TENANT_POOL_MIN_SIZE, min(demand, connection_manager.tier_pool_size(tenant_id)))
+
+    def fit_budget(self, targets: dict) -> dict:
+        """Scale targets down so size + overflow fits the worker budget"""
+        allocated = sum(size + overflow_for(size) for size in targets.values())
+        budget = settings.WORKER_CONNECTION_BUDGET
+        if allocated <= budget:
+            return targets
+
+        scale = budget / allocated
+        return {
+            key: max(settings.TENANT_POOL_MIN_SIZE, math.floor(size * scale))
+            for key, size in targets.items()
+        }
+
+    def _worth_resizing(self, current: int, target: int) -> bool:
+        if target == current:
+            return False
+        if target == settings.TENANT_POOL_MIN_SIZE:
+            return True
+        return abs(target - current) >= max(2, current // 4)
+
+    async def rebalance(self) -> list[dict]:
+        """Run one sizing pass; returns the applied changes"""
+        now = time.monotonic()
+        pools = connection_manager.tenant_pools()
+
+        targets = self.fit_budget({
+            key: self.target_size(key[0], pool, now) for key, pool in pools.items()
+        })
+
+        changes = []
+        for (tenant_id, readonly), target in targets.items():
+            pool = pools[(tenant_id, readonly)]
+            current = pool.size()
+            # Start a fresh observation window
+            pool.wait_stats.peak_checked_out = pool.checkedout()
+            if not self._worth_resizing(current, target):
+                continue
+            if await connection_manager.resize_pool(tenant_id, target, readonly=readonly):
+                changes.append({"tenant_id": tenant_id, "readonly": readonly, "from": current, "to": target})
+
+        if changes:
+            logger.info(f"Resized {len(changes)} tenant pools: {changes}")
+        return changes
+
+
+async def run_pool_sizing_loop():
+    """Background loop started from the application lifespan (every worker sizes its own pools)"""
+    await run_periodic(
+        "Pool sizing pass", settings.POOL_RESIZE_INTERVAL_SECONDS, pool_sizer.rebalance, delay_first=True
+    )
+
+
+# Global pool sizer instance
+pool_sizer = PoolSizer()
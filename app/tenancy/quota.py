@@ -0,0 +1,237 @@
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import HTTPException, status
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.tenancy.cache import tenant_cache, REDIS_UNAVAILABLE
+from app.tenancy.database import get_master_session
+from app.tenancy.models import School, SubscriptionPlan
+from app.modules.students.models import Student
+from app.modules.teachers.models import Teacher
+
+logger = logging.getLogger(__name__)
+
+
+# Quota resource -> (counted tenant model, School limit column)
+QUOTA_RESOURCES = {
+    "students": (Student, "max_students"),
+    "teachers": (Teacher, "max_teachers"),
+}
+
+UNLIMITED = -1
+
+# Atomic check-and-increment.
+# Returns the new count, -1 when the limit would be exceeded, -2 when unseeded.
+_RESERVE_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+if not current then return -2 end
+local limit = tonumber(ARGV[2])
+if limit >= 0 and tonumber(current) + 1 > limit then return -1 end
+return redis.call('HINCRBY', KEYS[1], ARGV[1], 1)
+"""
+
+# Compare-and-set a counter to an authoritative count: only if it still holds
+# the value read just before counting (no reserve/release in between).
+# Returns 1 when set, 0 when unseeded, -1 when the counter moved.
+_RECONCILE_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+if not current then return 0 end
+if current ~= ARGV[2] then return -1 end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[3])
+return 1
+"""
+
+# Decrement without going below zero; no-op when unseeded.
+_RELEASE_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+if not current or tonumber(current) <= 0 then return 0 end
+return redis.call('HINCRBY', KEYS[1], ARGV[1], -1)
+"""
+
+
+class QuotaService:
+    """
+    Plan quota enforcement for per-tenant entity counts.
+
+    Counts live in a Redis hash per tenant (``quota:{tenant_id}``) and are
+    checked-and-incremented atomically by a Lua script, so a create never
+    runs ``COUNT(*)``. Counters are seeded from the tenant DB on first use
+    and reconciled after each periodic usage snapshot.
+
+    Without Redis, or while it is unreachable, the limit is checked against
+    a ``COUNT(*)`` of the entity table: slower, but it counts every row,
+    with or without a branch.
+    """
+
+    def __init__(self):
+        self._limits_ttl = 300  # 5 minutes
+
+    def _counter_key(self, tenant_id: int) -> str:
+        return f"quota:{tenant_id}"
+
+    def _limits_key(self, tenant_id: int) -> str:
+        return f"quota:limits:{tenant_id}"
+
+    async def _load_limits(self, tenant_id: int) -> dict[str, int]:
+        """Effective limits: the stricter of the school override and its plan"""
+        async with get_master_session() as master:
+            school = await master.get(School, tenant_id)
+            plan = None
+            if school and school.subscription_tier:
+                result = await master.execute(
+                    select(SubscriptionPlan).where(
+                        SubscriptionPlan.plan_name == school.subscription_tier,
+                        SubscriptionPlan.is_active == True
+                    )
+                )
+                plan = result.scalar_one_or_none()
+
+        limits = {}
+        for resource, (_, limit_column) in QUOTA_RESOURCES.items():
+            candidates = [getattr(school, limit_column, None) if school else None]
+            if resource == "students" and plan:
+                candidates.append(plan.max_students)
+            candidates = [c for c in candidates if c is not None]
+            limits[resource] = min(candidates) if candidates else UNLIMITED
+        return limits
+
+    async def get_limits(self, tenant_id: int) -> dict[str, int]:
+        """Get effective limits, cached in Redis"""
+        redis = tenant_cache.redis
+        if redis:
+            try:
+                cached = await redis.hgetall(self._limits_key(tenant_id))
+            except REDIS_UNAVAILABLE as e:
+                logger.warning(f"Quota limits cache unavailable for tenant {tenant_id}: {e}")
+                redis, cached = None, None
+            if cached:
+                return {k: int(v) for k, v in cached.items()}
+
+        limits = await self._load_limits(tenant_id)
+
+        if redis:
+            key = self._limits_key(tenant_id)
+            try:
+                async with redis.pipeline(transaction=True) as pipe:
+                    pipe.hset(key, mapping=limits)
+                    pipe.expire(key, self._limits_ttl)
+                    await pipe.execute()
+            except REDIS_UNAVAILABLE as e:
+                logger.warning(f"Quota limits not cached for tenant {tenant_id}: {e}")
+        return limits
+
+    async def invalidate_limits(self, tenant_id: int):
+        """Drop cached limits after a school or plan change"""
+        redis = tenant_cache.redis
+        if not redis:
+            return
+        try:
+            await redis.delete(self._limits_key(tenant_id))
+        except REDIS_UNAVAILABLE as e:
+            # The cached limits still expire after _limits_ttl
+            logger.warning(f"Quota limits not invalidated for tenant {tenant_id}: {e}")
+
+    async def _count_from_db(self, db: AsyncSession, resource: str) -> int:
+        """Authoritative count: seeds a cold counter and is the no-Redis fallback"""
+        model, _ = QUOTA_RESOURCES[resource]
+        return await db.scalar(select(func.count()).select_from(model)) or 0
+
+    async def _try_reserve(self, redis, db: AsyncSession, tenant_id: int, resource: str, limit: int) -> bool:
+        """Atomically take one slot; seeds the counter on first use"""
+        key = self._counter_key(tenant_id)
+        result = await redis.eval(_RESERVE_SCRIPT, 1, key, resource, limit)
+        if result == -2:
+            count = await self._count_from_db(db, resource)
+            await redis.hsetnx(key, resource, count)
+            result = await redis.eval(_RESERVE_SCRIPT, 1, key, resource, limit)
+        return result >= 0
+
+    async def release(self, tenant_id: int, resource: str):
+        """Give one slot back (after a delete or a failed create)"""
+        if not tenant_cache.redis:
+            return
+        try:
+            await tenant_cache.redis.eval(_RELEASE_SCRIPT, 1, self._counter_key(tenant_id), resource)
+        except Exception as e:
+            logger.warning(f"Quota release failed for tenant {tenant_id} ({resource}): {e}")
+
+    @asynccontextmanager
+    async def reserve(self, db: AsyncSession, resource: str):
+        """
+        Reserve one slot of ``resource`` for the tenant bound to ``db``.
+
+        Usage:
+            async with quota_service.reserve(db, "students"):
+                db.add(student)
+                await db.commit()
+
+        Raises HTTPException(403) when the plan limit is reached. The slot is
+        released again if the block raises.
+        """
+        tenant_id: Optional[int] = db.info.get("tenant_id")
+        if tenant_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Tenant context not available for quota check"
+            )
+
+        limits = await self.get_limits(tenant_id)
+        limit = limits.get(resource, UNLIMITED)
+
+        reserved = None
+        redis = tenant_cache.redis
+        if redis:
+            try:
+                reserved = await self._try_reserve(redis, db, tenant_id, resource, limit)
+            except REDIS_UNAVAILABLE as e:
+                logger.warning(f"Quota counter unavailable for tenant {tenant_id}, counting rows: {e}")
+        counted = reserved is not None  # Took a slot in Redis that a failure must give back
+        if reserved is None:
+            reserved = limit == UNLIMITED or (
+                await self._count_from_db(db, resource) < limit
+            )
+
+        if not reserved:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Plan limit reached: at most {limit} {resource} allowed for this school"
+            )
+
+        try:
+            yield
+        except Exception:
+            if counted:
+                await self.release(tenant_id, resource)
+            raise
+
+    async def reconcile(self, db: AsyncSession, tenant_id: int) -> int:
+        """
+        Correct the tenant's cached counters from a fresh ``COUNT`` on ``db``
+        (called after every usage snapshot). Each counter is only
+        overwritten if no reservation or release touched it while counting;
+        otherwise it is left for the next run. A create reserved but not yet
+        committed while counting is not in the count, so it can be lost from
+        the counter; the window is a single request. Returns how many
+        counters were changed.
+        """
+        redis = tenant_cache.redis
+        if not redis:
+            return 0
+        key = self._counter_key(tenant_id)
+        corrected = 0
+        try:
+            for resource in QUOTA_RESOURCES:
+                before = await redis.hget(key, resource)
+                if before is None:
+                    continue  # Unseeded: the next reservation seeds it
+                count = await self._count_from_db(db, resource)
+                if await redis.eval(_RECONCILE_SCRIPT, 1, key, resource, before, count) == 1:
+                    corrected += int(before) != count
+        except REDIS_UNAVAILABLE as e:
+            logger.warning(f"Quota reconcile skipped for tenant {tenant_id}: {e}")
+        return corrected
+
+
+# Global quota service instance
+quota_service = QuotaService()
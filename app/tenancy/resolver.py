@@ -4,6 +4,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.tenancy.cache import tenant_cache
 from app.tenancy.models import School
+from app.tenancy.schemas import TenantContext
 
 
 class TenantResolver:
@@ -13,7 +14,7 @@ class TenantResolver:
         self,
         request: Request,
         master_session: AsyncSession
-    ) -> Optional[School]:
+    ) -> Optional[TenantContext]:
         """Extract tenant from subdomain"""
         host = request.headers.get("host", "")
         
@@ -34,30 +35,27 @@ class TenantResolver:
             return None
         
         # Check cache first
-        cached_data = await tenant_cache.get_tenant(subdomain)
-        if cached_data:
-            # Reconstruct School object from cached data
-            school = School()
-            for key, value in cached_data.items():
-                setattr(school, key, value)
-            return school
+        cached = await tenant_cache.get_tenant(subdomain)
+        if cached:
+            return cached
         
         # Fallback to master DB
         result = await master_session.execute(
             select(School).where(School.subdomain == subdomain)
         )
         school = result.scalar_one_or_none()
+        if not school:
+            return None
         
-        if school:
-            await tenant_cache.set_tenant(subdomain, school)
-        
-        return school
+        tenant = TenantContext.from_school(school)
+        await tenant_cache.set_tenant(tenant)
+        return tenant
     
     async def resolve_from_header(
         self,
         request: Request,
         master_session: AsyncSession
-    ) -> Optional[School]:
+    ) -> Optional[TenantContext]:
         """Extract tenant from X-Tenant-ID header"""
         tenant_id = request.headers.get("X-Tenant-ID")
         if not tenant_id:
@@ -69,50 +67,48 @@ class TenantResolver:
             return None
         
         # Check cache
-        cached_data = await tenant_cache.get_tenant_by_id(tenant_id_int)
-        if cached_data:
-            school = School()
-            for key, value in cached_data.items():
-                setattr(school, key, value)
-            return school
+        cached = await tenant_cache.get_tenant_by_id(tenant_id_int)
+        if cached:
+            return cached
         
         # Fallback to master DB
         result = await master_session.execute(
             select(School).where(School.id == tenant_id_int)
         )
         school = result.scalar_one_or_none()
+        if not school:
+            return None
         
-        if school:
-            await tenant_cache.set_tenant_by_id(tenant_id_int, school)
-        
-        return school
+        tenant = TenantContext.from_school(school)
+        await tenant_cache.set_tenant(tenant)
+        return tenant
     
     async def resolve(
         self,
         request: Request,
         master_session: AsyncSession
-    ) -> School:
+    ) -> TenantContext:
         """Primary resolution method with fallback strategy"""
         # Try subdomain first
-        school = await self.resolve_from_subdomain(request, master_session)
+        tenant = await self.resolve_from_subdomain(request, master_session)
         
         # Fallback to header
-        if not school:
-            school = await self.resolve_from_header(request, master_session)
+        if not tenant:
+            tenant = await self.resolve_from_header(request, master_session)
         
-        if not school:
+        if not tenant:
             raise HTTPException(
                 status_code=400,
                 detail="Unable to identify tenant. Use subdomain or X-Tenant-ID header."
             )
         
-        if not school.is_active:
+        if not tenant.is_active:
             raise HTTPException(
                 status_code=403,
-                detail=f"Tenant '{school.name}' is currently inactive"
+                detail=f"Tenant '{tenant.tenant_name}' is currently inactive"
             )
         
-        return school
+        return tenant
 
 
 # Global resolver instance
@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
@@ -22,6 +23,7 @@ class SchoolCreate(SchoolBase):
     db_name: str
     db_user: str
     db_password: str  # Will be encrypted before storage
+    db_replica_host: Optional[str] = None
 
 
 class SchoolUpdate(BaseModel):
@@ -33,6 +35,7 @@ class SchoolUpdate(BaseModel):
     max_students: Optional[int] = None
     max_teachers: Optional[int] = None
     subscription_tier: Optional[str] = None
+    db_replica_host: Optional[str] = None
 
 
 class School(SchoolBase):
@@ -48,9 +51,71 @@ class School(SchoolBase):
     model_config = {"from_attributes": True}
 
 
-class TenantContext(BaseModel):
-    """Tenant context for request scope"""
+@dataclass(frozen=True, slots=True)
+class TenantConnectionKey:
+    """Everything that identifies a tenant's database connection"""
+    db_host: str
+    db_port: int
+    db_name: str
+    db_user: str
+    db_replica_host: Optional[str] = None
+    credential_version: int = 1
+
+
+@dataclass(frozen=True, slots=True)
+class TenantContext:
+    """
+    Immutable tenant context for request scope.
+    Built from a cache hit or a School row; never an ORM instance, so the
+    request path pays no SQLAlchemy instrumentation costs.
+    """
     tenant_id: int
     tenant_name: str
     subdomain: str
     is_active: bool
+    connection: TenantConnectionKey
+    subscription_tier: Optional[str] = None
+    
+    @classmethod
+    def from_school(cls, school) -> "TenantContext":
+        """Build from a School ORM row (cache miss, fan-out, scripts)"""
+        return cls(
+            tenant_id=school.id,
+            tenant_name=school.name,
+            subdomain=school.subdomain,
+            is_active=school.is_active,
+            connection=TenantConnectionKey(
+                db_host=school.db_host,
+                db_port=school.db_port,
+                db_name=school.db_name,
+                db_user=school.db_user,
+                db_replica_host=school.db_replica_host,
+                credential_version=school.credential_version or 1,
+            ),
+            subscription_tier=school.subscription_tier,
+        )
+
+
+class TenantQueryResult(BaseModel):
+    """Outcome of a single tenant's leg of a fan-out query"""
+    tenant_id: int
+    subdomain: str
+    name: str
+    ok: bool
+    rows: list[dict] = []
+    error: Optional[str] = None
+    elapsed_ms: float
+
+
+class FanOutResult(BaseModel):
+    """Merged outcome of a cross-tenant fan-out query"""
+    results: list[TenantQueryResult]
+    elapsed_ms: float
+    
+    @property
+    def succeeded(self) -> list[TenantQueryResult]:
+        return [r for r in self.results if r.ok]
+    
+    @property
+    def failed(self) -> list[TenantQueryResult]:
+        return [r for r in self.results if not r.ok]
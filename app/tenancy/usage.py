@@ -0,0 +1,136 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.tenancy.cache import tenant_cache
+from app.tenancy.database import get_master_session
+from app.tenancy.fanout import fanout_executor
+from app.tenancy.manager import connection_manager
+from app.tenancy.quota import quota_service
+from app.tenancy.models import School, TenantUsageSnapshot
+from app.tenancy.periodic import run_periodic
+from app.tenancy.schemas import FanOutResult, TenantContext
+
+logger = logging.getLogger(__name__)
+
+
+# One round trip per tenant; storage comes from information_schema
+TENANT_USAGE_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM students) AS students,
+        (SELECT COUNT(*) FROM teachers) AS teachers,
+        (SELECT COUNT(*) FROM users) AS users,
+        (SELECT COUNT(*) FROM branches) AS branches,
+        (SELECT COALESCE(SUM(data_length + index_length), 0)
+           FROM information_schema.tables
+          WHERE table_schema = DATABASE()) AS storage_bytes
+"""
+
+SNAPSHOT_LOCK_KEY = "tenant_usage:snapshot_lock"
+
+
+async def collect_usage_snapshots() -> FanOutResult:
+    """
+    Collect usage counts from every active tenant and store one snapshot row
+    per school in the master database. Tenants that fail are skipped and
+    keep their previous snapshot. Quota counters of the collected tenants
+    are then reconciled from fresh counts (see ``QuotaService.reconcile``);
+    the snapshot counts are too old to overwrite live counters with.
+    """
+    async with get_master_session() as db:
+        result = await db.execute(select(School).where(School.is_active == True))
+        schools = result.scalars().all()
+
+    fanout = await fanout_executor.run(schools, TENANT_USAGE_SQL)
+
+    collected_at = datetime.now(timezone.utc)
+    snapshots = []
+    for r in fanout.succeeded:
+        row = r.rows[0] if r.rows else {}
+        snapshots.append(TenantUsageSnapshot(
+            school_id=r.tenant_id,
+            students=row.get("students") or 0,
+            teachers=row.get("teachers") or 0,
+            users=row.get("users") or 0,
+            branches=row.get("branches") or 0,
+            storage_bytes=int(row.get("storage_bytes") or 0),
+            collected_at=collected_at,
+        ))
+
+    if snapshots:
+        async with get_master_session() as db:
+            db.add_all(snapshots)
+    
+    collected = {snapshot.school_id for snapshot in snapshots}
+    await reconcile_quotas([school for school in schools if school.id in collected])
+
+    logger.info(
+        f"Usage snapshot: {len(snapshots)}/{len(fanout.results)} tenants collected "
+        f"in {fanout.elapsed_ms:.0f}ms"
+    )
+    return fanout
+
+
+async def _reconcile_school(school: School, semaphore: asyncio.Semaphore):
+    async with semaphore:
+        try:
+            session_maker = await connection_manager.get_session_maker(TenantContext.from_school(school))
+            async with session_maker() as db:
+                db.info["tenant_id"] = school.id
+                await asyncio.wait_for(
+                    quota_service.reconcile(db, school.id), settings.FANOUT_TENANT_TIMEOUT_SECONDS
+                )
+        except Exception as e:
+            logger.warning(f"Quota reconcile failed for tenant {school.id} ({school.subdomain}): {type(e).__name__}: {e}")
+
+
+async def reconcile_quotas(schools: list[School]):
+    """Reconcile the quota counters of several tenants, bounded like the fan-out"""
+    if not tenant_cache.redis:
+        return
+    semaphore = asyncio.Semaphore(settings.FANOUT_MAX_CONCURRENCY)
+    await asyncio.gather(*[_reconcile_school(school, semaphore) for school in schools])
+
+
+async def run_usage_snapshot_loop():
+    """Background loop started from the application lifespan"""
+    await run_periodic(
+        "Usage snapshot collection", settings.USAGE_SNAPSHOT_INTERVAL_SECONDS, collect_usage_snapshots,
+        lock_key=SNAPSHOT_LOCK_KEY,
+    )
+
+
+async def get_latest_snapshots(db: AsyncSession) -> list[TenantUsageSnapshot]:
+    """Most recent snapshot per school (served by the school_id, collected_at index)"""
+    latest = (
+        select(
+            TenantUsageSnapshot.school_id,
+            func.max(TenantUsageSnapshot.collected_at).label("collected_at")
+        )
+        .group_by(TenantUsageSnapshot.school_id)
+        .subquery()
+    )
+    result = await db.execute(
+        select(TenantUsageSnapshot)
+        .join(
+            latest,
+            (TenantUsageSnapshot.school_id == latest.c.school_id)
+            & (TenantUsageSnapshot.collected_at == latest.c.collected_at)
+        )
+        .order_by(TenantUsageSnapshot.school_id)
+    )
+    return list(result.scalars().all())
+
+
+async def get_latest_snapshot(db: AsyncSession, school_id: int) -> Optional[TenantUsageSnapshot]:
+    """Most recent snapshot for one school, e.g. for plan enforcement"""
+    result = await db.execute(
+        select(TenantUsageSnapshot)
+        .where(TenantUsageSnapshot.school_id == school_id)
+        .order_by(TenantUsageSnapshot.collected_at.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""
+Attendance Report Benchmark
+
+Builds a synthetic branch (default 10,000 students x 200 school days, every
+period marked) as packed month rows, then times the report pipeline:
+batch decode, NumPy report, and streaming the result as CSV and JSON. A
+per-student Python loop computing the same figures from the same decoded
+grids is timed for comparison, checked against the report, and the
+speedup of ``build_report`` over it is printed.
+No database is involved; row loading is not measured.
+
+Usage:
+    python scripts/bench_attendance_report.py --students 10000 --days 200
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import settings
+from app.modules.attendance import packing, reports
+
+START_YEAR, START_MONTH = 2025, 9
+PERIODS_MARKED = 8
+
+
+def make_rows(students: int, school_days: int, rng: np.random.Generator):
+    """Packed (codes, marked) per student-month plus their indices"""
+    dates = reports.month_dates(START_YEAR, START_MONTH, 12)
+    weekday = (dates.astype(np.int64) + 3) % 7
+    school = np.flatnonzero(~np.isnat(dates) & (weekday < 5))[:school_days]
+    months = int(school[-1] // packing.DAYS_PER_MONTH) + 1
+
+    # Mostly present, some absent / late / excused
+    statuses = rng.choice(4, size=(students, school.size, PERIODS_MARKED), p=[0.88, 0.06, 0.04, 0.02])
+    grids = np.full((students, months * packing.DAYS_PER_MONTH, packing.PERIODS_PER_DAY), packing.UNMARKED, np.int8)
+    grids[:, school, :PERIODS_MARKED] = statuses
+    grids = grids.reshape(students * months, packing.DAYS_PER_MONTH, packing.PERIODS_PER_DAY)
+
+    encoded = [packing.encode_month(grid) for grid in grids]
+    row_students = np.repeat(np.arange(students), months)
+    row_months = np.tile(np.arange(months), students)
+    return months, [c for c, _ in encoded], [m for _, m in encoded], row_students, row_months
+
+
+def timed(label: str, fn):
+    started = time.perf_counter()
+    result = fn()
+    print(f"   {label:<36} {(time.perf_counter() - started) * 1000:9.1f} ms")
+    return result
+
+
+def python_loop(grids: np.ndarray, row_students: np.ndarray, row_months: np.ndarray, months: int, students: int):
+    """
+    Baseline: the same figures as ``build_report`` (status counts, percent,
+    chronic absentees, most-late list, weekday absence rates) computed per
+    student, per day in plain Python from the same decoded grids
+    """
+    dates = reports.month_dates(START_YEAR, START_MONTH, months).reshape(months, packing.DAYS_PER_MONTH)
+    weekdays = np.where(np.isnat(dates), -1, (dates.astype(np.int64) + 3) % 7).tolist()
+    severity = {packing.PRESENT: 0, packing.EXCUSED: 1, packing.LATE: 2, packing.ABSENT: 3}
+
+    counts = [[0, 0, 0, 0] for _ in range(students)]
+    weekday_absences, weekday_marked = [0] * 7, [0] * 7
+    for grid, student, month in zip(grids.tolist(), row_students.tolist(), row_months.tolist()):
+        student_counts = counts[student]
+        for day, periods in zip(weekdays[month], grid):
+            if day < 0:
+                continue
+            code = periods[0]
+            if code == packing.UNMARKED:
+                marked_codes = [c for c in periods[1:] if c != packing.UNMARKED]
+                if not marked_codes:
+                    continue
+                code = max(marked_codes, key=severity.__getitem__)
+            student_counts[code] += 1
+            weekday_marked[day] += 1
+            if code == packing.ABSENT:
+                weekday_absences[day] += 1
+
+    percentage, chronic = [], []
+    for i, c in enumerate(counts):
+        expected = c[packing.PRESENT] + c[packing.LATE] + c[packing.ABSENT]
+        percentage.append((c[packing.PRESENT] + c[packing.LATE]) * 100 / expected if expected else None)
+        if expected and c[packing.ABSENT] * 100 / expected >= settings.ATTENDANCE_CHRONIC_ABSENCE_PERCENT:
+            chronic.append(i)
+    chronic.sort(key=lambda i: percentage[i])
+    late = sorted(range(students), key=lambda i: -counts[i][packing.LATE])[:20]
+    late = [i for i in late if counts[i][packing.LATE]]
+    rates = [a * 100 / m if m else None for a, m in zip(weekday_absences, weekday_marked)]
+    return counts, percentage, chronic, late, rates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the attendance report engine")
+    parser.add_argument("--students", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"\n🏗️  Building {args.students} students x {args.days} school days...")
+    months, codes, marked, row_students, row_months = make_rows(args.students, args.days, np.random.default_rng(7))
+    size = sum(map(len, codes)) + sum(map(len, marked))
+    print(f"   {len(codes)} month rows, {size / 1e6:.1f} MB packed")
+
+    student_ids = np.arange(1, args.students + 1)
+    admission_numbers = [f"ADM{i:06d}" for i in student_ids.tolist()]
+    names = [f"Student {i}" for i in student_ids.tolist()]
+
+    print("\n⏱️  Report pipeline")
+    grids = timed("decode_months (batch)", lambda: packing.decode_months(codes, marked))
+    started = time.perf_counter()
+    report = timed("build_report", lambda: reports.build_report(
+        START_YEAR, START_MONTH, months, student_ids, admission_numbers, names, row_students, row_months, grids
+    ))
+    report_seconds = time.perf_counter() - started
+    csv_bytes = timed("stream CSV", lambda: sum(len(chunk) for chunk in reports.iter_csv(report)))
+    json_bytes = timed("stream JSON", lambda: sum(len(chunk) for chunk in reports.iter_json(report)))
+
+    print("\n🐢 Baseline")
+    started = time.perf_counter()
+    counts, _, chronic, late, rates = python_loop(grids, row_students, row_months, months, args.students)
+    elapsed = time.perf_counter() - started
+    print(f"   {'per-student Python loop':<36} {elapsed * 1000:9.1f} ms")
+    assert counts == report.counts.tolist()
+    assert chronic == report.chronic_order().tolist() and late == report.late_order().tolist()
+    assert [None if r is None else round(r, 2) for r in rates] == \
+        [day["absence_rate"] for day in report.day_of_week().values()]
+    print(f"   build_report speedup: {elapsed / report_seconds:.1f}x (outputs match)")
+
+    summary = report.summary()
+    print(f"\n📊 {summary['students']} students, {summary['percentage']}% attendance, "
+          f"{summary['chronic_absentees']} chronic absentees")
+    print(f"   CSV {csv_bytes / 1e6:.1f} MB, JSON {json_bytes / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
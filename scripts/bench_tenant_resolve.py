@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+Tenant Resolve Benchmark
+
+Measures CPU per request spent on the tenant cache-hit path: decoding the
+cached entry and building the tenant object, plus the full
+``tenant_resolver.resolve`` call. Redis is replaced by an in-process dict
+so only our own CPU is measured (no network).
+
+Usage:
+    python scripts/bench_tenant_resolve.py --iterations 100000
+"""
+import asyncio
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.tenancy.models import School
+from app.tenancy.cache import tenant_cache
+from app.tenancy.resolver import tenant_resolver
+from app.tenancy.schemas import TenantContext
+
+
+class DictRedis:
+    """Minimal async stand-in for the Redis calls used on the hit path"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+
+
+class FakeRequest:
+    def __init__(self, headers: dict):
+        self.headers = headers
+
+
+def make_school() -> School:
+    return School(
+        id=42, subdomain="greenwood", name="Greenwood International School", code="GIS001",
+        db_host="db.internal", db_port=3306, db_name="greenwood_erp", db_user="greenwood_admin",
+        db_password_encrypted="gAAAAA" + "x" * 100, db_replica_host=None,
+        credential_version=1, subscription_tier="premium", is_active=True,
+    )
+
+
+def legacy_entry(school: School) -> str:
+    """Previous format: JSON object including the encrypted password"""
+    return json.dumps({
+        "id": school.id, "subdomain": school.subdomain, "name": school.name, "code": school.code,
+        "db_host": school.db_host, "db_port": school.db_port, "db_name": school.db_name,
+        "db_user": school.db_user, "db_password_encrypted": school.db_password_encrypted,
+        "db_replica_host": school.db_replica_host, "is_active": school.is_active,
+    })
+
+
+def legacy_decode(data: str) -> School:
+    school = School()
+    for key, value in json.loads(data).items():
+        setattr(school, key, value)
+    return school
+
+
+def bench(label: str, fn, iterations: int):
+    started = time.process_time()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.process_time() - started
+    print(f"   {label:<38} {elapsed / iterations * 1e6:8.2f} µs/op")
+
+
+async def bench_resolve(iterations: int):
+    request = FakeRequest({"host": "localhost:8000", "X-Tenant-Subdomain": "greenwood"})
+    await tenant_resolver.resolve(request, None)  # Warm up
+    started = time.process_time()
+    for _ in range(iterations):
+        await tenant_resolver.resolve(request, None)
+    elapsed = time.process_time() - started
+    print(f"   {'tenant_resolver.resolve (cache hit)':<38} {elapsed / iterations * 1e6:8.2f} µs/op")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the tenant resolve hit path")
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    school = make_school()
+    old = legacy_entry(school)
+    new = tenant_cache._serialize_tenant(TenantContext.from_school(school))
+
+    print("\n📏 Entry size")
+    print(f"   legacy JSON object:   {len(old.encode())} bytes")
+    print(f"   positional array:     {len(new.encode())} bytes")
+
+    print(f"\n⏱️  CPU per request ({args.iterations} iterations)")
+    bench("legacy decode + School() setattr", lambda: legacy_decode(old), args.iterations)
+    bench("positional decode + TenantContext", lambda: tenant_cache._deserialize_tenant(new), args.iterations)
+
+    tenant_cache.redis = DictRedis()
+    tenant_cache.redis.data["tenant:subdomain:greenwood"] = new
+    asyncio.run(bench_resolve(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
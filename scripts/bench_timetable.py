@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""
+Timetable Solver Benchmark
+
+Generates synthetic schools and times the constraint solver on each. A
+school has ``classes`` classes of 25-45 students taking eight courses,
+subject teachers, one classroom per class plus a few shared larger rooms,
+and one in ten teachers unavailable for half a day. Two profiles:
+
+    standard    36 of 40 weekly periods taught, teachers up to 28 periods
+    saturated   every period taught, teachers up to 36 periods
+
+Every solution is checked against the hard constraints. No database is
+involved.
+
+Usage:
+    python scripts/bench_timetable.py --classes 15 30 60 --seeds 3
+"""
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.modules.timetable.solver import Lesson, Problem, solve
+
+DAYS, PERIODS = 5, 8
+PROFILES = {
+    # Periods per week of each course, max periods per teacher
+    "standard": ((6, 6, 5, 5, 4, 4, 3, 3), 28),
+    "saturated": ((7, 6, 6, 5, 5, 4, 4, 3), 36),
+}
+
+
+def make_school(classes: int, rng: random.Random, profile: str = "standard") -> Problem:
+    course_credits, max_load = PROFILES[profile]
+    sizes = [rng.randint(25, 45) for _ in range(classes)]
+    rooms = [size + rng.randint(0, 5) for size in sizes] + [50] * max(classes // 10, 1)
+    rng.shuffle(rooms)
+
+    lessons, teachers, loads = [], 0, {}
+    for course, credits in enumerate(course_credits):
+        teacher = None
+        for group in range(classes):
+            if teacher is None or loads[teacher] + credits > max_load:
+                teacher, teachers = teachers, teachers + 1
+                loads[teacher] = 0
+            loads[teacher] += credits
+            lessons += [Lesson(group, teacher, course, sizes[group])] * credits
+
+    unavailable = {}
+    for teacher in rng.sample(range(teachers), teachers // 10):
+        day = rng.randrange(DAYS)
+        half = rng.choice((0, PERIODS // 2))
+        unavailable[teacher] = {day * PERIODS + half + p for p in range(PERIODS // 2)}
+
+    return Problem(
+        days=DAYS, periods=PERIODS, lessons=lessons, groups=classes, teachers=teachers,
+        room_capacity=rooms, teacher_unavailable=unavailable,
+    )
+
+
+def verify(problem: Problem, solution) -> list[str]:
+    """Hard-constraint violations in a solution (should be empty)"""
+    errors, seen = [], set()
+    for l, (s, room) in enumerate(zip(solution.slot, solution.room)):
+        if s < 0:
+            continue
+        lesson = problem.lessons[l]
+        for key in (("class", lesson.group, s), ("teacher", lesson.teacher, s), ("room", room, s)):
+            if key in seen:
+                errors.append(f"{key[0]} {key[1]} double-booked in slot {s}")
+            seen.add(key)
+        if s in problem.teacher_unavailable.get(lesson.teacher, ()):
+            errors.append(f"teacher {lesson.teacher} unavailable in slot {s}")
+        if problem.room_capacity[room] < lesson.size:
+            errors.append(f"room {room} too small for class {lesson.group}")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the timetable solver")
+    parser.add_argument("--classes", type=int, nargs="+", default=[15, 30, 60])
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument("--profile", choices=[*PROFILES, "all"], default="all")
+    parser.add_argument("--time-limit", type=float, default=10.0)
+    args = parser.parse_args()
+
+    profiles = list(PROFILES) if args.profile == "all" else [args.profile]
+    for profile in profiles:
+        print(f"\n⏱️  {profile}: {DAYS} days x {PERIODS} periods, {sum(PROFILES[profile][0])} periods per class")
+        print(f"   {'classes':>7} {'seed':>4} {'lessons':>7} {'teachers':>8} {'rooms':>5} "
+              f"{'time':>8} {'unplaced':>8} {'penalty':>7} {'repairs':>7}")
+        for classes in args.classes:
+            for seed in range(args.seeds):
+                run(profile, classes, seed, args.time_limit)
+
+
+def run(profile: str, classes: int, seed: int, time_limit: float):
+    problem = make_school(classes, random.Random(seed), profile)
+    started = time.perf_counter()
+    solution = solve(problem, time_limit=time_limit, seed=seed)
+    elapsed = time.perf_counter() - started
+    errors = verify(problem, solution)
+    print(f"   {classes:>7} {seed:>4} {len(problem.lessons):>7} {problem.teachers:>8} "
+          f"{len(problem.room_capacity):>5} {elapsed:>7.2f}s {len(solution.unplaced):>8} "
+          f"{solution.penalty:>7} {solution.iterations:>7}")
+    for error in errors[:5]:
+        print(f"   ❌ {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -120,6 +120,7 @@ async def provision_tenant(
     # Step 5: Seed RBAC data
     print("\nStep 5: Seeding roles and permissions...")
     from app.tenancy.manager import connection_manager
+    from app.tenancy.schemas import TenantContext
     from app.rbac.engine import PermissionEngine
     
     # Get fresh school object
@@ -128,7 +129,7 @@ async def provision_tenant(
         school = result.scalar_one()
     
     # Get tenant session
-    session_maker = await connection_manager.get_session_maker(school)
+    session_maker = await connection_manager.get_session_maker(TenantContext.from_school(school))
     async with session_maker() as tenant_session:
         engine = PermissionEngine()
         await engine.seed_roles(tenant_session)
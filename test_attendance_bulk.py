@@ -0,0 +1,66 @@
+"""Checks for whole-roll attendance marking (run: python test_attendance_bulk.py)"""
+from datetime import date
+from app.modules.attendance import packing
+from app.modules.attendance.router import _apply_roll
+from app.modules.attendance.schemas import BulkAttendanceMark
+from app.shared.enums import AttendanceStatus
+
+DAY = date(2025, 9, 3)
+
+
+def month_row(student_id: int, grid=None, branch_id=1, grade="6", section="A") -> tuple:
+    codes, marked = packing.encode_month(packing.empty_month() if grid is None else grid)
+    return student_id, branch_id, grade, section, codes, marked
+
+
+def roll(student_ids, statuses, period=2) -> BulkAttendanceMark:
+    return BulkAttendanceMark(
+        current_grade="6", section="A", attendance_date=DAY, period=period,
+        student_ids=student_ids, statuses=statuses,
+    )
+
+
+def decoded(update: dict):
+    return packing.decode_month(update["codes"], update["marked"])
+
+
+def test_marks_every_student_on_the_roll():
+    updates, removed = _apply_roll(
+        roll([1, 2], [AttendanceStatus.PRESENT, AttendanceStatus.LATE]), {1: 1, 2: 1},
+        [month_row(1), month_row(2)],
+    )
+    assert removed == 0
+    assert [(u["student_id"], u["year"], u["month"]) for u in updates] == [(1, 2025, 9), (2, 2025, 9)]
+    assert decoded(updates[0])[DAY.day - 1, 2] == packing.PRESENT
+    assert decoded(updates[1])[DAY.day - 1, 2] == packing.LATE
+    assert (decoded(updates[1]) != packing.UNMARKED).sum() == 1
+
+
+def test_resubmission_clears_dropped_students_only():
+    marked = packing.empty_month()
+    marked[DAY.day - 1, 2] = packing.ABSENT
+    other_period = packing.empty_month()
+    other_period[DAY.day - 1, 3] = packing.PRESENT
+    updates, removed = _apply_roll(
+        roll([1], [AttendanceStatus.PRESENT]), {1: 1},
+        [month_row(1, marked), month_row(2, marked), month_row(3, other_period)],
+    )
+    assert removed == 1
+    assert [u["student_id"] for u in updates] == [1, 2]  # Student 3 has nothing to clear
+    assert decoded(updates[0])[DAY.day - 1, 2] == packing.PRESENT
+    assert (decoded(updates[1]) == packing.UNMARKED).all()
+
+
+def test_roll_moves_month_row_to_its_class():
+    updates, _ = _apply_roll(
+        roll([1], [AttendanceStatus.ABSENT]), {1: 4},
+        [month_row(1, branch_id=2, grade="5", section="")],
+    )
+    assert (updates[0]["branch_id"], updates[0]["current_grade"], updates[0]["section"]) == (4, "6", "A")
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"ok  {name}")
@@ -0,0 +1,86 @@
+"""Checks for bit-packed monthly attendance (run: python test_attendance_packing.py)"""
+import numpy as np
+from app.modules.attendance import packing
+from app.modules.attendance.packing import PRESENT, ABSENT, LATE, EXCUSED, UNMARKED
+from app.shared.enums import AttendanceStatus
+
+
+def random_month(rng: np.random.Generator, fill: float = 0.7) -> np.ndarray:
+    grid = rng.integers(0, 4, size=(packing.DAYS_PER_MONTH, packing.PERIODS_PER_DAY)).astype(np.int8)
+    grid[rng.random(grid.shape) > fill] = UNMARKED
+    return grid
+
+
+def test_roundtrip():
+    rng = np.random.default_rng(1)
+    for fill in (0.0, 0.3, 1.0):
+        grid = random_month(rng, fill)
+        codes, marked = packing.encode_month(grid)
+        assert len(codes) == packing.CODES_BYTES and len(marked) == packing.MARKED_BYTES
+        assert np.array_equal(packing.decode_month(codes, marked), grid)
+
+
+def test_every_code_in_every_slot():
+    for code in (UNMARKED, PRESENT, ABSENT, LATE, EXCUSED):
+        grid = np.full((packing.DAYS_PER_MONTH, packing.PERIODS_PER_DAY), code, dtype=np.int8)
+        assert np.array_equal(packing.decode_month(*packing.encode_month(grid)), grid)
+
+
+def test_unmarked_slots_encode_code_zero():
+    codes, marked = packing.encode_month(packing.empty_month())
+    assert codes == bytes(packing.CODES_BYTES) and marked == bytes(packing.MARKED_BYTES)
+
+
+def test_empty_row_decodes_unmarked():
+    assert np.array_equal(packing.decode_month(b"", b""), packing.empty_month())
+    assert packing.decode_months([], []).shape == (0, packing.DAYS_PER_MONTH, packing.PERIODS_PER_DAY)
+
+
+def test_batch_decode_matches_single():
+    rng = np.random.default_rng(2)
+    grids = [random_month(rng) for _ in range(5)]
+    encoded = [packing.encode_month(grid) for grid in grids]
+    batch = packing.decode_months([c for c, _ in encoded], [m for _, m in encoded])
+    assert np.array_equal(batch, np.stack(grids))
+
+
+def test_daily_status():
+    grid = packing.empty_month()
+    grid[0, 0] = EXCUSED                # Whole-day mark wins over periods
+    grid[0, 3] = ABSENT
+    grid[1, 1:4] = (PRESENT, LATE, EXCUSED)  # Worst period: LATE
+    grid[2, 1:3] = (PRESENT, ABSENT)
+    grid[3, 5] = PRESENT
+    daily = packing.daily_status(grid)
+    assert daily[:5].tolist() == [EXCUSED, LATE, ABSENT, PRESENT, UNMARKED]
+
+
+def test_counts_and_percentage():
+    grid = packing.empty_month()
+    grid[:3, 0] = PRESENT
+    grid[3, 0] = LATE
+    grid[4, 0] = ABSENT
+    grid[5, 0] = EXCUSED
+    counts = packing.status_counts(grid)
+    assert counts == {
+        AttendanceStatus.PRESENT: 3, AttendanceStatus.ABSENT: 1,
+        AttendanceStatus.LATE: 1, AttendanceStatus.EXCUSED: 1,
+    }
+    assert packing.attendance_percentage(counts) == 80.0  # Excused days not expected
+    assert packing.attendance_percentage(packing.status_counts(packing.empty_month())) is None
+
+
+def test_streaks():
+    grid = packing.empty_month()
+    grid[:10, 0] = PRESENT
+    grid[4, 0] = ABSENT
+    grid[12:14, 0] = LATE  # Unmarked days in between do not break the run
+    assert packing.streaks(grid) == (7, 7)
+    assert packing.streaks(packing.empty_month()) == (0, 0)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"ok  {name}")
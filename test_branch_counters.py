@@ -0,0 +1,59 @@
+"""Checks for per-branch entity counters (run: python test_branch_counters.py)"""
+from datetime import date
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from app.modules.branches import counters
+from app.modules.branches.models import Branch
+from app.modules.students.models import Student
+from app.shared.enums import Gender
+# Mapped classes Student's relationships resolve to
+from app.modules.schools.models import School  # noqa: F401
+from app.modules.auth.models import User  # noqa: F401
+
+
+def make_session() -> Session:
+    engine = create_engine("sqlite://")
+    Branch.__table__.create(engine)
+    session = Session(engine)
+    session.add_all([
+        Branch(name="North Campus", code="NORTH"),
+        Branch(name="Main Branch", code="MAIN", is_main_branch=True),
+    ])
+    session.commit()
+    return session
+
+
+def new_student(branch_id=None) -> Student:
+    return Student(
+        school_id=1, branch_id=branch_id, first_name="Asha", last_name="Rao",
+        date_of_birth=date(2012, 4, 1), gender=list(Gender)[0],
+        admission_number="ADM001", admission_date=date(2024, 6, 1), current_grade="6",
+    )
+
+
+def test_student_without_branch_counts_for_main():
+    session = make_session()
+    main_id = session.query(Branch.id).filter(Branch.code == "MAIN").scalar()
+    student = new_student()
+    session.add(student)
+
+    # What the flush hooks do, without the MySQL-only counter upsert
+    counters._assign_main_branch(session, None, None)
+    assert student.branch_id == main_id
+    deltas = counters._collect_deltas(session)
+    assert dict(deltas) == {main_id: {"student_count": 1}}
+
+
+def test_explicit_branch_is_kept():
+    session = make_session()
+    north_id = session.query(Branch.id).filter(Branch.code == "NORTH").scalar()
+    session.add(new_student(north_id))
+    counters._assign_main_branch(session, None, None)
+    assert dict(counters._collect_deltas(session)) == {north_id: {"student_count": 1}}
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"ok  {name}")
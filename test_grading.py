@@ -0,0 +1,75 @@
+"""Checks for vectorized term grading (run: python test_grading.py)"""
+import numpy as np
+from app.modules.marks import grading
+from app.modules.marks.grading import Scheme, DEFAULT_BANDS
+
+nan = np.nan
+
+
+def test_weighted_average_skips_nan():
+    values = np.array([[80.0, nan, 60.0], [nan, nan, nan], [0.0, 100.0, nan]])
+    weights = np.array([1.0, 2.0, 3.0])
+    result = grading.weighted_average(values, weights)
+    assert np.isclose(result[0], (80 + 3 * 60) / 4)
+    assert np.isnan(result[1])
+    assert np.isclose(result[2], 200 / 3)
+
+
+def test_competition_rank_ties():
+    scores = np.array([90.0, 75.0, 90.0, 60.0, 75.0])
+    assert grading.competition_rank(scores).tolist() == [1, 3, 1, 5, 3]
+
+
+def test_competition_rank_nan_is_unranked():
+    scores = np.array([nan, 50.0, 70.0, nan])
+    assert grading.competition_rank(scores).tolist() == [0, 2, 1, 0]
+
+
+def test_competition_rank_per_column():
+    scores = np.array([[50.0, nan], [80.0, 10.0], [50.0, 20.0]])
+    assert grading.competition_rank(scores).tolist() == [[2, 0], [1, 2], [2, 1]]
+
+
+def test_percentile_rank():
+    scores = np.array([40.0, 60.0, 60.0, 80.0, nan])
+    result = grading.percentile_rank(scores)
+    assert result[:4].tolist() == [12.5, 50.0, 50.0, 87.5]  # Ties count as half
+    assert np.isnan(result[4])
+    assert np.isnan(grading.percentile_rank(np.array([nan, nan]))).all()
+
+
+def test_band_boundaries():
+    scheme = Scheme.from_bands(DEFAULT_BANDS)
+    percent = np.array([0.0, 32.99, 33.0, 90.99, 91.0, 100.0, nan])
+    grades = [scheme.grades[b] if b >= 0 else None for b in scheme.band_index(percent).tolist()]
+    assert grades == ["E", "E", "D", "A2", "A1", "A1", None]
+
+
+def test_scheme_bands_roundtrip():
+    bands = [{"grade": "Pass", "min_percent": 40}, {"grade": "Fail", "min_percent": 0, "points": 0}]
+    scheme = Scheme.from_bands(bands)
+    again = Scheme.from_bands(scheme.bands())
+    assert again.grades == scheme.grades == ("Fail", "Pass")
+    assert np.array_equal(again.thresholds, scheme.thresholds)
+    assert np.array_equal(again.points, scheme.points, equal_nan=True)
+
+
+def test_absent_counts_as_zero():
+    # An absent mark is a score of 0 (see load_class_scores); a missing mark is NaN and skipped
+    scores = np.array([
+        [[80.0, 0.0]],  # Absent from the second exam
+        [[80.0, nan]],  # No mark for the second exam
+    ])
+    results = grading.compute_results(
+        np.array([1, 2]), np.array([10]), scores, np.array([1.0, 1.0]), np.array([1.0]),
+        Scheme.from_bands(DEFAULT_BANDS),
+    )
+    assert results.percentage.tolist() == [40.0, 80.0]
+    assert results.rank.tolist() == [2, 1]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"ok  {name}")